@@ -0,0 +1,231 @@
+"""
+Operational commands.
+
+    python -m app.cli init          # migrate + seed demo users on an empty db
+    python -m app.cli migrate
+    python -m app.cli seed
+    python -m app.cli sync-replica  # copy a SQLite primary into DATABASE_READ_URL
+    python -m app.cli check-plans
+    python -m app.cli reconcile-counters
+    python -m app.cli refresh-heatmap [--rebuild]
+    python -m app.cli refresh-kpis [--rebuild]
+    python -m app.cli import-jobs jobs.ndjson --officer-phone +252634000001
+    python -m app.cli export-jobs 2026-09.ndjson.gz --from 2026-09-01 --to 2026-10-01
+"""
+import argparse
+import sys
+
+from app.core.db import SessionLocal, engine
+from app.core.migrations import current_version, latest_version, run_migrations
+
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    applied = run_migrations(engine)
+    if applied:
+        print(f"applied migrations: {', '.join(str(v) for v in applied)}")
+    print(f"schema version {current_version(engine)} (latest {latest_version()})")
+    return 0
+
+
+def cmd_seed(args: argparse.Namespace) -> int:
+    from app.services.seed import seed_users
+
+    with SessionLocal() as db:
+        created = seed_users(db)
+    print("seeded demo users" if created else "users already present; nothing seeded")
+    return 0
+
+
+def cmd_init(args: argparse.Namespace) -> int:
+    cmd_migrate(args)
+    if not args.no_seed:
+        cmd_seed(args)
+    return 0
+
+
+def cmd_sync_replica(args: argparse.Namespace) -> int:
+    import sqlite3
+
+    from app.core.db import has_read_replica, read_engine
+
+    if not has_read_replica():
+        print("DATABASE_READ_URL is not set; reads already go to the primary")
+        return 2
+    if engine.dialect.name != "sqlite" or read_engine.dialect.name != "sqlite":
+        print("sync-replica copies SQLite files only; feed a Postgres replica with streaming replication")
+        return 2
+    # the backup API copies a consistent snapshot, WAL included, while the app keeps writing
+    src, dst = sqlite3.connect(engine.url.database), sqlite3.connect(read_engine.url.database)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+    print(f"ok: copied {engine.url.database} to {read_engine.url.database}")
+    return 0
+
+
+def cmd_check_plans(args: argparse.Namespace) -> int:
+    from app.services.query_plans import check_query_plans
+
+    problems = check_query_plans(engine)
+    for p in problems:
+        print(f"FAIL {p}")
+    if problems:
+        return 1
+    print("ok: no full table scans in list/dashboard queries")
+    return 0
+
+
+def cmd_reconcile_counters(args: argparse.Namespace) -> int:
+    from app.services.counters import reconcile_counters
+
+    drift = reconcile_counters(engine)
+    for d in drift:
+        print(f"fixed {d['driver_id'] or '(all)'} {d['status']}: {d['counter']} -> {d['actual']}")
+    print(f"ok: {len(drift)} counter rows corrected")
+    return 0
+
+
+def cmd_refresh_heatmap(args: argparse.Namespace) -> int:
+    from app.services.heatmap import refresh_heatmap
+
+    added = refresh_heatmap(engine, rebuild=args.rebuild)
+    print(f"ok: {added} jobs added to heatmap tiles")
+    return 0
+
+
+def cmd_refresh_kpis(args: argparse.Namespace) -> int:
+    from app.services.kpi_rollups import refresh_kpis
+
+    read = refresh_kpis(engine, rebuild=args.rebuild)
+    print(f"ok: {read} events folded into KPI rollups")
+    return 0
+
+
+def cmd_import_jobs(args: argparse.Namespace) -> int:
+    import json
+
+    from app.models.user import User, UserRole
+    from app.services.bulk_import import IMPORT_FORMATS, detect_format, import_tow_jobs, iter_rows
+
+    fmt = args.format or detect_format(args.path, None)
+    if fmt not in IMPORT_FORMATS:
+        print(f"cannot infer format from {args.path!r}; pass --format {'/'.join(IMPORT_FORMATS)}")
+        return 2
+
+    with SessionLocal() as db:
+        officer = (
+            db.query(User)
+            .filter(User.phone == args.officer_phone, User.role.in_([UserRole.OFFICER, UserRole.ADMIN]))
+            .first()
+        )
+        if not officer:
+            print(f"no officer/admin with phone {args.officer_phone}")
+            return 2
+        with open(args.path, "rb") as f:
+            report = import_tow_jobs(
+                db,
+                iter_rows(f, fmt),
+                officer.id,
+                officer.id,
+                chunk_size=args.chunk_size,
+                officer_role=officer.role.value,
+            )
+
+    print(json.dumps(report.as_dict(), indent=2))
+    return 0 if report.failed == 0 else 1
+
+
+def cmd_export_jobs(args: argparse.Namespace) -> int:
+    from datetime import datetime, timezone
+
+    from app.core.db import read_engine
+    from app.services.bulk_import import detect_format
+    from app.services.export import stream_export
+
+    path = args.output
+    gzip = args.gzip or path.endswith(".gz")
+    fmt = args.format or detect_format(path.removesuffix(".gz"), None)
+    if fmt is None:
+        print(f"cannot infer format from {path!r}; pass --format ndjson/csv")
+        return 2
+
+    def utc(value: str | None) -> datetime | None:
+        if not value:
+            return None
+        dt = datetime.fromisoformat(value)
+        return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+    chunks = stream_export(
+        read_engine,
+        fmt,
+        gzip=gzip,
+        table=args.table,
+        created_from=utc(args.date_from),
+        created_to=utc(args.date_to),
+        chunk_size=args.chunk_size,
+    )
+    out = sys.stdout.buffer if path == "-" else open(path, "wb")
+    try:
+        written = 0
+        for chunk in chunks:
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    if path != "-":
+        print(f"ok: wrote {written} bytes to {path}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_init = sub.add_parser("init", help="one-shot setup: migrate, then seed an empty database")
+    p_init.add_argument("--no-seed", action="store_true", help="skip demo users")
+    p_init.set_defaults(func=cmd_init)
+    sub.add_parser("migrate", help="apply pending schema migrations").set_defaults(func=cmd_migrate)
+    sub.add_parser("seed", help="create demo users if the users table is empty").set_defaults(func=cmd_seed)
+    sub.add_parser("sync-replica", help="snapshot a SQLite primary into the DATABASE_READ_URL file").set_defaults(
+        func=cmd_sync_replica
+    )
+    sub.add_parser("check-plans", help="fail if a list/dashboard query full-scans a table").set_defaults(
+        func=cmd_check_plans
+    )
+
+    sub.add_parser("reconcile-counters", help="recompute job counters from tow_jobs").set_defaults(
+        func=cmd_reconcile_counters
+    )
+    p_heatmap = sub.add_parser("refresh-heatmap", help="fold new jobs into the heatmap tiles")
+    p_heatmap.add_argument("--rebuild", action="store_true", help="drop the tiles and recompute from all jobs")
+    p_heatmap.set_defaults(func=cmd_refresh_heatmap)
+    p_kpis = sub.add_parser("refresh-kpis", help="fold new events into the KPI rollups")
+    p_kpis.add_argument("--rebuild", action="store_true", help="drop the rollups and recompute from all events")
+    p_kpis.set_defaults(func=cmd_refresh_kpis)
+
+    p_import = sub.add_parser("import-jobs", help="bulk-import tow jobs from an NDJSON or CSV file")
+    p_import.add_argument("path")
+    p_import.add_argument("--officer-phone", required=True, help="officer (or admin) the jobs are filed under")
+    p_import.add_argument("--format", choices=["ndjson", "csv"])
+    p_import.add_argument("--chunk-size", type=int, default=500)
+    p_import.set_defaults(func=cmd_import_jobs)
+
+    p_export = sub.add_parser("export-jobs", help="stream jobs with events and photo metadata to a file")
+    p_export.add_argument("output", help="file path (.ndjson/.csv, optionally .gz) or - for stdout")
+    p_export.add_argument("--format", choices=["ndjson", "csv"])
+    p_export.add_argument("--table", choices=["jobs", "events", "photos"], default="jobs", help="CSV only")
+    p_export.add_argument("--from", dest="date_from", help="created at or after (ISO date/time, UTC)")
+    p_export.add_argument("--to", dest="date_to", help="created before (ISO date/time, UTC)")
+    p_export.add_argument("--gzip", action="store_true")
+    p_export.add_argument("--chunk-size", type=int, default=1000)
+    p_export.set_defaults(func=cmd_export_jobs)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
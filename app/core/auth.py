@@ -1,33 +1,54 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.db import get_async_db, get_db
+from app.core.principal_cache import load_principal, load_principal_async
 from app.core.security import decode_token
 from app.models.user import User, UserRole
 
 bearer = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    creds: HTTPAuthorizationCredentials = Depends(bearer),
-    db: Session = Depends(get_db),
-) -> User:
+def _user_id_from_credentials(creds: HTTPAuthorizationCredentials | None) -> str:
     if creds is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
     try:
         payload = decode_token(creds.credentials)
-        user_id = payload.get("sub")
+        return payload.get("sub")
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+
+def _ensure_active(user: User | None) -> User:
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User inactive or not found")
     return user
 
 
+def find_user_by_phone(db: Session, phone: str) -> User | None:
+    """Login lookup shared by the API and web sign-in; sync, so run it in a threadpool."""
+    return db.query(User).filter(User.phone == phone).first()
+
+
+def get_current_user(
+    creds: HTTPAuthorizationCredentials = Depends(bearer),
+    db: Session = Depends(get_db),
+) -> User:
+    user_id = _user_id_from_credentials(creds)
+    return _ensure_active(load_principal(db, user_id))
+
+
+async def get_current_user_async(
+    creds: HTTPAuthorizationCredentials = Depends(bearer),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    user_id = _user_id_from_credentials(creds)
+    return _ensure_active(await load_principal_async(db, user_id))
+
+
 def require_roles(*roles: UserRole):
     def _guard(user: User = Depends(get_current_user)) -> User:
         if user.role not in roles:
@@ -35,3 +56,12 @@ def require_roles(*roles: UserRole):
         return user
 
     return _guard
+
+
+def require_roles_async(*roles: UserRole):
+    async def _guard(user: User = Depends(get_current_user_async)) -> User:
+        if user.role not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+        return user
+
+    return _guard
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 
@@ -9,12 +11,89 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALG: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 60 * 24  # 1 day
+    TOKEN_CACHE_MAX_SIZE: int = 8192  # verified-token LRU (0 disables)
 
     DATABASE_URL: str = "sqlite:///./tow.db"
+    # Async driver URL; derived from DATABASE_URL (aiosqlite / asyncpg) when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Optional read replica for GET endpoints and dashboards. Locally this can be a
+    # second SQLite file: `python -m app.cli sync-replica` snapshots the primary
+    # into it (schema and data; rerun it to catch up, the gap is your "lag").
+    DATABASE_READ_URL: Optional[str] = None
+    ASYNC_DATABASE_READ_URL: Optional[str] = None
+    # After a client's own write, its reads stick to the primary for this long
+    READ_AFTER_WRITE_SECONDS: int = 5
+
+    # Startup only checks the schema version. When it's behind, either migrate
+    # (serialized across workers) or refuse to start; run `python -m app.cli init`.
+    AUTO_MIGRATE: bool = True
+
+    # Connection pool (ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite tuning, applied on every new connection
+    SQLITE_WAL: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE_MB: int = 256
 
     # Upload limits
     MAX_UPLOAD_MB: int = 8  # you can change this
 
+    # Auth principal cache (0 disables). Deactivations take effect within the TTL
+    # on other workers; the worker handling the admin change drops it immediately.
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 15.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 4096
+
+    # Argon2id cost (defaults match argon2-cffi's RFC 9106 low-memory profile)
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST_KB: int = 65536
+    ARGON2_PARALLELISM: int = 4
+
+    # Dedicated password-hashing pool. Requests beyond workers + queue are
+    # rejected with 503 instead of waiting.
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
+    # Job event log. "sync" writes events in the request transaction (audit-critical
+    # deployments); "write_behind" commits them after the request from a bounded
+    # queue, spooled to a local file first so a crashed worker's events are replayed.
+    EVENT_LOG_MODE: str = "sync"
+    EVENT_LOG_QUEUE_SIZE: int = 10000  # when full, events are only spooled and the writer catches up from disk
+    EVENT_LOG_BATCH_SIZE: int = 500
+    EVENT_LOG_FLUSH_INTERVAL_MS: int = 200
+    EVENT_LOG_SPOOL_DIR: str = "spool/events"
+    EVENT_LOG_SPOOL_FSYNC: bool = False  # True survives power loss, not just a process crash
+
+    # Job counters are updated with every write; this recomputes them from
+    # tow_jobs to correct drift (0 disables the periodic run).
+    COUNTERS_RECONCILE_SECONDS: int = 600
+
+    # Driver location pings. The latest fix per driver is kept in memory;
+    # breadcrumbs are thinned per driver and inserted in batches.
+    DRIVER_LOCATION_MAX_AGE_SECONDS: int = 300  # older fixes don't count as an active driver
+    DRIVER_LOCATION_SHARED: bool = False  # several workers: each tails the track table for the others' pings
+    DRIVER_TRACK_MIN_INTERVAL_SECONDS: float = 5.0
+    DRIVER_TRACK_BATCH_SIZE: int = 1000
+    DRIVER_TRACK_FLUSH_INTERVAL_MS: int = 1000
+    DRIVER_TRACK_BUFFER_MAX: int = 50000  # when full, the oldest unflushed breadcrumbs are dropped
+
+    # Job density heatmap. Tiles are folded forward from tow_jobs in the
+    # background (0 disables; `python -m app.cli refresh-heatmap` does it by hand).
+    HEATMAP_REFRESH_SECONDS: int = 60
+    HEATMAP_SETTLE_SECONDS: int = 60  # jobs younger than this wait for the next run
+    HEATMAP_TILE_MAX_AGE_SECONDS: int = 60
+
+    # KPI rollups (time to assign/arrive/tow) folded forward from the event
+    # log (0 disables; `python -m app.cli refresh-kpis` does it by hand).
+    KPI_REFRESH_SECONDS: int = 300
+    KPI_SETTLE_SECONDS: int = 60  # must exceed the longest event insert transaction
+
     class Config:
         env_file = ".env"
 
@@ -27,6 +106,14 @@ class Settings(BaseSettings):
             raise ValueError("JWT_SECRET looks like a placeholder. Set a real secret.")
         return v.strip()
 
+    @field_validator("EVENT_LOG_MODE")
+    @classmethod
+    def validate_event_log_mode(cls, v: str) -> str:
+        v = v.strip().lower()
+        if v not in ("sync", "write_behind"):
+            raise ValueError("EVENT_LOG_MODE must be 'sync' or 'write_behind'.")
+        return v
+
 
 settings = Settings()
 
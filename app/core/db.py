@@ -1,13 +1,114 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.read_your_writes import wants_primary
 
-connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    if not _is_sqlite(url):
+        return False
+    path = url.partition("://")[2].split("?", 1)[0]
+    return path in ("", ":memory:", "/:memory:") or "mode=memory" in url
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cur = dbapi_connection.cursor()
+    try:
+        if settings.SQLITE_WAL:
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        # negative cache_size is in KiB rather than pages
+        cur.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cur.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}")
+        cur.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cur.close()
+
+
+def _pool_kwargs(url: str) -> dict:
+    if _is_memory_sqlite(url):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def make_engine(url: str) -> Engine:
+    kwargs = _pool_kwargs(url)
+    if _is_sqlite(url):
+        kwargs["connect_args"] = {"check_same_thread": False}
+
+    eng = create_engine(url, **kwargs)
+    if _is_sqlite(url):
+        event.listen(eng, "connect", _set_sqlite_pragmas)
+    return eng
+
+
+def async_url_for(url: str) -> str:
+    """
+    Map a sync DATABASE_URL onto its async driver:
+      sqlite:///./tow.db          -> sqlite+aiosqlite:///./tow.db
+      postgresql://u:p@h/db       -> postgresql+asyncpg://u:p@h/db
+    """
+    scheme, sep, rest = url.partition("://")
+    if "+aiosqlite" in scheme or "+asyncpg" in scheme:
+        return url
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if scheme.startswith("postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    raise ValueError(f"No async driver configured for {scheme!r}; set ASYNC_DATABASE_URL")
+
+
+def make_async_engine(url: str) -> AsyncEngine:
+    kwargs = _pool_kwargs(url)
+    if _is_sqlite(url) and kwargs:
+        # aiosqlite defaults to NullPool, which would re-run the PRAGMAs per request
+        kwargs["poolclass"] = AsyncAdaptedQueuePool
+
+    eng = create_async_engine(url, **kwargs)
+    if _is_sqlite(url):
+        event.listen(eng.sync_engine, "connect", _set_sqlite_pragmas)
+    return eng
+
+
+engine = make_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async path (runs alongside the sync one while routers migrate)
+async_engine = make_async_engine(settings.ASYNC_DATABASE_URL or async_url_for(settings.DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Read replica (falls back to the primary when DATABASE_READ_URL is unset)
+if settings.DATABASE_READ_URL:
+    read_engine = make_engine(settings.DATABASE_READ_URL)
+    async_read_engine = make_async_engine(
+        settings.ASYNC_DATABASE_READ_URL or async_url_for(settings.DATABASE_READ_URL)
+    )
+else:
+    read_engine = engine
+    async_read_engine = async_engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
+
+def has_read_replica() -> bool:
+    return read_engine is not engine
+
 Base = declarative_base()
 
 
@@ -17,3 +118,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db(request: Request):
+    """Session for GET handlers: replica, unless the client just wrote (read-your-writes)."""
+    factory = SessionLocal if wants_primary(request) else ReadSessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    factory = AsyncSessionLocal if wants_primary(request) else AsyncReadSessionLocal
+    async with factory() as db:
+        yield db
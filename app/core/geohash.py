@@ -0,0 +1,123 @@
+"""
+Geohash encoding and bounding-box covers.
+
+A geohash interleaves longitude/latitude bits into base32, so nearby points
+share prefixes and every cell is a contiguous range of the sorted column.
+A box can therefore be answered with a few index range scans, one per
+covering cell.
+"""
+import math
+
+GEOHASH_PRECISION = 8  # stored on jobs; ~38m x 19m cells
+EARTH_RADIUS_M = 6_371_008.8  # mean radius; the haversine refine uses the same value
+MAX_COVER_CELLS = 64
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    n_bits = 0
+    even = True  # even bits are longitude
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                bits = (bits << 1) | 1
+                lng_lo = mid
+            else:
+                bits <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+        even = not even
+        n_bits += 1
+        if n_bits == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            n_bits = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """(height, width) of a cell in degrees."""
+    total = 5 * precision
+    lng_bits = (total + 1) // 2
+    lat_bits = total // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def _grid(min_lat: float, min_lng: float, max_lat: float, max_lng: float, precision: int) -> tuple[range, range]:
+    h, w = cell_size(precision)
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0 - 1e-9)
+    min_lng, max_lng = max(min_lng, -180.0), min(max_lng, 180.0 - 1e-9)
+    rows = range(math.floor((min_lat + 90) / h), math.floor((max_lat + 90) / h) + 1)
+    cols = range(math.floor((min_lng + 180) / w), math.floor((max_lng + 180) / w) + 1)
+    return rows, cols
+
+
+def box_cells(min_lat: float, min_lng: float, max_lat: float, max_lng: float, precision: int) -> list[str]:
+    """All cells of the given precision that intersect the box, sorted."""
+    h, w = cell_size(precision)
+    rows, cols = _grid(min_lat, min_lng, max_lat, max_lng, precision)
+    return sorted({encode(-90 + (r + 0.5) * h, -180 + (c + 0.5) * w, precision) for r in rows for c in cols})
+
+
+def cover(min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> list[str]:
+    """
+    Geohash prefixes whose cells cover the box, at the finest precision that
+    needs at most MAX_COVER_CELLS cells. [""] means "everything".
+    """
+    best = [""]
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        rows, cols = _grid(min_lat, min_lng, max_lat, max_lng, precision)
+        if len(rows) * len(cols) > MAX_COVER_CELLS:
+            break
+        best = box_cells(min_lat, min_lng, max_lat, max_lng, precision)
+    return best
+
+
+def _next_cell(prefix: str) -> str:
+    """The cell right after `prefix` in sort order, at the same precision ("" past the end)."""
+    i = _BASE32.index(prefix[-1])
+    if i + 1 < len(_BASE32):
+        return prefix[:-1] + _BASE32[i + 1]
+    head = _next_cell(prefix[:-1]) if len(prefix) > 1 else ""
+    return head + _BASE32[0] if head else ""
+
+
+def cell_ranges(prefixes: list[str]) -> list[tuple[str, str]]:
+    """
+    Merge sorted same-precision cells into [lo, hi) string ranges; cells that
+    are neighbours in Z-order become one range, i.e. one index seek. An empty
+    `hi` means "to the end".
+    """
+    ranges: list[tuple[str, str]] = []
+    for p in prefixes:
+        if ranges and ranges[-1][1] == p:
+            ranges[-1] = (ranges[-1][0], _next_cell(p))
+        else:
+            ranges.append((p, _next_cell(p)))
+    return ranges
+
+
+def radius_box(lat: float, lng: float, radius_m: float) -> tuple[float, float, float, float]:
+    """
+    Smallest box holding every point within `radius_m` great-circle metres
+    of (lat, lng). The widest longitude is reached north or south of the
+    centre, at asin(sin(r) / cos(lat)), not at r / cos(lat).
+    """
+    angle = radius_m / EARTH_RADIUS_M * (1 + 1e-9)  # float headroom: points exactly radius_m away stay inside
+    dlat = math.degrees(angle)
+    s = math.sin(angle) / max(math.cos(math.radians(lat)), 1e-12)
+    dlng = 180.0 if s >= 1.0 else math.degrees(math.asin(s))
+    return lat - dlat, lng - dlng, lat + dlat, lng + dlng
@@ -0,0 +1,38 @@
+"""
+Time-ordered primary keys (UUIDv7, RFC 9562).
+
+IDs keep the canonical 36-char UUID text form, so they live in the same
+String columns as the existing uuid4 values and both keep working side by
+side. New IDs sort by creation time, so inserts land at the right edge of the
+primary-key B-tree instead of scattering across it.
+"""
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_seq = 0
+
+
+def new_id() -> str:
+    global _last_ms, _seq
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            # fresh millisecond: random start leaves headroom for the counter
+            _seq = int.from_bytes(os.urandom(2), "big") & 0x3FF
+        else:
+            # same (or backwards) millisecond: keep monotonic via the 12-bit counter
+            ms = _last_ms
+            _seq += 1
+            if _seq > 0xFFF:
+                ms += 1
+                _seq = 0
+        _last_ms = ms
+        seq = _seq
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (ms & ((1 << 48) - 1)) << 80 | 0x7 << 76 | seq << 64 | 0b10 << 62 | rand_b
+    return str(uuid.UUID(int=value))
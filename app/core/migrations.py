@@ -0,0 +1,533 @@
+"""
+Versioned schema migrations.
+
+Each migration runs once, in order, and is written to be idempotent so that a
+half-applied run (or a database first built by the old create_all-at-import)
+can be brought forward safely. Applied versions live in `schema_migrations`.
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+    bindparam,
+    inspect,
+    select,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import func
+
+from app.core.db import Base
+from app.core.geohash import encode as geohash_encode
+from app.core.ids import new_id
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+)
+
+_PG_LOCK_KEY = 0x70770A  # arbitrary, app-wide advisory lock id
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: int, name: str):
+    def _register(fn: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return fn
+
+    return _register
+
+
+# ---------- helpers (keep migrations self-contained; don't read the models) ----------
+def _has_index(conn: Connection, table: str, name: str) -> bool:
+    return any(ix["name"] == name for ix in inspect(conn).get_indexes(table))
+
+
+def _ensure_index(conn: Connection, table: str, name: str, columns: list[str], unique: bool = False) -> None:
+    if _has_index(conn, table, name):
+        return
+    cols = ", ".join(columns)
+    conn.exec_driver_sql(f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({cols})")
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+# ---------- migrations ----------
+@migration(1, "baseline schema")
+def _baseline(conn: Connection) -> None:
+    # Only ever creates missing tables; existing ones are left alone.
+    import app.models.user  # noqa: F401
+    import app.models.tow_job  # noqa: F401
+    import app.models.photo  # noqa: F401
+    import app.models.event  # noqa: F401
+
+    Base.metadata.create_all(bind=conn, checkfirst=True)
+
+
+@migration(2, "composite indexes for list and dashboard queries")
+def _composite_indexes(conn: Connection) -> None:
+    _ensure_index(conn, "tow_jobs", "ix_tow_jobs_created_at_id", ["created_at", "id"])
+    _ensure_index(conn, "tow_jobs", "ix_tow_jobs_officer_created", ["officer_id", "created_at", "id"])
+    _ensure_index(conn, "tow_jobs", "ix_tow_jobs_driver_created", ["assigned_driver_id", "created_at", "id"])
+    _ensure_index(conn, "tow_jobs", "ix_tow_jobs_status_created", ["status", "created_at", "id"])
+    _ensure_index(conn, "tow_jobs", "ix_tow_jobs_plate_created", ["plate_number", "created_at"])
+    _ensure_index(conn, "tow_job_events", "ix_tow_job_events_job_created", ["tow_job_id", "created_at"])
+    _ensure_index(conn, "users", "ix_users_role_name", ["role", "name"])
+
+
+_NOTE_LINE = re.compile(r"^\[(OFFICER|DRIVER|DISPATCHER|ADMIN)\] ?(.*)$")
+_NOTE_PREVIEW_CHARS = 280
+
+
+def _split_legacy_notes(text: str) -> list[tuple[str | None, str]]:
+    """
+    Old notes were the creation text followed by one "[ROLE] text" line per
+    status update. Returns (role or None for the creation text, body) pairs.
+    """
+    parts: list[tuple[str | None, list[str]]] = []
+    for line in text.splitlines():
+        m = _NOTE_LINE.match(line)
+        if m:
+            parts.append((m.group(1), [m.group(2)]))
+        elif parts:
+            parts[-1][1].append(line)
+        else:
+            parts.append((None, [line]))
+    out = [(role, "\n".join(lines).strip()) for role, lines in parts]
+    return [(role, body) for role, body in out if body]
+
+
+@migration(3, "append-only tow job notes")
+def _job_notes(conn: Connection) -> None:
+    meta = MetaData()
+    jobs = Table(
+        "tow_jobs",
+        meta,
+        Column("id", String, primary_key=True),
+        Column("officer_id", String),
+        Column("notes", Text),
+        Column("created_at", DateTime(timezone=True)),
+        Column("updated_at", DateTime(timezone=True)),
+    )
+    users = Table("users", meta, Column("id", String, primary_key=True), Column("role", String))
+    notes = Table(
+        "tow_job_notes",
+        meta,
+        Column("id", String, primary_key=True),
+        Column("tow_job_id", String, ForeignKey("tow_jobs.id"), nullable=False),
+        Column("author_user_id", String, ForeignKey("users.id"), index=True, nullable=True),
+        Column("author_role", String, nullable=True),
+        Column("body", Text, nullable=False),
+        Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+        Index("ix_tow_job_notes_job_id", "tow_job_id", "id"),
+    )
+    notes.create(bind=conn, checkfirst=True)
+
+    # Jobs that already have note rows were handled by an earlier partial run.
+    legacy = conn.execute(
+        select(jobs.c.id, jobs.c.officer_id, users.c.role, jobs.c.notes, jobs.c.created_at, jobs.c.updated_at)
+        .join(users, users.c.id == jobs.c.officer_id, isouter=True)
+        .where(jobs.c.notes.is_not(None), ~jobs.c.id.in_(select(notes.c.tow_job_id)))
+        .order_by(jobs.c.created_at, jobs.c.id)
+    ).all()
+    for job_id, officer_id, officer_role, text, created_at, updated_at in legacy:
+        rows = []
+        for role, body in _split_legacy_notes(text):
+            rows.append(
+                {
+                    "id": new_id(),  # time-ordered: keeps the original order within the job
+                    "tow_job_id": job_id,
+                    # Only the officer is known for sure (officers can only touch their own jobs).
+                    "author_user_id": officer_id if role in (None, "OFFICER") else None,
+                    "author_role": officer_role if role is None else role,
+                    "body": body,
+                    "created_at": created_at if role is None else (updated_at or created_at),
+                }
+            )
+        preview = None
+        if rows:
+            conn.execute(notes.insert(), rows)
+            preview = " ".join(rows[-1]["body"].split())
+            if len(preview) > _NOTE_PREVIEW_CHARS:
+                preview = preview[: _NOTE_PREVIEW_CHARS - 1].rstrip() + "…"
+        conn.execute(jobs.update().where(jobs.c.id == job_id).values(notes=preview))
+
+
+@migration(4, "job counters per driver and status")
+def _job_counters(conn: Connection) -> None:
+    meta = MetaData()
+    counters = Table(
+        "tow_job_counters",
+        meta,
+        Column("driver_id", String, primary_key=True),
+        Column("status", String, primary_key=True),
+        Column("count", Integer, nullable=False, default=0),
+    )
+    counters.create(bind=conn, checkfirst=True)
+
+    # Seed from the current jobs; rerunning simply recomputes.
+    conn.execute(counters.delete())
+    rows = [
+        {"driver_id": "", "status": status, "count": n}
+        for status, n in conn.exec_driver_sql("SELECT status, COUNT(*) FROM tow_jobs GROUP BY status")
+    ]
+    rows += [
+        {"driver_id": driver_id, "status": status, "count": n}
+        for driver_id, status, n in conn.exec_driver_sql(
+            "SELECT assigned_driver_id, status, COUNT(*) FROM tow_jobs "
+            "WHERE assigned_driver_id IS NOT NULL GROUP BY assigned_driver_id, status"
+        )
+    ]
+    if rows:
+        conn.execute(counters.insert(), rows)
+
+
+def _plate_key(plate: str) -> str:
+    # frozen copy of app.services.plates.normalize_plate
+    return "".join(ch for ch in plate.upper() if ch.isalnum())
+
+
+@migration(5, "normalized plate keys and plate search index")
+def _plate_search(conn: Connection) -> None:
+    dialect = conn.dialect.name
+    if not _has_column(conn, "tow_jobs", "plate_key"):
+        conn.exec_driver_sql("ALTER TABLE tow_jobs ADD COLUMN plate_key VARCHAR")
+
+    meta = MetaData()
+    jobs = Table(
+        "tow_jobs",
+        meta,
+        Column("id", String, primary_key=True),
+        Column("plate_number", String),
+        Column("plate_key", String),
+        Column("created_at", DateTime(timezone=True)),
+    )
+    plates = Table(
+        "plate_offenses",
+        meta,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("plate_key", String, unique=True, nullable=False),
+        Column("plate_number", String, nullable=False),
+        Column("offense_count", Integer, nullable=False, default=0),
+        Column("last_seen_at", DateTime(timezone=True), nullable=True),
+    )
+    plates.create(bind=conn, checkfirst=True)
+
+    # Backfill keys in batches, keyed on id so memory stays flat on big tables.
+    last_id = ""
+    while True:
+        batch = conn.execute(
+            select(jobs.c.id, jobs.c.plate_number)
+            .where(jobs.c.plate_key.is_(None), jobs.c.id > last_id)
+            .order_by(jobs.c.id)
+            .limit(5000)
+        ).all()
+        if not batch:
+            break
+        conn.execute(
+            jobs.update().where(jobs.c.id == bindparam("b_id")).values(plate_key=bindparam("b_key")),
+            [{"b_id": job_id, "b_key": _plate_key(plate)} for job_id, plate in batch],
+        )
+        last_id = batch[-1][0]
+    _ensure_index(conn, "tow_jobs", "ix_tow_jobs_plate_key_created", ["plate_key", "created_at", "id"])
+
+    # Recompute per-plate counts from scratch (idempotent).
+    conn.execute(plates.delete())
+    conn.execute(
+        plates.insert().from_select(
+            ["plate_key", "plate_number", "offense_count", "last_seen_at"],
+            select(
+                jobs.c.plate_key,
+                func.max(jobs.c.plate_number),
+                func.count(),
+                func.max(jobs.c.created_at),
+            )
+            .where(jobs.c.plate_key.is_not(None), jobs.c.plate_key != "")
+            .group_by(jobs.c.plate_key),
+        )
+    )
+
+    if dialect == "sqlite":
+        conn.exec_driver_sql(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS plate_offenses_fts "
+            "USING fts5(plate_key, content='plate_offenses', content_rowid='id', tokenize='trigram')"
+        )
+        # plate_key never changes, so only inserts and deletes touch the index
+        conn.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS plate_offenses_fts_ai AFTER INSERT ON plate_offenses BEGIN "
+            "INSERT INTO plate_offenses_fts(rowid, plate_key) VALUES (new.id, new.plate_key); END"
+        )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS plate_offenses_fts_ad AFTER DELETE ON plate_offenses BEGIN "
+            "INSERT INTO plate_offenses_fts(plate_offenses_fts, rowid, plate_key) "
+            "VALUES ('delete', old.id, old.plate_key); END"
+        )
+        conn.exec_driver_sql("INSERT INTO plate_offenses_fts(plate_offenses_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_plate_offenses_key_trgm ON plate_offenses USING gin (plate_key gin_trgm_ops)"
+        )
+
+
+@migration(6, "user directory search: phone digits, name full-text, keyset index")
+def _user_search(conn: Connection) -> None:
+    dialect = conn.dialect.name
+    if not _has_column(conn, "users", "phone_digits"):
+        conn.exec_driver_sql("ALTER TABLE users ADD COLUMN phone_digits VARCHAR")
+
+    meta = MetaData()
+    users = Table(
+        "users", meta, Column("id", String, primary_key=True), Column("phone", String), Column("phone_digits", String)
+    )
+    rows = conn.execute(select(users.c.id, users.c.phone).where(users.c.phone_digits.is_(None))).all()
+    if rows:
+        conn.execute(
+            users.update().where(users.c.id == bindparam("b_id")).values(phone_digits=bindparam("b_digits")),
+            # frozen copy of app.models.user.normalize_phone
+            [{"b_id": user_id, "b_digits": "".join(ch for ch in phone if ch.isdigit())} for user_id, phone in rows],
+        )
+    _ensure_index(conn, "users", "ix_users_phone_digits", ["phone_digits"])
+
+    _ensure_index(conn, "users", "ix_users_role_name_id", ["role", "name", "id"])
+    if _has_index(conn, "users", "ix_users_role_name"):
+        conn.exec_driver_sql("DROP INDEX ix_users_role_name")  # prefix of the index above
+
+    if dialect == "sqlite":
+        # Own content (users has no stable integer rowid); triggers keep it in step.
+        conn.exec_driver_sql(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS users_name_fts "
+            "USING fts5(name, user_id UNINDEXED, tokenize='unicode61 remove_diacritics 2')"
+        )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS users_name_fts_ai AFTER INSERT ON users BEGIN "
+            "INSERT INTO users_name_fts(name, user_id) VALUES (new.name, new.id); END"
+        )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS users_name_fts_au AFTER UPDATE OF name ON users BEGIN "
+            "UPDATE users_name_fts SET name = new.name WHERE user_id = old.id; END"
+        )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS users_name_fts_ad AFTER DELETE ON users BEGIN "
+            "DELETE FROM users_name_fts WHERE user_id = old.id; END"
+        )
+        conn.exec_driver_sql("DELETE FROM users_name_fts")
+        conn.exec_driver_sql("INSERT INTO users_name_fts(name, user_id) SELECT name, id FROM users")
+    elif dialect == "postgresql":
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_users_name_tsv ON users USING gin (to_tsvector('simple', name))"
+        )
+
+
+@migration(7, "geohash cell column and spatial cover index")
+def _job_geohash(conn: Connection) -> None:
+    if not _has_column(conn, "tow_jobs", "geohash"):
+        conn.exec_driver_sql("ALTER TABLE tow_jobs ADD COLUMN geohash VARCHAR")
+
+    jobs = Table(
+        "tow_jobs",
+        MetaData(),
+        Column("id", String, primary_key=True),
+        Column("location_lat", Float),
+        Column("location_lng", Float),
+        Column("geohash", String),
+    )
+    last_id = ""
+    while True:
+        batch = conn.execute(
+            select(jobs.c.id, jobs.c.location_lat, jobs.c.location_lng)
+            .where(jobs.c.geohash.is_(None), jobs.c.id > last_id)
+            .order_by(jobs.c.id)
+            .limit(5000)
+        ).all()
+        if not batch:
+            break
+        conn.execute(
+            jobs.update().where(jobs.c.id == bindparam("b_id")).values(geohash=bindparam("b_hash")),
+            # geohash is a fixed encoding; the precision is pinned here
+            [{"b_id": job_id, "b_hash": geohash_encode(lat, lng, 8)} for job_id, lat, lng in batch],
+        )
+        last_id = batch[-1][0]
+    _ensure_index(
+        conn, "tow_jobs", "ix_tow_jobs_status_geohash", ["status", "geohash", "location_lat", "location_lng", "id"]
+    )
+
+
+@migration(8, "driver track points")
+def _driver_track(conn: Connection) -> None:
+    meta = MetaData()
+    Table("users", meta, Column("id", String, primary_key=True))
+    track = Table(
+        "driver_track_points",
+        meta,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("driver_id", String, ForeignKey("users.id"), nullable=False),
+        Column("lat", Float, nullable=False),
+        Column("lng", Float, nullable=False),
+        Column("accuracy_m", Float, nullable=True),
+        Column("recorded_at", DateTime(timezone=True), nullable=False),
+    )
+    track.create(bind=conn, checkfirst=True)
+    _ensure_index(conn, "driver_track_points", "ix_driver_track_points_driver_recorded", ["driver_id", "recorded_at"])
+
+
+@migration(9, "watermarks and heatmap tiles")
+def _heatmap_tiles(conn: Connection) -> None:
+    meta = MetaData()
+    Table(
+        "watermarks",
+        meta,
+        Column("name", String, primary_key=True),
+        Column("position", Text, nullable=True),
+        Column("updated_at", DateTime(timezone=True), nullable=True),
+    )
+    Table(
+        "heatmap_tiles",
+        meta,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("x", Integer, nullable=False),
+        Column("y", Integer, nullable=False),
+        Column("day", Date, nullable=False),
+        Column("violation_type", String, nullable=False),
+        Column("total", Integer, nullable=False),
+        Column("counts", LargeBinary, nullable=False),
+        Column("updated_at", DateTime(timezone=True), nullable=True),
+        UniqueConstraint("x", "y", "day", "violation_type", name="uq_heatmap_tiles_key"),
+    )
+    meta.create_all(bind=conn, checkfirst=True)
+
+
+@migration(10, "KPI milestones and daily rollups")
+def _kpi_rollups(conn: Connection) -> None:
+    meta = MetaData()
+    Table(
+        "tow_job_milestones",
+        meta,
+        Column("tow_job_id", String, primary_key=True),
+        Column("officer_id", String, nullable=True),
+        Column("driver_id", String, nullable=True),
+        Column("created_at", DateTime(timezone=True), nullable=True),
+        Column("assigned_at", DateTime(timezone=True), nullable=True),
+        Column("arrived_at", DateTime(timezone=True), nullable=True),
+        Column("towed_at", DateTime(timezone=True), nullable=True),
+    )
+    Table(
+        "kpi_daily",
+        meta,
+        Column("day", Date, primary_key=True),
+        Column("dimension", String, primary_key=True),
+        Column("subject_id", String, primary_key=True),
+        Column("metric", String, primary_key=True),
+        Column("count", Integer, nullable=False),
+        Column("sum_s", Float, nullable=False),
+        Column("min_s", Float, nullable=True),
+        Column("max_s", Float, nullable=True),
+        Column("histogram", LargeBinary, nullable=False),
+    )
+    meta.create_all(bind=conn, checkfirst=True)
+    _ensure_index(conn, "kpi_daily", "ix_kpi_daily_dimension_day", ["dimension", "day"])
+    _ensure_index(conn, "tow_job_events", "ix_tow_job_events_created_id", ["created_at", "id"])
+
+
+@migration(11, "database-assigned insert time on tow job events")
+def _event_inserted_at(conn: Connection) -> None:
+    if not _has_column(conn, "tow_job_events", "inserted_at"):
+        # Existing rows take their created_at, so a KPI watermark on
+        # (created_at, id) stays valid as one on (inserted_at, id).
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("ALTER TABLE tow_job_events ADD COLUMN inserted_at TIMESTAMP WITH TIME ZONE")
+            conn.exec_driver_sql("UPDATE tow_job_events SET inserted_at = created_at")
+            conn.exec_driver_sql("ALTER TABLE tow_job_events ALTER COLUMN inserted_at SET DEFAULT now()")
+            conn.exec_driver_sql("ALTER TABLE tow_job_events ALTER COLUMN inserted_at SET NOT NULL")
+        else:
+            conn.exec_driver_sql("ALTER TABLE tow_job_events ADD COLUMN inserted_at DATETIME")
+            conn.exec_driver_sql("UPDATE tow_job_events SET inserted_at = created_at")
+            # SQLite's ADD COLUMN can't take a CURRENT_TIMESTAMP default; stamp new rows instead
+            conn.exec_driver_sql(
+                "CREATE TRIGGER IF NOT EXISTS tow_job_events_inserted_at AFTER INSERT ON tow_job_events "
+                "WHEN new.inserted_at IS NULL BEGIN "
+                "UPDATE tow_job_events SET inserted_at = CURRENT_TIMESTAMP WHERE rowid = new.rowid; END"
+            )
+    _ensure_index(conn, "tow_job_events", "ix_tow_job_events_inserted_id", ["inserted_at", "id"])
+    if _has_index(conn, "tow_job_events", "ix_tow_job_events_created_id"):
+        conn.exec_driver_sql("DROP INDEX ix_tow_job_events_created_id")
+
+
+# ---------- runner ----------
+def _lock(conn: Connection) -> None:
+    """Serialize concurrent runners (several workers booting at once)."""
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({_PG_LOCK_KEY})")
+    elif dialect == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version(engine: Engine) -> int:
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(schema_migrations.name):
+            return 0
+        return conn.execute(select(func.coalesce(func.max(schema_migrations.c.version), 0))).scalar_one()
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    """Apply pending migrations in one locked transaction. Returns versions applied."""
+    applied_now: list[int] = []
+    with engine.connect() as conn:
+        _lock(conn)
+        schema_migrations.create(bind=conn, checkfirst=True)
+        done = set(conn.execute(select(schema_migrations.c.version)).scalars())
+        for m in MIGRATIONS:
+            if m.version in done:
+                continue
+            m.apply(conn)
+            conn.execute(schema_migrations.insert().values(version=m.version, name=m.name))
+            applied_now.append(m.version)
+        conn.commit()
+    return applied_now
+
+
+def ensure_schema(engine: Engine, auto_migrate: bool) -> None:
+    """Cheap startup check: one query when the schema is already current."""
+    version = current_version(engine)
+    if version >= latest_version():
+        return
+    if not auto_migrate:
+        raise RuntimeError(
+            f"Database schema is at version {version}, app needs {latest_version()}. "
+            "Run `python -m app.cli init` (or set AUTO_MIGRATE=true)."
+        )
+    run_migrations(engine)
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User
+
+_PRINCIPAL_COLUMNS = ("id", "name", "phone", "role", "password_hash", "is_active", "created_at")
+
+
+class PrincipalCache:
+    """
+    Bounded TTL cache of resolved users, keyed by user id.
+    Stores plain column snapshots (never live ORM instances) so a cached
+    principal can't leak across sessions or threads.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._items: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, user_id: str) -> Optional[User]:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None:
+                return None
+            expires_at, snapshot = item
+            if expires_at <= now:
+                del self._items[user_id]
+                return None
+            self._items.move_to_end(user_id)
+        return User(**snapshot)
+
+    def put(self, user: User) -> None:
+        if not self.enabled:
+            return
+        snapshot = {c: getattr(user, c) for c in _PRINCIPAL_COLUMNS}
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._items[user.id] = (expires_at, snapshot)
+            self._items.move_to_end(user.id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._items.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+)
+
+
+def load_principal(db: Session, user_id: str) -> Optional[User]:
+    """
+    Resolve the user behind a token, serving repeat lookups from the cache.
+    Inactive users are returned too; callers decide how to reject them.
+    """
+    if not user_id:
+        return None
+
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        principal_cache.put(user)
+    return user
+
+
+async def load_principal_async(db: AsyncSession, user_id: str) -> Optional[User]:
+    if not user_id:
+        return None
+
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+    if user is not None:
+        principal_cache.put(user)
+    return user
+
+
+def invalidate_principal(user_id: str) -> None:
+    principal_cache.invalidate(user_id)
@@ -0,0 +1,58 @@
+import time
+
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+READ_PRIMARY_HEADER = "x-read-primary"  # API clients without cookies: send "X-Read-Primary: 1"
+_TRUTHY = {"1", "true", "yes", "on"}
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Writes whose result is never read back from the database: driver pings
+# land in the in-memory location store, and pinning every driver to the
+# primary on each ping would leave the replica with no driver traffic.
+_UNPINNED_PATHS = {"/drivers/location"}
+
+
+def wants_primary(conn: HTTPConnection) -> bool:
+    """True when this client wrote recently (or asked explicitly) and must not see replica lag."""
+    if conn.headers.get(READ_PRIMARY_HEADER, "").strip().lower() in _TRUTHY:
+        return True
+    until = conn.cookies.get(READ_PRIMARY_COOKIE)
+    if not until:
+        return False
+    try:
+        return float(until) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """
+    After any successful mutation (outside _UNPINNED_PATHS), pin the client's
+    reads to the primary for READ_AFTER_WRITE_SECONDS via a short-lived
+    cookie. Plain ASGI so it adds no per-request overhead beyond one header
+    on write responses.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS or scope["path"] in _UNPINNED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                ttl = settings.READ_AFTER_WRITE_SECONDS
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE}={time.time() + ttl:.3f}; Max-Age={ttl}; Path=/; HttpOnly; SameSite=lax"
+                )
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
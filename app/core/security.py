@@ -1,3 +1,9 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from jose import jwt
@@ -6,7 +12,19 @@ from argon2.exceptions import VerifyMismatchError
 
 from app.core.config import settings
 
-ph = PasswordHasher()  # Argon2id by default
+ph = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST_KB,
+    parallelism=settings.ARGON2_PARALLELISM,
+)  # Argon2id by default
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated; callers should answer 503."""
+
+
+_hash_pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="argon2")
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE)
 
 
 def hash_password(password: str) -> str:
@@ -20,15 +38,91 @@ def verify_password(password: str, password_hash: str) -> bool:
         return False
 
 
+def _submit_hash_job(fn, *args) -> Future:
+    # Admission control: never queue more than workers + MAX_QUEUE jobs.
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        fut = _hash_pool.submit(fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    fut.add_done_callback(lambda _f: _hash_slots.release())
+    return fut
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await asyncio.wrap_future(_submit_hash_job(verify_password, password, password_hash))
+
+
+def hash_password_pooled(password: str) -> str:
+    """
+    Sync variant for threadpool handlers (admin create/reset): same bounded
+    pool and admission error, so admin traffic can't pile onto a login burst.
+    """
+    return _submit_hash_job(hash_password, password).result()
+
+
 def create_access_token(subject: str, role: str) -> str:
     expire = datetime.utcnow() + timedelta(minutes=settings.JWT_EXPIRE_MINUTES)
     payload = {"sub": subject, "role": role, "exp": expire}
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALG)
 
 
-def decode_token(token: str) -> dict:
+class _VerifiedTokenCache:
+    """
+    LRU of already-verified token payloads, keyed by SHA-256 of the token.
+    Entries expire at the token's own `exp`, so a cache hit is never more
+    permissive than a fresh decode.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> dict | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            exp, payload = item
+            if exp <= time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return dict(payload)
+
+    def put(self, key: bytes, payload: dict) -> None:
+        exp = payload.get("exp")
+        if self.max_size <= 0 or not isinstance(exp, (int, float)):
+            return
+        with self._lock:
+            self._items[key] = (float(exp), dict(payload))
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+token_cache = _VerifiedTokenCache(settings.TOKEN_CACHE_MAX_SIZE)
+
+
+def _verify_token(token: str) -> dict:
     return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
 
+
+def decode_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = _verify_token(token)
+        token_cache.put(key, payload)
+    return payload
+
 # from datetime import datetime, timedelta
 # from typing import Optional
 
@@ -1,32 +1,79 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
-from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.db import Base, engine, SessionLocal
+from app.core.db import async_engine, async_read_engine, engine, has_read_replica, read_engine
+from app.core.migrations import ensure_schema
+from app.core.read_your_writes import ReadYourWritesMiddleware
 from app.routers.auth import router as auth_router
 from app.routers.tow_jobs import router as tow_jobs_router
 from app.routers.users import router as users_router
+from app.routers.drivers import router as drivers_router
 from app.routers.admin import router as admin_router
-from app.services.seed import seed_users
+from app.routers.heatmap import router as heatmap_router
+from app.routers.analytics import router as analytics_router
 from app.web.router import router as web_router
+from app.services import counters, driver_locations, event_log, heatmap, kpi_rollups
 
-# Import models so SQLAlchemy registers them before create_all()
+# Import models so SQLAlchemy registers them before migrations run
 import app.models.user  # noqa: F401
 import app.models.tow_job  # noqa: F401
 import app.models.photo  # noqa: F401
 import app.models.event  # noqa: F401
+import app.models.note  # noqa: F401
+import app.models.counter  # noqa: F401
+import app.models.plate  # noqa: F401
+import app.models.driver_location  # noqa: F401
+import app.models.watermark  # noqa: F401
+import app.models.heatmap  # noqa: F401
+import app.models.kpi  # noqa: F401
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema setup and seeding live in `python -m app.cli init`; workers only
+    # verify the version so they can start serving quickly.
+    ensure_schema(engine, auto_migrate=settings.AUTO_MIGRATE)
+    event_log.start()
+    await driver_locations.start()
+    reconciler = None
+    if settings.COUNTERS_RECONCILE_SECONDS > 0:
+        reconciler = asyncio.create_task(counters.reconcile_periodically(engine, settings.COUNTERS_RECONCILE_SECONDS))
+    heatmap_refresher = None
+    if settings.HEATMAP_REFRESH_SECONDS > 0:
+        heatmap_refresher = asyncio.create_task(heatmap.refresh_periodically(engine, settings.HEATMAP_REFRESH_SECONDS))
+    kpi_refresher = None
+    if settings.KPI_REFRESH_SECONDS > 0:
+        kpi_refresher = asyncio.create_task(kpi_rollups.refresh_periodically(engine, settings.KPI_REFRESH_SECONDS))
+    yield
+    for task in (reconciler, heatmap_refresher, kpi_refresher):
+        if task:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await driver_locations.stop()
+    event_log.stop()
+    await async_engine.dispose()
+    engine.dispose()
+    if has_read_replica():
+        await async_read_engine.dispose()
+        read_engine.dispose()
 
-app = FastAPI(title=settings.APP_NAME, version="0.1.0")
 
-Base.metadata.create_all(bind=engine)
+app = FastAPI(title=settings.APP_NAME, version="0.1.0", lifespan=lifespan)
 
-with SessionLocal() as db:  # type: Session
-    seed_users(db)
+if has_read_replica():
+    app.add_middleware(ReadYourWritesMiddleware)
 
 app.include_router(auth_router)
 app.include_router(tow_jobs_router)
 app.include_router(users_router)
+app.include_router(drivers_router)
 app.include_router(admin_router)
+app.include_router(heatmap_router)
+app.include_router(analytics_router)
 app.include_router(web_router)
 
 
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer
+
+from app.core.db import Base
+
+
+class TowJobCounter(Base):
+    """
+    Live job counts per (driver, status), kept in step with tow_jobs by
+    app.services.counters. driver_id "" holds the all-drivers totals.
+    """
+
+    __tablename__ = "tow_job_counters"
+
+    driver_id = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Index, Integer
+
+from app.core.db import Base
+
+
+class DriverTrackPoint(Base):
+    """
+    Driver breadcrumbs, written in batches by app.services.driver_locations.
+    Kept narrow on purpose (integer key, no audit columns): it is the
+    highest-volume table in the app. The latest position per driver lives in
+    memory, not here.
+    """
+
+    __tablename__ = "driver_track_points"
+    __table_args__ = (Index("ix_driver_track_points_driver_recorded", "driver_id", "recorded_at"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    driver_id = Column(String, ForeignKey("users.id"), nullable=False)
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
+    accuracy_m = Column(Float, nullable=True)
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
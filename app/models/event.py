@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Text
 from sqlalchemy.sql import func
 
 from app.core.db import Base
@@ -6,6 +6,11 @@ from app.core.db import Base
 
 class TowJobEvent(Base):
     __tablename__ = "tow_job_events"
+    __table_args__ = (
+        Index("ix_tow_job_events_job_created", "tow_job_id", "created_at"),
+        # KPI rollups read the log forward in (inserted_at, id) order
+        Index("ix_tow_job_events_inserted_id", "inserted_at", "id"),
+    )
 
     id = Column(String, primary_key=True)  # uuid
     tow_job_id = Column(String, ForeignKey("tow_jobs.id"), index=True, nullable=False)
@@ -15,3 +20,6 @@ class TowJobEvent(Base):
     message = Column(Text, nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # when the row reached the table, always set by the database; write-behind
+    # stamps created_at in the app, so replayed or retried events land late
+    inserted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
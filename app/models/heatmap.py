@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Date, DateTime, Integer, LargeBinary, UniqueConstraint
+
+from app.core.db import Base
+
+
+class HeatmapTile(Base):
+    """
+    Job counts for one map tile, one UTC day and one violation type, as a
+    zlib-compressed little-endian uint32 array of shape (24 hours, GRID, GRID).
+    Maintained incrementally by app.services.heatmap; violation_type "" holds
+    jobs without one.
+    """
+
+    __tablename__ = "heatmap_tiles"
+    __table_args__ = (UniqueConstraint("x", "y", "day", "violation_type", name="uq_heatmap_tiles_key"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    x = Column(Integer, nullable=False)
+    y = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False)
+    violation_type = Column(String, nullable=False, default="")
+    total = Column(Integer, nullable=False, default=0)
+    counts = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
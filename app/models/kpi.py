@@ -0,0 +1,42 @@
+from sqlalchemy import Column, String, Date, DateTime, Float, Index, Integer, LargeBinary
+
+from app.core.db import Base
+
+
+class TowJobMilestone(Base):
+    """
+    When a job reached each KPI milestone, paired up from tow_job_events by
+    app.services.kpi_rollups. assigned_at/driver_id follow reassignments
+    until the job arrives.
+    """
+
+    __tablename__ = "tow_job_milestones"
+
+    tow_job_id = Column(String, primary_key=True)
+    officer_id = Column(String, nullable=True)
+    driver_id = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    assigned_at = Column(DateTime(timezone=True), nullable=True)
+    arrived_at = Column(DateTime(timezone=True), nullable=True)
+    towed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class KpiDaily(Base):
+    """
+    Duration stats per UTC day, metric and subject. dimension is "all",
+    "driver" or "officer" (subject_id "" for "all"); histogram holds
+    little-endian uint32 counts over app.services.kpi_rollups.HIST_EDGES.
+    """
+
+    __tablename__ = "kpi_daily"
+    __table_args__ = (Index("ix_kpi_daily_dimension_day", "dimension", "day"),)
+
+    day = Column(Date, primary_key=True)
+    dimension = Column(String, primary_key=True)
+    subject_id = Column(String, primary_key=True)
+    metric = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    sum_s = Column(Float, nullable=False, default=0.0)
+    min_s = Column(Float, nullable=True)
+    max_s = Column(Float, nullable=True)
+    histogram = Column(LargeBinary, nullable=False)
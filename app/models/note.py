@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Text
+from sqlalchemy.sql import func
+
+from app.core.db import Base
+
+
+class TowJobNote(Base):
+    """Append-only; never updated. TowJob.notes carries a preview of the latest one."""
+
+    __tablename__ = "tow_job_notes"
+    # ids are time-ordered (UUIDv7), so (tow_job_id, id) is also chronological
+    __table_args__ = (Index("ix_tow_job_notes_job_id", "tow_job_id", "id"),)
+
+    id = Column(String, primary_key=True)  # uuid
+    tow_job_id = Column(String, ForeignKey("tow_jobs.id"), nullable=False)
+    author_user_id = Column(String, ForeignKey("users.id"), index=True, nullable=True)  # null: unknown (migrated)
+    author_role = Column(String, nullable=True)  # role at the time of writing
+
+    body = Column(Text, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, Integer
+
+from app.core.db import Base
+
+
+class PlateOffense(Base):
+    """
+    One row per normalized plate with its job count, for repeat-offender search.
+    Kept in step with tow_jobs by app.services.plates. The integer id is the
+    stable rowid the SQLite FTS5 index points at.
+    """
+
+    __tablename__ = "plate_offenses"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    plate_key = Column(String, unique=True, nullable=False)  # normalize_plate(plate_number)
+    plate_number = Column(String, nullable=False)  # as most recently written
+    offense_count = Column(Integer, nullable=False, default=0)
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,8 +1,10 @@
 import enum
-from sqlalchemy import Column, String, DateTime, Enum, Float, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Enum, Float, Text, ForeignKey, Index
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 
 from app.core.db import Base
+from app.core.geohash import encode as geohash_encode
 
 
 class TowStatus(str, enum.Enum):
@@ -15,12 +17,30 @@ class TowStatus(str, enum.Enum):
     CANCELLED = "CANCELLED"
 
 
+# A job is open until it is closed or cancelled; TOWED still counts (the
+# vehicle is in the yard, the job is not settled)
+CLOSED_STATUSES = (TowStatus.CLOSED, TowStatus.CANCELLED)
+OPEN_STATUSES = tuple(s for s in TowStatus if s not in CLOSED_STATUSES)
+
+
 class TowJob(Base):
     __tablename__ = "tow_jobs"
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), newest first, per filter
+        Index("ix_tow_jobs_created_at_id", "created_at", "id"),
+        Index("ix_tow_jobs_officer_created", "officer_id", "created_at", "id"),
+        Index("ix_tow_jobs_driver_created", "assigned_driver_id", "created_at", "id"),
+        Index("ix_tow_jobs_status_created", "status", "created_at", "id"),
+        Index("ix_tow_jobs_plate_created", "plate_number", "created_at"),
+        Index("ix_tow_jobs_plate_key_created", "plate_key", "created_at", "id"),
+        # Nearby search: one range scan per (status, geohash cell range), covering position and id
+        Index("ix_tow_jobs_status_geohash", "status", "geohash", "location_lat", "location_lng", "id"),
+    )
 
     id = Column(String, primary_key=True)  # uuid string
 
     plate_number = Column(String, index=True, nullable=False)
+    plate_key = Column(String, nullable=True)  # normalize_plate(plate_number): "AB-123 " -> "AB123"
     officer_id = Column(String, ForeignKey("users.id"), index=True, nullable=False)
 
     status = Column(Enum(TowStatus), default=TowStatus.NEW, nullable=False)
@@ -28,11 +48,37 @@ class TowJob(Base):
     assigned_driver_id = Column(String, ForeignKey("users.id"), index=True, nullable=True)
 
     violation_type = Column(String, nullable=True)
-    notes = Column(Text, nullable=True)
+    notes = Column(Text, nullable=True)  # preview of the latest tow_job_notes row, not the history
 
     location_lat = Column(Float, nullable=False)
     location_lng = Column(Float, nullable=False)
     location_accuracy_m = Column(Float, nullable=True)
+    geohash = Column(String, nullable=True)  # app.core.geohash.encode(lat, lng), kept in sync below
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+
+    @validates("location_lat", "location_lng")
+    def _sync_geohash(self, key: str, value: float) -> float:
+        lat = value if key == "location_lat" else self.location_lat
+        lng = value if key == "location_lng" else self.location_lng
+        if lat is not None and lng is not None:
+            self.geohash = geohash_encode(lat, lng)
+        return value
+
+
+# Columns list endpoints and dashboards project instead of loading entities
+# (skips updated_at and the identity map).
+TOW_JOB_LIST_COLUMNS = (
+    TowJob.id,
+    TowJob.plate_number,
+    TowJob.officer_id,
+    TowJob.status,
+    TowJob.assigned_driver_id,
+    TowJob.violation_type,
+    TowJob.notes,
+    TowJob.location_lat,
+    TowJob.location_lng,
+    TowJob.location_accuracy_m,
+    TowJob.created_at,
+)
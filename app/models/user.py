@@ -1,5 +1,6 @@
 import enum
-from sqlalchemy import Column, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, Index
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 
 from app.core.db import Base
@@ -12,13 +13,28 @@ class UserRole(str, enum.Enum):
     ADMIN = "ADMIN"
 
 
+def normalize_phone(phone: str) -> str:
+    """Digits only, e.g. '+252 63-400 0001' -> '252634000001'; what phone search matches."""
+    return "".join(ch for ch in phone if ch.isdigit())
+
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin directory: ORDER BY role, name, id with keyset pagination
+        Index("ix_users_role_name_id", "role", "name", "id"),
+    )
 
     id = Column(String, primary_key=True)  # uuid string
     name = Column(String, nullable=False)
     phone = Column(String, unique=True, index=True, nullable=False)
+    phone_digits = Column(String, index=True, nullable=True)  # normalize_phone(phone)
     role = Column(Enum(UserRole), nullable=False)
     password_hash = Column(String, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    @validates("phone")
+    def _sync_phone_digits(self, key: str, value: str) -> str:
+        self.phone_digits = normalize_phone(value) if value else None
+        return value
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, Text
+
+from app.core.db import Base
+
+
+class Watermark(Base):
+    """
+    How far an incremental job (heatmap aggregation, rollups) has read its
+    source table. `position` is the job's own JSON keyset position; it moves in
+    the same transaction as the results it covers.
+    """
+
+    __tablename__ = "watermarks"
+
+    name = Column(String, primary_key=True)
+    position = Column(Text, nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
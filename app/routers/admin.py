@@ -1,16 +1,22 @@
 from __future__ import annotations
 
-import uuid
+import json
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.core.auth import require_roles
-from app.core.db import get_db
-from app.core.security import hash_password
+from app.core.db import get_db, get_read_db
+from app.core.ids import new_id
+from app.core.principal_cache import invalidate_principal
+from app.core.security import PasswordHasherBusy, hash_password_pooled
 from app.models.user import User, UserRole
+from app.services import driver_locations, event_log
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.services.user_search import body_etag, user_search_stmt
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -35,6 +41,13 @@ class AdminPasswordReset(BaseModel):
     new_password: str = Field(min_length=8, max_length=128)
 
 
+def _hash_or_503(password: str) -> str:
+    try:
+        return hash_password_pooled(password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Password service busy, retry shortly", headers={"Retry-After": "1"})
+
+
 def _user_out(u: User) -> dict:
     return {
         "id": u.id,
@@ -49,22 +62,42 @@ def _user_out(u: User) -> dict:
 # -------- Endpoints (ADMIN-only) --------
 @router.get("/users")
 def admin_list_users(
+    request: Request,
     role: Optional[UserRole] = None,
-    q: Optional[str] = None,
-    db: Session = Depends(get_db),
+    q: Optional[str] = Query(None, max_length=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
     _admin: User = Depends(require_roles(UserRole.ADMIN)),
 ):
-    query = db.query(User)
-
-    if role is not None:
-        query = query.filter(User.role == role)
-
-    if q:
-        like = f"%{q.strip()}%"
-        query = query.filter((User.name.ilike(like)) | (User.phone.ilike(like)))
-
-    users = query.order_by(User.role.asc(), User.name.asc()).all()
-    return [_user_out(u) for u in users]
+    """
+    Ordered by role, name; keyset-paginated via X-Next-Cursor. `q` is a phone
+    prefix (digits) or name word prefixes. Send the ETag back as If-None-Match
+    to get a 304 when the page hasn't changed.
+    """
+    after = None
+    if cursor:
+        a_role, a_name, a_id = decode_cursor(cursor, 3)
+        if a_role not in UserRole.__members__:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (a_role, a_name, a_id)
+
+    stmt = user_search_stmt(db.bind.dialect.name, q=q, role=role, after=after).limit(limit + 1)
+    users = db.execute(stmt).all()
+
+    headers = {"Cache-Control": "private, no-cache"}
+    if len(users) > limit:
+        users = users[:limit]
+        last = users[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.role.value, last.name, last.id)
+
+    body = json.dumps(jsonable_encoder([_user_out(u) for u in users]), separators=(",", ":")).encode("utf-8")
+    # the next-page cursor is part of what the client would re-download
+    etag = body_etag(body + headers.get(NEXT_CURSOR_HEADER, "").encode("ascii"))
+    headers["ETag"] = etag
+    if etag in (request.headers.get("if-none-match") or ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("/users")
@@ -82,11 +115,11 @@ def admin_create_user(
         raise HTTPException(status_code=409, detail="A user with this phone already exists")
 
     user = User(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         name=payload.name.strip(),
         phone=phone,
         role=payload.role,
-        password_hash=hash_password(payload.password),
+        password_hash=_hash_or_503(payload.password),
         is_active=payload.is_active,
     )
     db.add(user)
@@ -133,6 +166,7 @@ def admin_update_user(
         user.is_active = payload.is_active
 
     db.commit()
+    invalidate_principal(user.id)
     db.refresh(user)
     return _user_out(user)
 
@@ -151,6 +185,19 @@ def admin_reset_password(
     if user.id == admin.id:
         raise HTTPException(status_code=400, detail="You cannot reset your own password here")
 
-    user.password_hash = hash_password(payload.new_password)
+    user.password_hash = _hash_or_503(payload.new_password)
     db.commit()
+    invalidate_principal(user.id)
     return {"ok": True}
+
+
+@router.get("/event-log")
+def admin_event_log_metrics(_admin: User = Depends(require_roles(UserRole.ADMIN))):
+    """Write-behind queue depth, flush latency and counters for this worker."""
+    return event_log.writer.metrics()
+
+
+@router.get("/driver-tracking")
+def admin_driver_tracking_metrics(_admin: User = Depends(require_roles(UserRole.ADMIN))):
+    """Ping rate counters, breadcrumb buffer depth and flush stats for this worker."""
+    return driver_locations.writer.metrics()
@@ -0,0 +1,46 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.auth import require_roles
+from app.core.db import get_read_db
+from app.models.user import User, UserRole
+from app.services.kpi_rollups import kpi_summary, rollup_position
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+
+
+@router.get("/kpis")
+def kpis(
+    group_by: Literal["day", "driver", "officer"] = "day",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    _user: User = Depends(require_roles(UserRole.DISPATCHER, UserRole.ADMIN)),
+):
+    """
+    Time to assign / arrive / tow (seconds: count, mean, min, max and
+    approximate p50/p90) per UTC day, driver or officer, from the daily
+    rollups. A duration counts on the day it ended. `as_of` is when the
+    newest event folded in was stored.
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_DAYS} days per request")
+
+    dimension = "all" if group_by == "day" else group_by
+    return {
+        "group_by": group_by,
+        "date_from": date_from,
+        "date_to": date_to,
+        "as_of": rollup_position(db),
+        "rows": kpi_summary(db, dimension, date_from, date_to),
+    }
@@ -1,18 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+from app.core.auth import find_user_by_phone
 from app.core.db import get_db
-from app.core.security import verify_password, create_access_token
-from app.models.user import User
+from app.core.security import PasswordHasherBusy, verify_password_async, create_access_token
 from app.schemas.auth import LoginRequest, TokenResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.phone == payload.phone).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: LoginRequest, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(find_user_by_phone, db, payload.phone)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
+    try:
+        ok = await verify_password_async(payload.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login service busy, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if not ok:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
     token = create_access_token(subject=user.id, role=user.role.value)
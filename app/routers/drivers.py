@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.core.auth import require_roles_async
+from app.models.user import User, UserRole
+from app.schemas.driver import DriverLocationPing, DriverPositionOut
+from app.services.driver_locations import active_positions, record_ping
+
+router = APIRouter(prefix="/drivers", tags=["drivers"])
+
+
+@router.post("/location", status_code=204)
+async def ping_location(
+    ping: DriverLocationPing,
+    user: User = Depends(require_roles_async(UserRole.DRIVER)),
+):
+    """
+    High-frequency position ping from the driver app. Memory-only on the
+    request path (auth comes from the principal cache); breadcrumbs are
+    written in the background.
+    """
+    record_ping(user.id, ping.lat, ping.lng, ping.accuracy_m, ping.recorded_at)
+    return Response(status_code=204)
+
+
+@router.get("/locations", response_model=list[DriverPositionOut])
+async def driver_locations(
+    limit: int = Query(500, ge=1, le=5000),
+    _user: User = Depends(require_roles_async(UserRole.DISPATCHER, UserRole.ADMIN)),
+):
+    """Latest known position of every driver seen within DRIVER_LOCATION_MAX_AGE_SECONDS (this worker's view)."""
+    return active_positions()[:limit]
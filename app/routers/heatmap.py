@@ -0,0 +1,79 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.auth import require_roles
+from app.core.config import settings
+from app.core.db import get_read_db
+from app.models.user import User, UserRole
+from app.models.watermark import Watermark
+from app.services.heatmap import GRID, HEATMAP_ZOOM, MAX_ZOOM_OUT, WATERMARK, render_tile, tile_query
+from app.services.user_search import body_etag
+
+router = APIRouter(prefix="/heatmap", tags=["heatmap"])
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+
+
+@router.get("/tiles/{z}/{x}/{y}")
+def heatmap_tile(
+    request: Request,
+    z: int,
+    x: int,
+    y: int,
+    violation_type: Optional[str] = Query(None, max_length=100),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    hour_from: int = Query(0, ge=0, le=23),
+    hour_to: int = Query(23, ge=0, le=23),
+    db: Session = Depends(get_read_db),
+    _user: User = Depends(require_roles(UserRole.DISPATCHER, UserRole.ADMIN)),
+):
+    """
+    Job density for web-mercator tile z/x/y as sparse [row, col, count] cells
+    of a GRID x GRID raster (row 0 at the north edge). Days are UTC and
+    inclusive (default: the last 30); hours are UTC and wrap when hour_from >
+    hour_to (22..4 is the night shift). The ETag changes only when the tiles
+    are refreshed.
+    """
+    if not HEATMAP_ZOOM - MAX_ZOOM_OUT <= z <= HEATMAP_ZOOM:
+        raise HTTPException(status_code=400, detail=f"z must be between {HEATMAP_ZOOM - MAX_ZOOM_OUT} and {HEATMAP_ZOOM}")
+    if not (0 <= x < 1 << z and 0 <= y < 1 << z):
+        raise HTTPException(status_code=400, detail="Tile out of range")
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_DAYS} days per request")
+    hours = list(range(hour_from, hour_to + 1)) if hour_from <= hour_to else [*range(hour_from, 24), *range(hour_to + 1)]
+
+    # the tiles only change when the watermark moves, so it stands in for the body
+    position = db.execute(select(Watermark.position).where(Watermark.name == WATERMARK)).scalar_one_or_none()
+    key = [position, z, x, y, violation_type, date_from.isoformat(), date_to.isoformat(), hour_from, hour_to]
+    headers = {
+        "Cache-Control": f"private, max-age={settings.HEATMAP_TILE_MAX_AGE_SECONDS}",
+        "ETag": body_etag(json.dumps(key).encode("utf-8")),
+    }
+    if headers["ETag"] in (request.headers.get("if-none-match") or ""):
+        return Response(status_code=304, headers=headers)
+
+    rows = db.execute(tile_query(z, x, y, date_from, date_to, violation_type)).all()
+    raster = render_tile(z, x, y, rows, hours)
+    r, c = np.nonzero(raster)
+    body = {
+        "z": z,
+        "x": x,
+        "y": y,
+        "grid": GRID,
+        "total": int(raster.sum()),
+        "max": int(raster.max()),
+        "cells": np.column_stack((r, c, raster[r, c].astype(np.int64))).tolist(),
+    }
+    return Response(content=json.dumps(body, separators=(",", ":")), media_type="application/json", headers=headers)
@@ -7,35 +7,73 @@
 from __future__ import annotations
 
 import os
-import uuid
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Response, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.auth import get_current_user, require_roles
-from app.core.db import get_db
+from app.core.auth import get_current_user, get_current_user_async, require_roles, require_roles_async
+from app.core.db import get_async_db, get_async_read_db, get_db, get_read_db
+from app.core.geohash import radius_box
+from app.core.ids import new_id
 from app.models.event import TowJobEvent
+from app.models.note import TowJobNote
 from app.models.photo import TowJobPhoto
-from app.models.tow_job import TowJob, TowStatus
+from app.models.tow_job import OPEN_STATUSES, TOW_JOB_LIST_COLUMNS, TowJob, TowStatus
 from app.models.user import User, UserRole
-from app.schemas.tow_job import TowJobAssign, TowJobCreate, TowJobOut, TowJobStatusUpdate
+from app.schemas.driver import NearestDriverOut
+from app.schemas.tow_job import (
+    AutoDispatchRequest,
+    TowJobAssign,
+    TowJobAssignBatch,
+    TowJobAssignResult,
+    TowJobCreate,
+    TowJobListItem,
+    TowJobNearbyItem,
+    TowJobNoteOut,
+    TowJobOut,
+    TowJobStatusUpdate,
+)
+from app.services.bulk_import import IMPORT_FORMATS, detect_format, import_tow_jobs, iter_rows
+from app.services.counters import count_transition, read_counters_async
+from app.services.dispatch import plan_dispatch
+from app.services.driver_locations import nearest_active_drivers
+from app.services.event_log import record_event
+from app.services.evidence_bundle import stream_bundle
+from app.services.export import EXPORT_FORMATS, EXPORT_TABLES, stream_export
+from app.services.geo import MAX_BOX_DEGREES, MAX_RADIUS_M, candidates_stmt, rank
+from app.services.job_notes import add_note
+from app.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    datetime_bound,
+    decode_cursor,
+    encode_cursor,
+    parse_cursor_datetime,
+    prefix_range,
+)
+from app.services.plates import MAX_SEARCH_RESULTS, normalize_plate, plate_search_stmt, record_plate
 from app.services.storage import save_upload_streaming
 
 router = APIRouter(prefix="/tow-jobs", tags=["tow-jobs"])
 
 
-def _log_event(db: Session, tow_job_id: str, actor_user_id: str, event_type: str, message: str | None = None):
-    ev = TowJobEvent(
-        id=str(uuid.uuid4()),
-        tow_job_id=tow_job_id,
-        actor_user_id=actor_user_id,
-        event_type=event_type,
-        message=message,
-    )
-    db.add(ev)
+def _log_event(db: Session | AsyncSession, tow_job_id: str, actor_user_id: str, event_type: str, message: str | None = None):
+    # sync: row joins the request transaction; write_behind: queued after commit
+    record_event(db, tow_job_id, actor_user_id, event_type, message)
+
+
+def _apply_assignment(db: Session, job: TowJob, driver_id: str, actor_user_id: str) -> None:
+    """Shared by single and batch assignment; caller validates the driver and commits."""
+    count_transition(db, job.status, job.assigned_driver_id, TowStatus.ASSIGNED, driver_id)
+    job.assigned_driver_id = driver_id
+    job.status = TowStatus.ASSIGNED
+    _log_event(db, job.id, actor_user_id, "ASSIGNED", f"Assigned to driver {driver_id}")
 
 
 def _assert_job_access(user: User, job: TowJob):
@@ -48,6 +86,13 @@ def _assert_job_access(user: User, job: TowJob):
     raise HTTPException(status_code=403, detail="Not your job")
 
 
+async def _get_job_async(db: AsyncSession, job_id: str) -> TowJob:
+    job = (await db.execute(select(TowJob).where(TowJob.id == job_id))).scalars().first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Tow job not found")
+    return job
+
+
 def _parse_iso_datetime(dt: str | None) -> Optional[datetime]:
     """
     Accepts ISO8601 strings like:
@@ -74,43 +119,295 @@ def create_tow_job(
     user: User = Depends(require_roles(UserRole.OFFICER, UserRole.ADMIN)),
 ):
     job = TowJob(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         plate_number=payload.plate_number.strip().upper(),
+        plate_key=normalize_plate(payload.plate_number),
         officer_id=user.id,
         status=TowStatus.NEW,
         violation_type=payload.violation_type,
-        notes=payload.notes,
         location_lat=payload.location_lat,
         location_lng=payload.location_lng,
         location_accuracy_m=payload.location_accuracy_m,
     )
     db.add(job)
+    if payload.notes and payload.notes.strip():
+        add_note(db, job, user, payload.notes)
+    count_transition(db, new_status=job.status)
+    record_plate(db, job.plate_number)
     _log_event(db, job.id, user.id, "CREATED", f"Job created for plate {job.plate_number}")
     db.commit()
     db.refresh(job)
     return job
 
 
-@router.get("", response_model=list[TowJobOut])
-def list_tow_jobs(
-    status_filter: Optional[str] = None,
+@router.post("/import")
+def bulk_import_tow_jobs(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Form(None, alias="format"),  # ndjson | csv; inferred from filename if omitted
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: User = Depends(require_roles(UserRole.OFFICER, UserRole.ADMIN)),
 ):
-    q = db.query(TowJob)
+    """
+    Backfill many jobs from one NDJSON/CSV upload (fields as in POST /tow-jobs).
+    Valid rows are committed in chunks; invalid rows are reported by line.
+    """
+    fmt = (file_format or detect_format(file.filename, file.content_type) or "").lower()
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(IMPORT_FORMATS)}")
+
+    report = import_tow_jobs(
+        db, iter_rows(file.file, fmt), officer_id=user.id, actor_user_id=user.id, officer_role=user.role.value
+    )
+    return report.as_dict()
+
+
+@router.get("", response_model=list[TowJobListItem])
+async def list_tow_jobs(
+    response: Response,
+    status_filter: Optional[str] = None,
+    officer_id: Optional[str] = None,
+    driver_id: Optional[str] = None,
+    plate_prefix: Optional[str] = Query(None, max_length=32),
+    plate: Optional[str] = Query(None, max_length=32),  # exact, after normalization ("ab-123" == "AB123")
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: User = Depends(get_current_user_async),
+):
+    """
+    Newest first, keyset-paginated on (created_at, id).
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    Rows are column projections; `notes` is the latest-note preview, the full
+    history is at GET /tow-jobs/{job_id}/notes.
+    """
+    dialect = db.bind.dialect.name
+    q = select(*TOW_JOB_LIST_COLUMNS)
 
     if user.role == UserRole.OFFICER:
-        q = q.filter(TowJob.officer_id == user.id)
+        q = q.where(TowJob.officer_id == user.id)
     elif user.role == UserRole.DRIVER:
-        q = q.filter(TowJob.assigned_driver_id == user.id)
+        q = q.where(TowJob.assigned_driver_id == user.id)
 
     if status_filter:
         try:
-            q = q.filter(TowJob.status == TowStatus(status_filter))
+            q = q.where(TowJob.status == TowStatus(status_filter))
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid status_filter")
 
-    return q.order_by(TowJob.created_at.desc()).all()
+    if officer_id:
+        q = q.where(TowJob.officer_id == officer_id)
+    if driver_id:
+        q = q.where(TowJob.assigned_driver_id == driver_id)
+    if plate_prefix and plate_prefix.strip():
+        q = q.where(prefix_range(TowJob.plate_number, plate_prefix.strip().upper()))
+    if plate and normalize_plate(plate):
+        q = q.where(TowJob.plate_key == normalize_plate(plate))
+    if created_from:
+        q = q.where(TowJob.created_at >= datetime_bound(created_from, dialect))
+    if created_to:
+        q = q.where(TowJob.created_at < datetime_bound(created_to, dialect))
+
+    if cursor:
+        c_created, c_id = decode_cursor(cursor, 2)
+        q = q.where(
+            tuple_(TowJob.created_at, TowJob.id)
+            < tuple_(datetime_bound(parse_cursor_datetime(c_created), dialect), c_id)
+        )
+
+    q = q.order_by(TowJob.created_at.desc(), TowJob.id.desc()).limit(limit + 1)
+    jobs = (await db.execute(q)).all()
+
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(jobs[-1].created_at, jobs[-1].id)
+    return jobs
+
+
+@router.get("/stats")
+async def tow_job_stats(
+    db: AsyncSession = Depends(get_async_read_db),
+    _user: User = Depends(require_roles_async(UserRole.DISPATCHER, UserRole.ADMIN)),
+):
+    """Job counts by status and per driver, read from the maintained counters (no tow_jobs scan)."""
+    return await read_counters_async(db)
+
+
+@router.get("/plates/search")
+async def search_plates(
+    q: str = Query(..., min_length=1, max_length=32),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS),
+    db: AsyncSession = Depends(get_async_read_db),
+    _user: User = Depends(require_roles_async(UserRole.OFFICER, UserRole.DISPATCHER, UserRole.ADMIN)),
+):
+    """
+    Partial plate lookup ignoring case, spaces and punctuation, repeat offenders
+    first. List a plate's jobs with GET /tow-jobs?plate=<plate_key>.
+    """
+    rows = (await db.execute(plate_search_stmt(db.bind.dialect.name, q, limit))).all()
+    return [
+        {
+            "plate_key": r.plate_key,
+            "plate_number": r.plate_number,
+            "offense_count": r.offense_count,
+            "last_seen_at": r.last_seen_at,
+        }
+        for r in rows
+    ]
+
+
+@router.get("/nearby", response_model=list[TowJobNearbyItem])
+async def nearby_tow_jobs(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_m: Optional[float] = Query(None, gt=0, le=MAX_RADIUS_M),
+    bbox: Optional[str] = Query(None, description="min_lat,min_lng,max_lat,max_lng"),
+    status: Optional[list[str]] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: User = Depends(get_current_user_async),
+):
+    """
+    Jobs within `radius_m` of (lat, lng), or inside `bbox`, nearest first.
+    With a bbox, distances are from (lat, lng) when given, else the box center.
+    `status` may repeat; it defaults to the open statuses.
+    """
+    if bbox:
+        try:
+            box = tuple(float(v) for v in bbox.split(","))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid bbox")
+        if len(box) != 4 or not (-90 <= box[0] <= box[2] <= 90) or not (-180 <= box[1] <= box[3] <= 180):
+            raise HTTPException(status_code=400, detail="Invalid bbox")
+        if box[2] - box[0] > MAX_BOX_DEGREES or box[3] - box[1] > MAX_BOX_DEGREES:
+            raise HTTPException(status_code=400, detail=f"bbox may span at most {MAX_BOX_DEGREES} degrees")
+        if lat is None or lng is None:
+            lat, lng = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+        radius_m = None
+    elif lat is not None and lng is not None and radius_m is not None:
+        box = radius_box(lat, lng, radius_m)
+    else:
+        raise HTTPException(status_code=400, detail="Pass lat, lng and radius_m, or bbox")
+
+    if status:
+        try:
+            statuses = tuple(TowStatus(s) for s in status)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid status")
+    else:
+        statuses = OPEN_STATUSES
+
+    scope = None
+    if user.role == UserRole.OFFICER:
+        scope = TowJob.officer_id == user.id
+    elif user.role == UserRole.DRIVER:
+        scope = TowJob.assigned_driver_id == user.id
+
+    candidates = (await db.execute(candidates_stmt(box, statuses, scope))).all()
+    ranked = rank(candidates, lat, lng, radius_m, limit)
+    if not ranked:
+        return []
+
+    rows = (await db.execute(select(*TOW_JOB_LIST_COLUMNS).where(TowJob.id.in_([i for i, _ in ranked])))).all()
+    by_id = {r.id: r for r in rows}
+    return [{**by_id[i]._mapping, "distance_m": round(d, 1)} for i, d in ranked if i in by_id]
+
+
+@router.get("/export")
+def export_tow_jobs(
+    file_format: str = Query("ndjson", alias="format"),
+    table: str = "jobs",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    status_filter: Optional[TowStatus] = None,
+    gzip: bool = False,
+    db: Session = Depends(get_read_db),
+    _user: User = Depends(require_roles(UserRole.DISPATCHER, UserRole.ADMIN)),
+):
+    """
+    Download every job created in [created_from, created_to), oldest first,
+    streamed from the read replica (the primary right after the client's own
+    writes, as for other reads). NDJSON nests each job's events and
+    photos; CSV exports one `table` (jobs, events or photos). With gzip the
+    file comes back as .gz.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(EXPORT_FORMATS)}")
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=400, detail=f"table must be one of {list(EXPORT_TABLES)}")
+
+    name = "tow-jobs" if file_format == "ndjson" else f"tow-{table}"
+    if created_from:
+        name += f"-from-{created_from.date().isoformat()}"
+    if created_to:
+        name += f"-to-{created_to.date().isoformat()}"
+    name += f".{file_format}"
+    media_type = "application/x-ndjson" if file_format == "ndjson" else "text/csv; charset=utf-8"
+    if gzip:
+        name += ".gz"
+        media_type = "application/gzip"
+
+    body = stream_export(
+        db.get_bind(),
+        file_format,
+        gzip=gzip,
+        table=table,
+        created_from=created_from,
+        created_to=created_to,
+        status=status_filter,
+    )
+    return StreamingResponse(
+        body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{name}"'}
+    )
+
+
+@router.get("/evidence-bundle")
+def evidence_bundle_for_range(
+    created_from: datetime,
+    created_to: datetime,
+    status_filter: Optional[TowStatus] = None,
+    db: Session = Depends(get_read_db),
+    _user: User = Depends(require_roles(UserRole.DISPATCHER, UserRole.ADMIN)),
+):
+    """
+    ZIP of every job created in [created_from, created_to): one folder per job
+    as in GET /tow-jobs/{job_id}/evidence/bundle, streamed as it is built.
+    """
+    if created_from >= created_to:
+        raise HTTPException(status_code=400, detail="created_from must be before created_to")
+    name = f"evidence-{created_from.date().isoformat()}-to-{created_to.date().isoformat()}.zip"
+    body = stream_bundle(db.get_bind(), created_from=created_from, created_to=created_to, status=status_filter)
+    return StreamingResponse(
+        body, media_type="application/zip", headers={"Content-Disposition": f'attachment; filename="{name}"'}
+    )
+
+
+@router.get("/{job_id}", response_model=TowJobOut)
+async def get_tow_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_read_db),
+    user: User = Depends(get_current_user_async),
+):
+    job = await _get_job_async(db, job_id)
+    _assert_job_access(user, job)
+    return job
+
+
+@router.get("/{job_id}/nearest-drivers", response_model=list[NearestDriverOut])
+async def nearest_drivers(
+    job_id: str,
+    n: int = Query(5, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_read_db),
+    _user: User = Depends(require_roles_async(UserRole.DISPATCHER, UserRole.ADMIN)),
+):
+    """Active drivers with a recent position, nearest to the job first, for picking an assignee."""
+    job = (
+        await db.execute(select(TowJob.location_lat, TowJob.location_lng).where(TowJob.id == job_id))
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Tow job not found")
+    return await nearest_active_drivers(db, job.location_lat, job.location_lng, n)
 
 
 @router.post("/{job_id}/assign", response_model=TowJobOut)
@@ -132,34 +429,101 @@ def assign_driver(
     if not driver:
         raise HTTPException(status_code=400, detail="Driver not found")
 
-    job.assigned_driver_id = driver.id
-    job.status = TowStatus.ASSIGNED
-    _log_event(db, job.id, user.id, "ASSIGNED", f"Assigned to driver {driver.id}")
+    _apply_assignment(db, job, driver.id, user.id)
     db.commit()
     db.refresh(job)
     return job
 
 
+@router.post("/assign-batch", response_model=list[TowJobAssignResult])
+def assign_driver_batch(
+    payload: TowJobAssignBatch,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_roles(UserRole.DISPATCHER, UserRole.ADMIN)),
+):
+    """
+    Assign many jobs in one transaction: one query for drivers, one for jobs,
+    one commit. Each item reports its own outcome; invalid items are skipped.
+    """
+    job_ids = {i.job_id for i in payload.items}
+    driver_ids = {i.driver_id for i in payload.items}
+
+    valid_drivers = set(
+        db.execute(
+            select(User.id).where(
+                User.id.in_(driver_ids), User.role == UserRole.DRIVER, User.is_active == True  # noqa: E712
+            )
+        ).scalars()
+    )
+    jobs = {j.id: j for j in db.execute(select(TowJob).where(TowJob.id.in_(job_ids))).scalars()}
+
+    results: list[TowJobAssignResult] = []
+    seen: set[str] = set()
+    for item in payload.items:
+        job = jobs.get(item.job_id)
+        error = None
+        if item.job_id in seen:
+            error = "Duplicate job in batch"
+        elif not job:
+            error = "Tow job not found"
+        elif item.driver_id not in valid_drivers:
+            error = "Driver not found"
+        seen.add(item.job_id)
+
+        if error:
+            results.append(TowJobAssignResult(job_id=item.job_id, driver_id=item.driver_id, ok=False, error=error))
+            continue
+
+        _apply_assignment(db, job, item.driver_id, user.id)
+        results.append(
+            TowJobAssignResult(
+                job_id=job.id,
+                driver_id=item.driver_id,
+                ok=True,
+                status=job.status.value,
+                assigned_driver_id=job.assigned_driver_id,
+            )
+        )
+
+    db.commit()
+    return results
+
+
+@router.post("/auto-dispatch")
+def auto_dispatch(
+    payload: AutoDispatchRequest,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_roles(UserRole.DISPATCHER, UserRole.ADMIN)),
+):
+    """
+    Assign NEW jobs to idle drivers with a recent position, minimizing total
+    distance. Each assignment goes through the same path (counters, ASSIGNED
+    event) as POST /tow-jobs/{job_id}/assign. With dry_run nothing is written.
+    """
+    plan = plan_dispatch(db, max_distance_m=payload.max_distance_m, lock=not payload.dry_run)
+    if not payload.dry_run:
+        for job, driver_id, _ in plan.assignments:
+            _apply_assignment(db, job, driver_id, user.id)
+        db.commit()
+    return plan.as_dict(payload.dry_run)
+
+
 @router.post("/{job_id}/status", response_model=TowJobOut)
-def update_status(
+async def update_status(
     job_id: str,
     payload: TowJobStatusUpdate,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
 ):
-    job = db.query(TowJob).filter(TowJob.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=404, detail="Tow job not found")
-
+    job = await _get_job_async(db, job_id)
     _assert_job_access(user, job)
 
     old = job.status.value
+    count_transition(db, job.status, job.assigned_driver_id, payload.status, job.assigned_driver_id)
     job.status = payload.status
 
-    if payload.notes:
-        existing = (job.notes or "").strip()
-        line = f"[{user.role.value}] {payload.notes.strip()}"
-        job.notes = f"{existing}\n{line}".strip() if existing else line
+    if payload.notes and payload.notes.strip():
+        add_note(db, job, user, payload.notes)
 
     _log_event(
         db,
@@ -169,8 +533,8 @@ def update_status(
         f"Status {old} -> {job.status.value}" + (f" | {payload.notes.strip()}" if payload.notes else ""),
     )
 
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
     return job
 
 
@@ -219,7 +583,7 @@ def upload_job_photo(
     stored_path, size_bytes = save_upload_streaming(photo)
 
     rec = TowJobPhoto(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         tow_job_id=job.id,
         uploaded_by_user_id=user.id,
         photo_type=photo_type,
@@ -321,23 +685,27 @@ def submit_evidence(
 
     # Create job
     job = TowJob(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         plate_number=plate,
+        plate_key=normalize_plate(plate),
         officer_id=user.id,
         status=TowStatus.NEW,
         violation_type=violation_type,
-        notes=notes,
         location_lat=job_lat,
         location_lng=job_lng,
         location_accuracy_m=job_accuracy_m,
     )
     db.add(job)
+    if notes and notes.strip():
+        add_note(db, job, user, notes)
+    count_transition(db, new_status=job.status)
+    record_plate(db, job.plate_number)
     _log_event(db, job.id, user.id, "CREATED", f"Job created via submit-evidence for plate {plate}")
 
     # Save photo
     stored_path, size_bytes = save_upload_streaming(photo)
     rec = TowJobPhoto(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         tow_job_id=job.id,
         uploaded_by_user_id=user.id,
         photo_type=photo_type,
@@ -398,7 +766,7 @@ def submit_evidence(
 def download_job_photo(
     job_id: str,
     photo_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
     job = db.query(TowJob).filter(TowJob.id == job_id).first()
@@ -422,19 +790,38 @@ def download_job_photo(
     return FileResponse(path=abs_path, media_type=rec.content_type, filename=os.path.basename(abs_path))
 
 
-@router.get("/{job_id}/evidence")
-def get_job_evidence(
+@router.get("/{job_id}/evidence/bundle")
+def get_job_evidence_bundle(
     job_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
+    """
+    ZIP with the job's photo files, its event timeline and a manifest of
+    job/photo metadata with the SHA-256 of every file, streamed as it is built.
+    """
     job = db.query(TowJob).filter(TowJob.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Tow job not found")
+    _assert_job_access(user, job)
+
+    return StreamingResponse(
+        stream_bundle(db.get_bind(), job_id=job.id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="evidence-{job.id}.zip"'},
+    )
 
+
+@router.get("/{job_id}/evidence")
+async def get_job_evidence(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_read_db),
+    user: User = Depends(get_current_user_async),
+):
+    job = await _get_job_async(db, job_id)
     _assert_job_access(user, job)
 
-    photos = db.query(TowJobPhoto).filter(TowJobPhoto.tow_job_id == job.id).all()
+    photos = (await db.execute(select(TowJobPhoto).where(TowJobPhoto.tow_job_id == job.id))).scalars().all()
 
     return {
         "job": {
@@ -470,23 +857,20 @@ def get_job_evidence(
 
 
 @router.get("/{job_id}/events")
-def get_job_events(
+async def get_job_events(
     job_id: str,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: User = Depends(get_current_user_async),
 ):
-    job = db.query(TowJob).filter(TowJob.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=404, detail="Tow job not found")
-
+    job = await _get_job_async(db, job_id)
     _assert_job_access(user, job)
 
-    events = (
-        db.query(TowJobEvent)
-        .filter(TowJobEvent.tow_job_id == job.id)
+    result = await db.execute(
+        select(TowJobEvent)
+        .where(TowJobEvent.tow_job_id == job.id)
         .order_by(TowJobEvent.created_at.asc())
-        .all()
     )
+    events = result.scalars().all()
 
     return [
         {
@@ -500,6 +884,31 @@ def get_job_events(
         for e in events
     ]
 
+
+@router.get("/{job_id}/notes", response_model=list[TowJobNoteOut])
+async def get_job_notes(
+    job_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: User = Depends(get_current_user_async),
+):
+    """Oldest first, keyset-paginated on the time-ordered note id (X-Next-Cursor)."""
+    job = await _get_job_async(db, job_id)
+    _assert_job_access(user, job)
+
+    q = select(TowJobNote).where(TowJobNote.tow_job_id == job.id)
+    if cursor:
+        (c_id,) = decode_cursor(cursor, 1)
+        q = q.where(TowJobNote.id > c_id)
+    notes = (await db.execute(q.order_by(TowJobNote.id.asc()).limit(limit + 1))).scalars().all()
+
+    if len(notes) > limit:
+        notes = notes[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(notes[-1].id)
+    return notes
+
 # from __future__ import annotations
 
 # import os
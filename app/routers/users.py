@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.db import get_read_db
 from app.core.auth import require_roles
 from app.models.user import User, UserRole
 
@@ -11,16 +12,16 @@ router = APIRouter(prefix="/users", tags=["users"])
 @router.get("")
 def list_users(
     role: str | None = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _user: User = Depends(require_roles(UserRole.DISPATCHER, UserRole.ADMIN)),
 ):
-    q = db.query(User)
+    q = select(User.id, User.name, User.phone, User.role, User.is_active)
     if role:
         try:
-            q = q.filter(User.role == UserRole(role))
+            q = q.where(User.role == UserRole(role))
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid role")
-    users = q.all()
+    users = db.execute(q).all()
     return [
         {"id": u.id, "name": u.name, "phone": u.phone, "role": u.role.value, "is_active": u.is_active}
         for u in users
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class DriverLocationPing(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lng: float = Field(ge=-180, le=180)
+    accuracy_m: Optional[float] = Field(None, ge=0)
+    recorded_at: Optional[datetime] = None  # device time of the fix; server time when omitted
+
+
+class DriverPositionOut(BaseModel):
+    driver_id: str
+    lat: float
+    lng: float
+    accuracy_m: Optional[float]
+    recorded_at: datetime
+    age_s: float
+
+
+class NearestDriverOut(DriverPositionOut):
+    name: str
+    phone: str
+    distance_m: float
+    open_jobs: int
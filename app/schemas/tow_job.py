@@ -24,6 +24,29 @@ class TowJobAssign(BaseModel):
     driver_id: str
 
 
+class TowJobAssignItem(BaseModel):
+    job_id: str
+    driver_id: str
+
+
+class TowJobAssignBatch(BaseModel):
+    items: list[TowJobAssignItem] = Field(min_length=1, max_length=200)
+
+
+class TowJobAssignResult(BaseModel):
+    job_id: str
+    driver_id: str
+    ok: bool
+    error: Optional[str] = None
+    status: Optional[str] = None
+    assigned_driver_id: Optional[str] = None
+
+
+class AutoDispatchRequest(BaseModel):
+    dry_run: bool = False  # return the plan without assigning anything
+    max_distance_m: Optional[float] = Field(None, gt=0)
+
+
 class TowJobStatusUpdate(BaseModel):
     status: TowStatus
     notes: Optional[str] = None
@@ -46,6 +69,40 @@ class TowJobOut(BaseModel):
         from_attributes = True
 
 
+class TowJobListItem(BaseModel):
+    """List/dashboard row; `notes` is the latest-note preview, as in TowJobOut."""
+    id: str
+    plate_number: str
+    officer_id: str
+    status: str
+    assigned_driver_id: Optional[str]
+    violation_type: Optional[str]
+    notes: Optional[str] = None
+    location_lat: float
+    location_lng: float
+    location_accuracy_m: Optional[float]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TowJobNearbyItem(TowJobListItem):
+    distance_m: float
+
+
+class TowJobNoteOut(BaseModel):
+    id: str
+    tow_job_id: str
+    author_user_id: Optional[str]
+    author_role: Optional[str]
+    body: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class TowJobPhotoOut(BaseModel):
     id: str
     tow_job_id: str
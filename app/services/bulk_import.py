@@ -0,0 +1,191 @@
+"""
+Streaming bulk import of tow jobs (NDJSON or CSV).
+
+Rows are parsed one at a time, validated against TowJobCreate, and written in
+chunked transactions with executemany inserts for jobs, their notes and their
+CREATED events. Memory is bounded by the chunk size and the capped error list,
+whatever the input size.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.geohash import encode as geohash_encode
+from app.core.ids import new_id
+from app.models.event import TowJobEvent
+from app.models.note import TowJobNote
+from app.models.tow_job import TowJob, TowStatus
+from app.schemas.tow_job import TowJobCreate
+from app.services.counters import count_transition
+from app.services.job_notes import note_preview
+from app.services.plates import normalize_plate, record_plates
+
+IMPORT_FORMATS = ("ndjson", "csv")
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+# (line number, parsed record or None, parse error or None)
+ParsedRow = tuple[int, Optional[dict], Optional[str]]
+
+
+@dataclass
+class ImportReport:
+    inserted: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+    errors_truncated: bool = False
+
+    def add_error(self, line: int, error: str, count: int = 1) -> None:
+        self.failed += count
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+        else:
+            self.errors_truncated = True
+
+    def as_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+        }
+
+
+def detect_format(filename: str | None, content_type: str | None) -> Optional[str]:
+    name = (filename or "").lower()
+    ct = (content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in ct or "jsonl" in ct:
+        return "ndjson"
+    if name.endswith(".csv") or "csv" in ct:
+        return "csv"
+    return None
+
+
+def iter_rows(stream: BinaryIO, fmt: str) -> Iterator[ParsedRow]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "ndjson":
+        for line_no, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "each line must be a JSON object"
+                continue
+            yield line_no, record, None
+    elif fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            # blank CSV cells mean "not provided"
+            yield reader.line_num, {k: (v if v != "" else None) for k, v in record.items() if k}, None
+    else:
+        raise ValueError(f"format must be one of {IMPORT_FORMATS}")
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+
+def _flush(
+    db: Session, jobs: list[dict], notes: list[dict], events: list[dict], first_line: int, report: ImportReport
+) -> None:
+    if not jobs:
+        return
+    try:
+        db.execute(insert(TowJob), jobs)
+        if notes:
+            db.execute(insert(TowJobNote), notes)
+        db.execute(insert(TowJobEvent), events)
+        count_transition(db, new_status=TowStatus.NEW, n=len(jobs))
+        record_plates(db, [j["plate_number"] for j in jobs])
+        db.commit()
+        report.inserted += len(jobs)
+    except SQLAlchemyError as e:
+        db.rollback()
+        report.add_error(first_line, f"chunk of {len(jobs)} rows rejected by database: {e.__class__.__name__}", len(jobs))
+    jobs.clear()
+    notes.clear()
+    events.clear()
+
+
+def import_tow_jobs(
+    db: Session,
+    rows: Iterator[ParsedRow],
+    officer_id: str,
+    actor_user_id: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    officer_role: str | None = None,
+) -> ImportReport:
+    report = ImportReport()
+    jobs: list[dict] = []
+    notes: list[dict] = []
+    events: list[dict] = []
+    chunk_first_line = 0
+
+    for line_no, record, parse_error in rows:
+        if parse_error:
+            report.add_error(line_no, parse_error)
+            continue
+        try:
+            payload = TowJobCreate.model_validate(record)
+        except ValidationError as e:
+            report.add_error(line_no, _validation_message(e))
+            continue
+        if not (-90.0 <= payload.location_lat <= 90.0) or not (-180.0 <= payload.location_lng <= 180.0):
+            report.add_error(line_no, "location_lat/location_lng out of range")
+            continue
+
+        if not jobs:
+            chunk_first_line = line_no
+        job_id = new_id()
+        plate = payload.plate_number.strip().upper()
+        note = (payload.notes or "").strip()
+        jobs.append(
+            {
+                "id": job_id,
+                "plate_number": plate,
+                "plate_key": normalize_plate(plate),
+                "officer_id": officer_id,
+                "status": TowStatus.NEW,
+                "violation_type": payload.violation_type,
+                "notes": note_preview(note) if note else None,
+                "location_lat": payload.location_lat,
+                "location_lng": payload.location_lng,
+                "location_accuracy_m": payload.location_accuracy_m,
+                "geohash": geohash_encode(payload.location_lat, payload.location_lng),
+            }
+        )
+        if note:
+            notes.append(
+                {
+                    "id": new_id(),
+                    "tow_job_id": job_id,
+                    "author_user_id": officer_id,
+                    "author_role": officer_role,
+                    "body": note,
+                }
+            )
+        events.append(
+            {
+                "id": new_id(),
+                "tow_job_id": job_id,
+                "actor_user_id": actor_user_id,
+                "event_type": "CREATED",
+                "message": f"Job created via bulk import for plate {plate}",
+            }
+        )
+        if len(jobs) >= chunk_size:
+            _flush(db, jobs, notes, events, chunk_first_line, report)
+
+    _flush(db, jobs, notes, events, chunk_first_line, report)
+    return report
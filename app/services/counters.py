@@ -0,0 +1,172 @@
+"""
+Per-status and per-driver job counters.
+
+Writers call `count_transition` next to any change of a job's status or
+driver. Deltas collect on the session and are applied as one upsert right
+before the transaction commits, so counters move atomically with the jobs
+(a batch of 200 assignments is still a handful of row updates). Rolled-back
+transactions drop their deltas.
+
+`reconcile_counters` recomputes everything from tow_jobs under a lock that
+holds off concurrent counter updates, fixing any drift (e.g. two racing
+updates of the same job). The app runs it every COUNTERS_RECONCILE_SECONDS.
+"""
+import asyncio
+import logging
+from collections import Counter
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.counter import TowJobCounter
+from app.models.tow_job import CLOSED_STATUSES, TowJob, TowStatus
+
+log = logging.getLogger(__name__)
+
+ALL_DRIVERS = ""  # driver_id of the global rows
+
+_PENDING_KEY = "tow_job_counter_deltas"
+
+
+def _value(status) -> str | None:
+    return getattr(status, "value", status)
+
+
+def count_transition(
+    db: Session | AsyncSession,
+    old_status=None,
+    old_driver_id: str | None = None,
+    new_status=None,
+    new_driver_id: str | None = None,
+    n: int = 1,
+) -> None:
+    """Record a job moving from (old_status, old_driver) to (new_status, new_driver). None = no job."""
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    deltas: Counter = session.info.setdefault(_PENDING_KEY, Counter())
+    old_status, new_status = _value(old_status), _value(new_status)
+    if old_status is not None:
+        deltas[(ALL_DRIVERS, old_status)] -= n
+        if old_driver_id:
+            deltas[(old_driver_id, old_status)] -= n
+    if new_status is not None:
+        deltas[(ALL_DRIVERS, new_status)] += n
+        if new_driver_id:
+            deltas[(new_driver_id, new_status)] += n
+
+
+def _upsert(dialect: str, set_to_excluded: bool):
+    ins = {"postgresql": pg_insert, "sqlite": sqlite_insert}.get(dialect)
+    if ins is None:
+        raise RuntimeError(f"job counters need INSERT .. ON CONFLICT; {dialect} is not supported")
+    stmt = ins(TowJobCounter)
+    new_count = stmt.excluded["count"] if set_to_excluded else TowJobCounter.count + stmt.excluded["count"]
+    return stmt.on_conflict_do_update(index_elements=["driver_id", "status"], set_={"count": new_count})
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_deltas(session: Session) -> None:
+    deltas = session.info.pop(_PENDING_KEY, None)
+    rows = [{"driver_id": d, "status": s, "count": n} for (d, s), n in sorted((deltas or {}).items()) if n]
+    if rows:
+        # sorted: concurrent transactions lock counter rows in the same order
+        session.execute(_upsert(session.get_bind().dialect.name, set_to_excluded=False), rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_deltas(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# ---------- reads ----------
+def _shape(rows) -> dict:
+    by_status = {s.value: 0 for s in TowStatus}
+    by_driver: dict[str, dict[str, int]] = {}
+    for driver_id, status, count in rows:
+        if driver_id == ALL_DRIVERS:
+            by_status[status] = count
+        elif count:
+            by_driver.setdefault(driver_id, {})[status] = count
+    return {
+        "by_status": by_status,
+        "open": sum(n for s, n in by_status.items() if s not in CLOSED_STATUSES),
+        "by_driver": [
+            {
+                "driver_id": driver_id,
+                "by_status": counts,
+                "open": sum(n for s, n in counts.items() if s not in CLOSED_STATUSES),
+            }
+            for driver_id, counts in sorted(by_driver.items())
+        ],
+    }
+
+
+_COUNTER_ROWS = select(TowJobCounter.driver_id, TowJobCounter.status, TowJobCounter.count)
+
+
+def read_counters(db: Session) -> dict:
+    return _shape(db.execute(_COUNTER_ROWS).all())
+
+
+async def read_counters_async(db: AsyncSession) -> dict:
+    return _shape((await db.execute(_COUNTER_ROWS)).all())
+
+
+# ---------- reconciliation ----------
+def _lock_counters(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        # Blocks counter upserts (they wait until we commit, then apply on top of
+        # our fresh numbers); plain reads of tow_jobs are unaffected.
+        conn.exec_driver_sql("LOCK TABLE tow_job_counters IN SHARE ROW EXCLUSIVE MODE")
+    elif conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def compute_counters(conn: Connection) -> dict[tuple[str, str], int]:
+    truth: dict[tuple[str, str], int] = {}
+    for status, n in conn.execute(select(TowJob.status, func.count()).group_by(TowJob.status)):
+        truth[(ALL_DRIVERS, _value(status))] = n
+    for driver_id, status, n in conn.execute(
+        select(TowJob.assigned_driver_id, TowJob.status, func.count())
+        .where(TowJob.assigned_driver_id.is_not(None))
+        .group_by(TowJob.assigned_driver_id, TowJob.status)
+    ):
+        truth[(driver_id, _value(status))] = n
+    return truth
+
+
+def reconcile_counters(engine: Engine) -> list[dict]:
+    """Rewrite counters from tow_jobs; returns the rows that had drifted."""
+    with engine.connect() as conn:
+        _lock_counters(conn)
+        truth = compute_counters(conn)
+        current = {(d, s): n for d, s, n in conn.execute(_COUNTER_ROWS)}
+
+        drift = [
+            {"driver_id": d, "status": s, "counter": current.get((d, s), 0), "actual": truth.get((d, s), 0)}
+            for d, s in sorted(set(truth) | set(current))
+            if current.get((d, s), 0) != truth.get((d, s), 0)
+        ]
+        fixes = [{"driver_id": r["driver_id"], "status": r["status"], "count": r["actual"]} for r in drift]
+        if fixes:
+            conn.execute(_upsert(conn.dialect.name, set_to_excluded=True), fixes)
+        # zero rows for drivers with no jobs left are just noise
+        conn.execute(delete(TowJobCounter).where(TowJobCounter.driver_id != ALL_DRIVERS, TowJobCounter.count == 0))
+        conn.commit()
+    return drift
+
+
+async def reconcile_periodically(engine: Engine, interval_seconds: float) -> None:
+    """Background loop for the app lifespan; the work itself runs off the event loop."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            drift = await asyncio.to_thread(reconcile_counters, engine)
+        except Exception:
+            log.exception("job counter reconciliation failed")
+            continue
+        if drift:
+            log.warning("job counters drifted; corrected %d rows: %s", len(drift), drift[:20])
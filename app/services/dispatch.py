@@ -0,0 +1,126 @@
+"""
+Auto-dispatch: match NEW jobs to idle drivers for the least total distance.
+
+Idle drivers are active DRIVER accounts holding no open job, and each one
+needs a recent position from the driver location store. The cost matrix is
+the haversine distance for every (job, driver) pair, computed in one numpy
+broadcast and solved with scipy's linear_sum_assignment (Hungarian-style,
+optimal, and fine with rectangular matrices). When there are more jobs than
+drivers, the jobs that fit best are served and the rest wait for the next run.
+Pairs farther apart than `max_distance_m` are never matched.
+
+The caller applies the plan through the same path as a manual assignment.
+Applying runs are serialized (advisory lock on Postgres, BEGIN IMMEDIATE on
+SQLite) so two of them can't both see a driver as idle and hand them a job
+each.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.tow_job import OPEN_STATUSES, TowJob, TowStatus
+from app.models.user import User, UserRole
+from app.services.driver_locations import store
+from app.services.geo import haversine_m
+
+MAX_DISPATCH_JOBS = 2000  # oldest NEW jobs considered per run
+_PG_LOCK_KEY = 0x70770D  # advisory lock id of applying dispatch runs
+_UNREACHABLE = 1e12  # cost for pairs beyond max_distance_m; dropped after solving
+
+BUSY_STATUSES = tuple(s for s in OPEN_STATUSES if s != TowStatus.NEW)
+
+
+@dataclass
+class DispatchPlan:
+    assignments: list[tuple[TowJob, str, float]] = field(default_factory=list)  # (job, driver_id, distance_m)
+    new_jobs: int = 0
+    idle_drivers: int = 0
+    drivers_without_position: list[str] = field(default_factory=list)
+    solve_ms: float = 0.0
+
+    def as_dict(self, dry_run: bool) -> dict:
+        return {
+            "dry_run": dry_run,
+            "assignments": [
+                {"job_id": job.id, "driver_id": driver_id, "distance_m": round(distance, 1)}
+                for job, driver_id, distance in self.assignments
+            ],
+            "total_distance_m": round(sum(d for _, _, d in self.assignments), 1),
+            "new_jobs": self.new_jobs,
+            "idle_drivers": self.idle_drivers,
+            "drivers_without_position": self.drivers_without_position,
+            "solve_ms": round(self.solve_ms, 2),
+        }
+
+
+def solve(job_coords: np.ndarray, driver_coords: np.ndarray, max_distance_m: Optional[float]):
+    """(job_index, driver_index, distance_m) arrays of the optimal matching."""
+    cost = haversine_m(job_coords[:, 0:1], job_coords[:, 1:2], driver_coords[:, 0], driver_coords[:, 1])
+    if max_distance_m is not None:
+        cost = np.where(cost > max_distance_m, _UNREACHABLE, cost)
+    rows, cols = linear_sum_assignment(cost)
+    dist = cost[rows, cols]
+    keep = dist < _UNREACHABLE
+    return rows[keep], cols[keep], dist[keep]
+
+
+def _lock(db: Session) -> None:
+    """Hold off other applying runs until this transaction ends."""
+    conn = db.connection()
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({_PG_LOCK_KEY})")
+    elif conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def plan_dispatch(db: Session, max_distance_m: Optional[float] = None, lock: bool = False) -> DispatchPlan:
+    """
+    Build the assignment plan. With `lock`, the run first takes the dispatch
+    lock, held until the caller commits, so the idle drivers it reads stay
+    idle. The NEW jobs are also loaded FOR UPDATE (SKIP LOCKED on Postgres)
+    so a manual assignment in flight is left alone.
+    """
+    plan = DispatchPlan()
+    if lock:
+        _lock(db)
+    q = (
+        select(TowJob)
+        .where(TowJob.status == TowStatus.NEW, TowJob.assigned_driver_id.is_(None))
+        .order_by(TowJob.created_at.asc(), TowJob.id.asc())
+        .limit(MAX_DISPATCH_JOBS)
+    )
+    if lock:
+        q = q.with_for_update(skip_locked=True)
+    jobs = db.execute(q).scalars().all()
+    plan.new_jobs = len(jobs)
+
+    busy = select(TowJob.assigned_driver_id).where(
+        TowJob.status.in_(BUSY_STATUSES), TowJob.assigned_driver_id.is_not(None)
+    )
+    idle_ids = db.execute(
+        select(User.id).where(User.role == UserRole.DRIVER, User.is_active == True, User.id.not_in(busy))  # noqa: E712
+    ).scalars().all()
+    plan.idle_drivers = len(idle_ids)
+
+    positions = store.all(settings.DRIVER_LOCATION_MAX_AGE_SECONDS)
+    by_id = {p.driver_id: p for p in positions}
+    located = [by_id[d] for d in idle_ids if d in by_id]
+    plan.drivers_without_position = sorted(d for d in idle_ids if d not in by_id)
+    if not jobs or not located:
+        return plan
+
+    start = time.perf_counter()
+    job_coords = np.array([(j.location_lat, j.location_lng) for j in jobs], dtype=np.float64)
+    driver_coords = np.array([(p.lat, p.lng) for p in located], dtype=np.float64)
+    rows, cols, dist = solve(job_coords, driver_coords, max_distance_m)
+    plan.solve_ms = (time.perf_counter() - start) * 1000
+
+    order = np.argsort(dist, kind="stable")
+    plan.assignments = [(jobs[rows[i]], located[cols[i]].driver_id, float(dist[i])) for i in order]
+    return plan
@@ -0,0 +1,383 @@
+"""
+Driver positions: latest fix in memory, breadcrumbs in batches.
+
+Each ping replaces the driver's entry in `store`, a dict of latest positions
+bucketed by geohash cell, so "nearest drivers" only looks at the cells around
+a point. Pings never touch the database on the request path. A ping becomes a
+breadcrumb only if the driver's last one is at least
+DRIVER_TRACK_MIN_INTERVAL_SECONDS older; breadcrumbs are buffered and
+inserted by a background task every DRIVER_TRACK_FLUSH_INTERVAL_MS.
+
+Breadcrumbs are best effort. A full buffer drops the oldest, and a crash
+loses at most one flush interval. The store is per worker. It is warmed from
+the track table on start, and with DRIVER_LOCATION_SHARED each worker also
+tails the table so it sees pings that other workers received.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.core.geohash import box_cells, encode, radius_box
+from app.models.counter import TowJobCounter
+from app.models.driver_location import DriverTrackPoint
+from app.models.tow_job import CLOSED_STATUSES
+from app.models.user import User, UserRole
+from app.services.geo import haversine_m
+
+log = logging.getLogger(__name__)
+
+STORE_CELL_PRECISION = 5  # ~4.9km cells: a handful of drivers each
+NEAREST_SEARCH_RADII_M = (2_000, 8_000, 32_000, 100_000)
+
+
+@dataclass(slots=True)
+class Position:
+    driver_id: str
+    lat: float
+    lng: float
+    accuracy_m: Optional[float]
+    recorded_at: datetime
+    cell: str
+
+
+def _aware(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class LocationStore:
+    """Latest position per driver with a geohash-cell index. Thread-safe."""
+
+    def __init__(self):
+        self._positions: dict[str, Position] = {}
+        self._cells: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def update(
+        self, driver_id: str, lat: float, lng: float, accuracy_m: Optional[float], recorded_at: datetime
+    ) -> bool:
+        """Store the fix unless we already hold a newer one; returns whether it was stored."""
+        recorded_at = _aware(recorded_at)
+        cell = encode(lat, lng, STORE_CELL_PRECISION)
+        with self._lock:
+            old = self._positions.get(driver_id)
+            if old is not None:
+                if old.recorded_at >= recorded_at:
+                    return False
+                if old.cell != cell:
+                    self._discard_from_cell(old)
+            self._positions[driver_id] = Position(driver_id, lat, lng, accuracy_m, recorded_at, cell)
+            self._cells.setdefault(cell, set()).add(driver_id)
+        return True
+
+    def _discard_from_cell(self, pos: Position) -> None:
+        members = self._cells.get(pos.cell)
+        if members is not None:
+            members.discard(pos.driver_id)
+            if not members:
+                del self._cells[pos.cell]
+
+    def remove(self, driver_id: str) -> None:
+        with self._lock:
+            pos = self._positions.pop(driver_id, None)
+            if pos is not None:
+                self._discard_from_cell(pos)
+
+    def prune(self, max_age_s: float) -> int:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_s)
+        with self._lock:
+            stale = [p for p in self._positions.values() if p.recorded_at < cutoff]
+            for pos in stale:
+                del self._positions[pos.driver_id]
+                self._discard_from_cell(pos)
+        return len(stale)
+
+    def get(self, driver_id: str) -> Optional[Position]:
+        return self._positions.get(driver_id)
+
+    def all(self, max_age_s: float) -> list[Position]:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_s)
+        with self._lock:
+            return [p for p in self._positions.values() if p.recorded_at >= cutoff]
+
+    def nearest(self, lat: float, lng: float, n: int, max_age_s: float) -> list[tuple[Position, float]]:
+        """
+        Up to `n` (position, distance_m) pairs, nearest first, among fixes newer
+        than `max_age_s`. Widens the searched cells until `n` are found within
+        the searched radius or the largest radius is reached.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_s)
+        for radius in NEAREST_SEARCH_RADII_M:
+            cells = box_cells(*radius_box(lat, lng, radius), STORE_CELL_PRECISION)
+            with self._lock:
+                found = [
+                    self._positions[d]
+                    for cell in cells
+                    for d in self._cells.get(cell, ())
+                    if self._positions[d].recorded_at >= cutoff
+                ]
+            if not found:
+                continue
+            dist = haversine_m(lat, lng, np.array([p.lat for p in found]), np.array([p.lng for p in found]))
+            order = np.argsort(dist, kind="stable")
+            within = [(found[i], float(dist[i])) for i in order if dist[i] <= radius]
+            # Cells reach past the radius, so only hits inside it are known to be the nearest.
+            if len(within) >= n or radius == NEAREST_SEARCH_RADII_M[-1]:
+                return [(found[i], float(dist[i])) for i in order[:n]]
+        return []
+
+
+store = LocationStore()
+
+
+# ---------- breadcrumbs ----------
+class TrackWriter:
+    def __init__(self):
+        self._buffer: deque = deque(maxlen=max(settings.DRIVER_TRACK_BUFFER_MAX, 1))
+        self._last_kept: dict[str, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._tail_after_id = 0
+        self.engine: AsyncEngine = async_engine
+        self._stats = {
+            "pings": 0,
+            "buffered": 0,
+            "flushed": 0,
+            "batches": 0,
+            "dropped": 0,
+            "write_errors": 0,
+            "tailed": 0,
+            "last_flush_ms": None,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def add(self, driver_id: str, lat: float, lng: float, accuracy_m: Optional[float], recorded_at: datetime) -> None:
+        self._stats["pings"] += 1
+        last = self._last_kept.get(driver_id)
+        if last is not None and (recorded_at - last).total_seconds() < settings.DRIVER_TRACK_MIN_INTERVAL_SECONDS:
+            return
+        self._last_kept[driver_id] = recorded_at
+        if len(self._buffer) == self._buffer.maxlen:
+            self._stats["dropped"] += 1  # deque drops the oldest
+        self._buffer.append(
+            {"driver_id": driver_id, "lat": lat, "lng": lng, "accuracy_m": accuracy_m, "recorded_at": recorded_at}
+        )
+        self._stats["buffered"] += 1
+        if len(self._buffer) >= settings.DRIVER_TRACK_BATCH_SIZE:
+            self._wake.set()
+
+    async def start(self, engine: AsyncEngine | None = None) -> None:
+        if self._task is not None:
+            return
+        self.engine = engine or async_engine
+        self._wake = asyncio.Event()
+        try:
+            await self._warm()
+        except Exception:
+            log.exception("could not warm driver positions from the track table")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    def metrics(self) -> dict:
+        return {
+            "running": self.running,
+            "drivers_tracked": len(store),
+            "buffer_depth": len(self._buffer),
+            "buffer_capacity": self._buffer.maxlen,
+            **self._stats,
+        }
+
+    async def flush(self) -> int:
+        total = 0
+        while self._buffer:
+            n = min(len(self._buffer), settings.DRIVER_TRACK_BATCH_SIZE)
+            batch = [self._buffer.popleft() for _ in range(n)]
+            start = time.perf_counter()
+            try:
+                async with self.engine.begin() as conn:
+                    await conn.execute(insert(DriverTrackPoint), batch)
+            except Exception:
+                self._stats["write_errors"] += 1
+                self._stats["dropped"] += len(batch)
+                log.exception("dropping %d driver breadcrumbs: insert failed", len(batch))
+                continue
+            self._stats["flushed"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            total += len(batch)
+        return total
+
+    async def _run(self) -> None:
+        interval = settings.DRIVER_TRACK_FLUSH_INTERVAL_MS / 1000
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+            try:
+                if settings.DRIVER_LOCATION_SHARED:
+                    await self._tail()
+            except Exception:
+                log.exception("driver track tail failed")
+            store.prune(settings.DRIVER_LOCATION_MAX_AGE_SECONDS)
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.DRIVER_LOCATION_MAX_AGE_SECONDS)
+            for driver_id in [d for d, at in self._last_kept.items() if at < cutoff]:
+                del self._last_kept[driver_id]
+
+    async def _warm(self) -> None:
+        """Latest breadcrumb per driver still young enough to count as active."""
+        since = datetime.now(timezone.utc) - timedelta(seconds=settings.DRIVER_LOCATION_MAX_AGE_SECONDS)
+        latest = (
+            select(DriverTrackPoint.driver_id, func.max(DriverTrackPoint.id).label("id"))
+            .where(DriverTrackPoint.recorded_at >= since)
+            .group_by(DriverTrackPoint.driver_id)
+            .subquery()
+        )
+        async with self.engine.connect() as conn:
+            rows = (
+                await conn.execute(
+                    select(DriverTrackPoint).join(latest, DriverTrackPoint.id == latest.c.id)
+                )
+            ).all()
+            self._tail_after_id = (await conn.execute(select(func.max(DriverTrackPoint.id)))).scalar() or 0
+        for r in rows:
+            store.update(r.driver_id, r.lat, r.lng, r.accuracy_m, r.recorded_at)
+
+    async def _tail(self) -> None:
+        """Apply breadcrumbs other workers wrote since the last look."""
+        async with self.engine.connect() as conn:
+            rows = (
+                await conn.execute(
+                    select(DriverTrackPoint)
+                    .where(DriverTrackPoint.id > self._tail_after_id)
+                    .order_by(DriverTrackPoint.id)
+                    .limit(settings.DRIVER_TRACK_BATCH_SIZE * 10)
+                )
+            ).all()
+        for r in rows:
+            store.update(r.driver_id, r.lat, r.lng, r.accuracy_m, r.recorded_at)
+        if rows:
+            self._tail_after_id = rows[-1].id
+            self._stats["tailed"] += len(rows)
+
+
+writer = TrackWriter()
+
+
+def record_ping(
+    driver_id: str, lat: float, lng: float, accuracy_m: Optional[float], recorded_at: Optional[datetime]
+) -> bool:
+    """
+    Take a ping on the request path: memory only, no I/O. Client timestamps
+    are accepted when not in the future; returns False for an out-of-order ping.
+    """
+    now = datetime.now(timezone.utc)
+    recorded_at = min(_aware(recorded_at), now) if recorded_at else now
+    if not store.update(driver_id, lat, lng, accuracy_m, recorded_at):
+        return False
+    writer.add(driver_id, lat, lng, accuracy_m, recorded_at)
+    return True
+
+
+def _row(pos: Position, now: datetime) -> dict:
+    return {
+        "driver_id": pos.driver_id,
+        "lat": pos.lat,
+        "lng": pos.lng,
+        "accuracy_m": pos.accuracy_m,
+        "recorded_at": pos.recorded_at,
+        "age_s": round((now - pos.recorded_at).total_seconds(), 1),
+    }
+
+
+def active_positions() -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [_row(p, now) for p in store.all(settings.DRIVER_LOCATION_MAX_AGE_SECONDS)]
+
+
+async def nearest_active_drivers(db: AsyncSession, lat: float, lng: float, n: int) -> list[dict]:
+    """
+    The `n` nearest drivers with a recent fix who are still active accounts,
+    with their open job count from the job counters.
+    """
+    # over-fetch: a few tracked drivers may have been deactivated since their last ping
+    hits = store.nearest(lat, lng, n * 2 + 5, settings.DRIVER_LOCATION_MAX_AGE_SECONDS)
+    if not hits:
+        return []
+    ids = [pos.driver_id for pos, _ in hits]
+    drivers = {
+        r.id: r
+        for r in (
+            await db.execute(
+                select(User.id, User.name, User.phone).where(
+                    User.id.in_(ids), User.role == UserRole.DRIVER, User.is_active.is_(True)
+                )
+            )
+        ).all()
+    }
+    open_jobs = dict(
+        (
+            await db.execute(
+                select(TowJobCounter.driver_id, func.sum(TowJobCounter.count))
+                .where(
+                    TowJobCounter.driver_id.in_(list(drivers)),
+                    TowJobCounter.status.not_in([s.value for s in CLOSED_STATUSES]),
+                )
+                .group_by(TowJobCounter.driver_id)
+            )
+        ).all()
+    )
+    now = datetime.now(timezone.utc)
+    out = []
+    for pos, distance in hits:
+        driver = drivers.get(pos.driver_id)
+        if driver is None:
+            continue
+        out.append(
+            {
+                **_row(pos, now),
+                "name": driver.name,
+                "phone": driver.phone,
+                "distance_m": round(distance, 1),
+                "open_jobs": int(open_jobs.get(pos.driver_id) or 0),
+            }
+        )
+        if len(out) == n:
+            break
+    return out
+
+
+async def start() -> None:
+    await writer.start()
+
+
+async def stop() -> None:
+    await writer.stop()
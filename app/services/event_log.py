@@ -0,0 +1,413 @@
+"""
+Tow job event log, synchronous or write-behind.
+
+In "sync" mode an event is just another row in the request transaction. In
+"write_behind" mode events are staged on the session and, once the request
+transaction commits, appended to a spool file and queued for a background
+thread that inserts them in batches; rolled-back transactions drop theirs.
+
+Spool segments are deleted once every event in them is committed. Each
+process holds an flock on its own lock file, so segments whose lock is free
+belong to a dead worker and are replayed on the next start. Inserts skip ids
+that already exist, which makes a replay after a crash between commit and
+segment cleanup harmless.
+
+When the queue is full, events are only spooled and the writer reads them
+back from disk once it has drained the queue, so a request never waits on
+an event insert. Only without a running writer (the CLI, tests) does the
+commit hook insert the rows itself. Failures in the hook are logged, never
+raised: the request's own transaction has already committed.
+
+Write-behind events reach GET /tow-jobs/{id}/events within about one flush
+interval, longer while the writer is catching up on an overflow.
+"""
+import fcntl
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import engine as primary_engine
+from app.core.ids import new_id
+from app.models.event import TowJobEvent
+
+log = logging.getLogger(__name__)
+
+_PENDING_KEY = "pending_tow_job_events"
+_SEGMENT_MAX_ROWS = 10000
+_RETRY_BACKOFF_MAX_S = 5.0
+
+
+def record_event(
+    db: Session | AsyncSession, tow_job_id: str, actor_user_id: str, event_type: str, message: str | None = None
+) -> None:
+    if settings.EVENT_LOG_MODE != "write_behind":
+        db.add(
+            TowJobEvent(
+                id=new_id(),
+                tow_job_id=tow_job_id,
+                actor_user_id=actor_user_id,
+                event_type=event_type,
+                message=message,
+            )
+        )
+        return
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    session.info.setdefault(_PENDING_KEY, []).append(
+        {
+            "id": new_id(),
+            "tow_job_id": tow_job_id,
+            "actor_user_id": actor_user_id,
+            "event_type": event_type,
+            "message": message,
+            # stamped now, not at flush, so event order and timing stay truthful
+            "created_at": datetime.now(timezone.utc),
+        }
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    rows = session.info.pop(_PENDING_KEY, None)
+    if not rows:
+        return
+    try:
+        writer.submit(rows)
+    except Exception:
+        # raising here would fail a request whose changes are already committed
+        writer.count_dropped(len(rows))
+        log.exception("lost %d events after commit (job %s)", len(rows), rows[0]["tow_job_id"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _insert_rows(engine: Engine, rows: list[dict]) -> None:
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        stmt = pg_insert(TowJobEvent).on_conflict_do_nothing(index_elements=["id"])
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(TowJobEvent).on_conflict_do_nothing(index_elements=["id"])
+    else:
+        stmt = insert(TowJobEvent)
+    with engine.begin() as conn:
+        conn.execute(stmt, rows)
+
+
+# ---------- spool ----------
+def _dump(row: dict) -> str:
+    return json.dumps({**row, "created_at": row["created_at"].isoformat()}, separators=(",", ":"))
+
+
+def _load(line: str) -> dict:
+    row = json.loads(line)
+    row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+def _read_segment(path: str) -> list[dict]:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rows.append(_load(line))
+            except ValueError:
+                pass  # torn final line from a crash
+    return rows
+
+
+class _Spool:
+    """Append-only NDJSON segments: <dir>/<instance>.<seq>.ndjson, guarded by <instance>.lock."""
+
+    def __init__(self, directory: str, fsync: bool):
+        self.directory = directory
+        self.fsync = fsync
+        self.instance = new_id()
+        self.seq = 0
+        self._rows_in_seq = 0
+        self._file = None
+        self._lock_file = None
+
+    def _segment_path(self, instance: str, seq: int) -> str:
+        return os.path.join(self.directory, f"{instance}.{seq:06d}.ndjson")
+
+    def open(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_file = open(os.path.join(self.directory, f"{self.instance}.lock"), "w")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._file = open(self._segment_path(self.instance, self.seq), "a", encoding="utf-8")
+
+    def append(self, rows: list[dict]) -> int:
+        """Write rows durably; returns the segment they landed in."""
+        self._file.write("".join(_dump(r) + "\n" for r in rows))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        seq = self.seq
+        self._rows_in_seq += len(rows)
+        if self._rows_in_seq >= _SEGMENT_MAX_ROWS:
+            self.rotate()
+        return seq
+
+    def rotate(self) -> None:
+        self._file.close()
+        self.seq += 1
+        self._rows_in_seq = 0
+        self._file = open(self._segment_path(self.instance, self.seq), "a", encoding="utf-8")
+
+    def release_before(self, seq: int) -> None:
+        """Delete this instance's segments older than `seq` (all their rows are committed)."""
+        for path in glob.glob(os.path.join(self.directory, f"{self.instance}.*.ndjson")):
+            if int(path.rsplit(".", 2)[1]) < seq:
+                os.remove(path)
+
+    def segment_count(self) -> int:
+        return len(glob.glob(os.path.join(self.directory, "*.ndjson")))
+
+    def close(self, discard: bool) -> None:
+        """Close; with discard=False the segments stay behind for the next start to replay."""
+        if self._file:
+            self._file.close()
+            self._file = None
+        if discard:
+            self.release_before(self.seq + 1)
+        if self._lock_file:
+            if discard:
+                os.remove(self._lock_file.name)
+            self._lock_file.close()  # releases the flock
+            self._lock_file = None
+
+    def claim_orphans(self):
+        """Yield (instance, lock_file, segment paths) for each dead instance; caller releases."""
+        instances = {os.path.basename(p).split(".", 1)[0] for p in glob.glob(os.path.join(self.directory, "*.ndjson"))}
+        instances.discard(self.instance)
+        for instance in sorted(instances):
+            lock = open(os.path.join(self.directory, f"{instance}.lock"), "a")
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock.close()  # owner is alive
+                continue
+            yield instance, lock, sorted(glob.glob(os.path.join(self.directory, f"{instance}.*.ndjson")))
+
+
+# ---------- writer ----------
+class EventWriter:
+    def __init__(self):
+        self._queue: Optional[queue.Queue] = None
+        self._spool: Optional[_Spool] = None
+        self._thread: Optional[threading.Thread] = None
+        self._submit_lock = threading.Lock()
+        self._stopping = threading.Event()
+        # first spool segment holding rows that are not in the queue; None when there are none
+        self._overflow_from: Optional[int] = None
+        self.engine: Engine = primary_engine
+        self._stats = {
+            "enqueued": 0,
+            "flushed": 0,
+            "batches": 0,
+            "overflowed": 0,
+            "sync_fallbacks": 0,
+            "replayed": 0,
+            "dropped": 0,
+            "write_errors": 0,
+            "last_batch_size": 0,
+            "last_flush_latency_ms": None,
+            "max_flush_latency_ms": None,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stopping.is_set()
+
+    def start(self, engine: Engine | None = None) -> None:
+        if self._thread is not None:
+            return
+        self.engine = engine or primary_engine
+        self.batch_size = settings.EVENT_LOG_BATCH_SIZE
+        self.flush_interval = settings.EVENT_LOG_FLUSH_INTERVAL_MS / 1000
+        self._queue = queue.Queue(maxsize=settings.EVENT_LOG_QUEUE_SIZE)
+        self._spool = _Spool(settings.EVENT_LOG_SPOOL_DIR, settings.EVENT_LOG_SPOOL_FSYNC)
+        self._spool.open()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Drain the queue and remove the spool; anything left unflushed stays spooled."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        drained = not self._thread.is_alive() and self._queue.empty() and self._overflow_from is None
+        with self._submit_lock:
+            self._spool.close(discard=drained)
+            self._thread = None
+        if not drained:
+            log.warning("event log stopped with %d events unflushed; they stay spooled for replay", self._queue.qsize())
+
+    def submit(self, rows: list[dict]) -> None:
+        with self._submit_lock:
+            if self.running:
+                if self._overflow_from is None and self._queue.qsize() + len(rows) <= self._queue.maxsize:
+                    seq = self._spool.append(rows)
+                    now = time.monotonic()
+                    for row in rows:
+                        self._queue.put_nowait((seq, now, row))
+                    self._stats["enqueued"] += len(rows)
+                    return
+                # Queue full: spool only, from a fresh segment so releasing queued
+                # rows' segments never removes these. The writer reads them back.
+                if self._overflow_from is None:
+                    self._spool.rotate()
+                    self._overflow_from = self._spool.seq
+                self._spool.append(rows)
+                self._stats["overflowed"] += len(rows)
+                return
+        # Writer not running (e.g. CLI): the caller pays for the insert.
+        self._stats["sync_fallbacks"] += len(rows)
+        _insert_rows(self.engine, rows)
+
+    def count_dropped(self, n: int) -> None:
+        self._stats["dropped"] += n
+
+    def metrics(self) -> dict:
+        out = {
+            "mode": settings.EVENT_LOG_MODE,
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self._queue.maxsize if self._queue else 0,
+            "spool_segments": self._spool.segment_count() if self._spool else 0,
+        }
+        out.update(self._stats)
+        return out
+
+    # -- background thread --
+    def _run(self) -> None:
+        self._replay_orphans()
+        while True:
+            if self._overflow_from is not None and self._queue.empty():
+                if not self._catch_up():
+                    return
+                continue
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not self._write([row for _, _, row in batch]):
+                return  # stopping with the database unavailable; rows remain spooled
+
+            latency_ms = (time.monotonic() - batch[0][1]) * 1000
+            self._stats["flushed"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["last_batch_size"] = len(batch)
+            self._stats["last_flush_latency_ms"] = round(latency_ms, 2)
+            self._stats["max_flush_latency_ms"] = round(max(latency_ms, self._stats["max_flush_latency_ms"] or 0), 2)
+
+            # FIFO + one consumer: every segment before the last row's one is fully committed.
+            last_seq = batch[-1][0]
+            with self._submit_lock:
+                if self._queue.empty() and last_seq == self._spool.seq:
+                    self._spool.rotate()
+                    last_seq = self._spool.seq
+                self._spool.release_before(last_seq)
+
+    def _write(self, rows: list[dict]) -> bool:
+        backoff = 0.1
+        while True:
+            try:
+                _insert_rows(self.engine, rows)
+                return True
+            except IntegrityError:
+                # e.g. the job row is gone; keep the good rows, drop the bad ones
+                for row in rows:
+                    try:
+                        _insert_rows(self.engine, [row])
+                    except IntegrityError:
+                        self._stats["dropped"] += 1
+                        log.error("dropping event %s for job %s: integrity error", row["id"], row["tow_job_id"])
+                return True
+            except SQLAlchemyError:
+                self._stats["write_errors"] += 1
+                log.exception("event log flush failed; retrying in %.1fs", backoff)
+                if self._stopping.wait(backoff):
+                    return False
+                backoff = min(backoff * 2, _RETRY_BACKOFF_MAX_S)
+
+    def _write_segment(self, path: str) -> Optional[int]:
+        """Insert a spool segment's rows and delete it; the row count, or None if stopped first."""
+        rows = _read_segment(path)
+        for i in range(0, len(rows), self.batch_size):
+            if not self._write(rows[i : i + self.batch_size]):
+                return None
+        os.remove(path)
+        return len(rows)
+
+    def _catch_up(self) -> bool:
+        """Write the overflow segments; new submits go back to the queue meanwhile."""
+        with self._submit_lock:
+            first = self._overflow_from
+            self._spool.rotate()  # closes the last overflow segment
+            end = self._spool.seq
+            self._overflow_from = None
+        for seq in range(first, end):
+            path = self._spool._segment_path(self._spool.instance, seq)
+            if not os.path.exists(path):
+                continue
+            n = self._write_segment(path)
+            if n is None:
+                # stopping with the database unavailable; keep the rest for replay
+                with self._submit_lock:
+                    self._overflow_from = seq
+                return False
+            self._stats["flushed"] += n
+        return True
+
+    def _replay_orphans(self) -> None:
+        for instance, lock, paths in self._spool.claim_orphans():
+            try:
+                for path in paths:
+                    n = self._write_segment(path)
+                    if n is None:
+                        return
+                    self._stats["replayed"] += n
+                os.remove(lock.name)
+                log.info("replayed spooled events from dead worker %s", instance)
+            finally:
+                lock.close()
+
+
+writer = EventWriter()
+
+
+def start() -> None:
+    if settings.EVENT_LOG_MODE == "write_behind":
+        writer.start()
+
+
+def stop() -> None:
+    writer.stop()
@@ -0,0 +1,179 @@
+"""
+Streaming ZIP evidence bundles.
+
+zipfile writes into a write-only sink that the generator drains after every
+chunk, so the archive goes out while it is being built: no temporary file,
+no whole-archive buffer. On a non-seekable output zipfile records sizes and
+CRCs in data descriptors after each entry, which every unzip tool reads.
+
+Layout, per job:
+
+    <job_id>/events.json          the event timeline
+    <job_id>/photos/<photo_id>.*  the uploaded files, as stored
+    <job_id>/manifest.json        job and photo metadata, SHA-256 of each file
+    manifest.json                 (last) every job's manifest path and SHA-256
+
+Hashes are computed while the bytes are streamed, so each manifest follows
+the files it covers. Jobs come through the export's server-side cursor, so
+a date-range bundle holds one chunk of job metadata and one read buffer at
+a time; only the zip central directory and the root manifest's job list
+grow with the bundle.
+"""
+import hashlib
+import json
+import os
+import time
+import zipfile
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from sqlalchemy.engine import Connection, Engine
+
+from app.models.event import TowJobEvent
+from app.models.photo import TowJobPhoto
+from app.models.tow_job import TowStatus
+from app.services.export import EVENT_COLUMNS, JOB_COLUMNS, PHOTO_COLUMNS, iter_job_chunks, load_children, to_record
+from app.services.storage import UPLOAD_DIR
+
+READ_CHUNK_BYTES = 1024 * 1024
+JOB_CHUNK_SIZE = 100
+
+
+class _Sink:
+    """Write-only, non-seekable file object; zipfile writes, the generator drains."""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def _json_bytes(obj) -> bytes:
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _photo_path(file_path: str) -> Optional[str]:
+    """Absolute path of a stored upload, or None if it points outside the upload dir."""
+    abs_path = os.path.abspath(file_path)
+    if not abs_path.startswith(os.path.abspath(UPLOAD_DIR) + os.sep):
+        return None
+    return abs_path
+
+
+class _BundleWriter:
+    def __init__(self) -> None:
+        self.sink = _Sink()
+        self.zf = zipfile.ZipFile(self.sink, "w", allowZip64=True)
+        self.date_time = time.gmtime()[:6]
+
+    def _info(self, name: str, compress: bool, size: int = 0) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, self.date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        info.file_size = size  # lets zipfile pick zip64 headers up front for big files
+        return info
+
+    def add_bytes(self, name: str, data: bytes) -> Iterator[bytes]:
+        with self.zf.open(self._info(name, compress=True, size=len(data)), "w") as dest:
+            dest.write(data)
+        yield self.sink.drain()
+
+    def add_file(self, name: str, path: str, digest) -> Iterator[bytes]:
+        """Copy `path` into the archive chunk by chunk, updating `digest` on the way."""
+        with open(path, "rb") as src, self.zf.open(
+            self._info(name, compress=False, size=os.path.getsize(path)), "w"
+        ) as dest:
+            while chunk := src.read(READ_CHUNK_BYTES):
+                digest.update(chunk)
+                dest.write(chunk)
+                out = self.sink.drain()
+                if out:
+                    yield out
+        yield self.sink.drain()
+
+    def close(self) -> bytes:
+        self.zf.close()
+        return self.sink.drain()
+
+
+def _job_entries(w: _BundleWriter, job: dict, events: list[dict], photos: list[dict]):
+    """Stream one job folder; returns its manifest's path and SHA-256."""
+    job_id = job["id"]
+    files = []
+
+    data = _json_bytes(events)
+    yield from w.add_bytes(f"{job_id}/events.json", data)
+    files.append({"path": "events.json", "size": len(data), "sha256": hashlib.sha256(data).hexdigest()})
+
+    missing = []
+    for photo in photos:
+        file_path = photo.pop("file_path")
+        abs_path = _photo_path(file_path)
+        if abs_path is None or not os.path.isfile(abs_path):
+            missing.append({**photo, "reason": "invalid file path" if abs_path is None else "file missing on server"})
+            continue
+        name = f"photos/{photo['id']}{os.path.splitext(abs_path)[1].lower()}"
+        digest = hashlib.sha256()
+        size = os.path.getsize(abs_path)
+        yield from w.add_file(f"{job_id}/{name}", abs_path, digest)
+        files.append({"path": name, "size": size, "sha256": digest.hexdigest(), "photo": photo})
+
+    manifest = _json_bytes(
+        {
+            "job": job,
+            "files": files,
+            "missing_photos": missing,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+    yield from w.add_bytes(f"{job_id}/manifest.json", manifest)
+    return {"path": f"{job_id}/manifest.json", "sha256": hashlib.sha256(manifest).hexdigest()}
+
+
+def iter_bundle(
+    conn: Connection,
+    job_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    status: Optional[TowStatus] = None,
+) -> Iterator[bytes]:
+    """ZIP bytes for one job (`job_id`) or every job created in [created_from, created_to)."""
+    w = _BundleWriter()
+    jobs = []
+    for chunk in iter_job_chunks(conn, created_from, created_to, status, JOB_CHUNK_SIZE, job_id=job_id):
+        job_ids = [row.id for row in chunk]
+        events = load_children(conn, TowJobEvent, EVENT_COLUMNS, job_ids)
+        photos = load_children(conn, TowJobPhoto, PHOTO_COLUMNS + ("file_path",), job_ids)
+        for row in chunk:
+            job = to_record(row, JOB_COLUMNS)
+            manifest = yield from _job_entries(w, job, events.get(row.id, []), photos.get(row.id, []))
+            jobs.append({"job_id": job["id"], "plate_number": job["plate_number"], "manifest": manifest})
+
+    index = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "filters": {
+            "job_id": job_id,
+            "created_from": created_from.isoformat() if created_from else None,
+            "created_to": created_to.isoformat() if created_to else None,
+            "status": status.value if status else None,
+        },
+        "job_count": len(jobs),
+        "jobs": jobs,
+    }
+    yield from w.add_bytes("manifest.json", _json_bytes(index))
+    yield w.close()
+
+
+def stream_bundle(engine: Engine, **kwargs) -> Iterator[bytes]:
+    """iter_bundle on a connection of its own, held for as long as the stream is consumed."""
+    with engine.connect() as conn:
+        yield from iter_bundle(conn, **kwargs)
@@ -0,0 +1,178 @@
+"""
+Streaming export of tow jobs with their events and photo metadata.
+
+Jobs in a creation range are read through one server-side cursor (psycopg2
+named cursor on Postgres) in (created_at, id) order, `chunk_size` rows at a
+time. Each chunk's events and photos are fetched with one IN query apiece
+and the chunk is encoded and yielded before the next is read, so memory
+stays flat however many rows the export covers.
+
+NDJSON writes one document per job with its events and photos nested. CSV
+is one flat table per file: "jobs" (the columns POST /tow-jobs/import
+reads back), "events" or "photos", each row carrying its tow_job_id.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+
+from app.models.event import TowJobEvent
+from app.models.photo import TowJobPhoto
+from app.models.tow_job import TowJob, TowStatus
+from app.services.pagination import datetime_bound
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_TABLES = ("jobs", "events", "photos")
+DEFAULT_CHUNK_SIZE = 1000
+
+JOB_COLUMNS = (
+    "id",
+    "plate_number",
+    "status",
+    "officer_id",
+    "assigned_driver_id",
+    "violation_type",
+    "notes",
+    "location_lat",
+    "location_lng",
+    "location_accuracy_m",
+    "created_at",
+    "updated_at",
+)
+EVENT_COLUMNS = ("id", "tow_job_id", "actor_user_id", "event_type", "message", "created_at")
+PHOTO_COLUMNS = (
+    "id",
+    "tow_job_id",
+    "uploaded_by_user_id",
+    "photo_type",
+    "content_type",
+    "size_bytes",
+    "lat",
+    "lng",
+    "accuracy_m",
+    "captured_at",
+    "created_at",
+)
+_COLUMNS = {"jobs": JOB_COLUMNS, "events": EVENT_COLUMNS, "photos": PHOTO_COLUMNS}
+
+
+def _value(v):
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return getattr(v, "value", v)
+
+
+def to_record(row, columns: tuple[str, ...]) -> dict:
+    return {c: _value(v) for c, v in zip(columns, row)}
+
+
+def iter_job_chunks(
+    conn: Connection,
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+    status: Optional[TowStatus],
+    chunk_size: int,
+    job_id: Optional[str] = None,
+) -> Iterator[list]:
+    """Rows of JOB_COLUMNS in (created_at, id) order, `chunk_size` at a time, off a server-side cursor."""
+    dialect = conn.dialect.name
+    q = select(*(getattr(TowJob, c) for c in JOB_COLUMNS))
+    if job_id:
+        q = q.where(TowJob.id == job_id)
+    if created_from:
+        q = q.where(TowJob.created_at >= datetime_bound(created_from, dialect))
+    if created_to:
+        q = q.where(TowJob.created_at < datetime_bound(created_to, dialect))
+    if status:
+        q = q.where(TowJob.status == status)
+    q = q.order_by(TowJob.created_at.asc(), TowJob.id.asc())
+    result = conn.execution_options(stream_results=True, max_row_buffer=chunk_size).execute(q)
+    try:
+        yield from result.partitions(chunk_size)
+    finally:
+        result.close()
+
+
+def load_children(conn: Connection, model, columns: tuple[str, ...], job_ids: list[str]) -> dict[str, list[dict]]:
+    """Events or photos of the given jobs as plain records, grouped by job, oldest first."""
+    by_job: dict[str, list[dict]] = {}
+    rows = conn.execute(
+        select(*(getattr(model, c) for c in columns))
+        .where(model.tow_job_id.in_(job_ids))
+        .order_by(model.tow_job_id, model.created_at.asc(), model.id.asc())
+    )
+    for row in rows:
+        by_job.setdefault(row.tow_job_id, []).append(to_record(row, columns))
+    return by_job
+
+
+def iter_export(
+    conn: Connection,
+    fmt: str,
+    table: str = "jobs",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    status: Optional[TowStatus] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Encoded export, one chunk of jobs per yielded block. `table` only applies to CSV."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {EXPORT_FORMATS}")
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"table must be one of {EXPORT_TABLES}")
+
+    buf = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.writer(buf)
+        writer.writerow(_COLUMNS[table])
+
+    for chunk in iter_job_chunks(conn, created_from, created_to, status, chunk_size):
+        job_ids = [row.id for row in chunk]
+        if fmt == "ndjson":
+            events = load_children(conn, TowJobEvent, EVENT_COLUMNS, job_ids)
+            photos = load_children(conn, TowJobPhoto, PHOTO_COLUMNS, job_ids)
+            for row in chunk:
+                doc = to_record(row, JOB_COLUMNS)
+                doc["events"] = events.get(row.id, [])
+                doc["photos"] = photos.get(row.id, [])
+                buf.write(json.dumps(doc, separators=(",", ":"), ensure_ascii=False))
+                buf.write("\n")
+        elif table == "jobs":
+            writer.writerows([_value(v) for v in row] for row in chunk)
+        else:
+            model = TowJobEvent if table == "events" else TowJobPhoto
+            children = load_children(conn, model, _COLUMNS[table], job_ids)
+            for job_id in job_ids:
+                writer.writerows(list(r.values()) for r in children.get(job_id, ()))
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+
+    if fmt == "csv" and buf.tell():
+        # header of an empty export
+        yield buf.getvalue().encode("utf-8")
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def stream_export(engine: Engine, fmt: str, gzip: bool = False, **kwargs) -> Iterator[bytes]:
+    """iter_export on a connection of its own, held for as long as the stream is consumed."""
+
+    def _chunks() -> Iterator[bytes]:
+        with engine.connect() as conn:
+            yield from iter_export(conn, fmt, **kwargs)
+
+    return gzip_stream(_chunks()) if gzip else _chunks()
@@ -0,0 +1,69 @@
+"""
+Radius and bounding-box job search.
+
+Candidates come from index range scans over the geohash cells covering the
+search box: one seek per (status, cell range) on ix_tow_jobs_status_geohash,
+which also holds the position, so this step never touches the table. They
+are then refined in one vectorized haversine pass, and only the final page of
+jobs is loaded.
+"""
+import numpy as np
+from sqlalchemy import false, select, true, union_all
+from sqlalchemy.sql import ColumnElement
+
+from app.core.geohash import EARTH_RADIUS_M, cell_ranges, cover
+from app.models.tow_job import TowJob, TowStatus
+
+MAX_RADIUS_M = 50_000
+MAX_BOX_DEGREES = 1.0
+
+Box = tuple[float, float, float, float]  # min_lat, min_lng, max_lat, max_lng
+
+
+def haversine_m(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _cell_clauses(column, box: Box) -> list[ColumnElement]:
+    prefixes = cover(*box)
+    if prefixes == [""]:
+        return [true()]
+    return [(column >= lo) & (column < hi) if hi else column >= lo for lo, hi in cell_ranges(prefixes)]
+
+
+def candidates_stmt(box: Box, statuses: tuple[TowStatus, ...], scope: ColumnElement | None = None):
+    """
+    (id, lat, lng) of jobs inside the box, as a UNION ALL with one branch per
+    cell range. A single OR across the ranges makes SQLite fall back to the
+    status index (it has no stats to cost the ranges), reading every open job.
+    """
+    min_lat, min_lng, max_lat, max_lng = box
+    base = select(TowJob.id, TowJob.location_lat, TowJob.location_lng).where(
+        TowJob.status.in_(statuses) if statuses else false(),
+        TowJob.location_lat.between(min_lat, max_lat),
+        TowJob.location_lng.between(min_lng, max_lng),
+    )
+    if scope is not None:
+        base = base.where(scope)
+    branches = [base.where(cell) for cell in _cell_clauses(TowJob.geohash, box)]
+    return branches[0] if len(branches) == 1 else union_all(*branches)
+
+
+def rank(rows, lat: float, lng: float, radius_m: float | None, limit: int) -> list[tuple[str, float]]:
+    """(job_id, distance_m) nearest first, dropping rows outside radius_m when given."""
+    if not rows:
+        return []
+    ids = np.array([r[0] for r in rows], dtype=object)
+    coords = np.array([(r[1], r[2]) for r in rows], dtype=np.float64)
+    dist = haversine_m(lat, lng, coords[:, 0], coords[:, 1])
+    if radius_m is not None:
+        keep = dist <= radius_m * (1 + 1e-9)  # haversine round-off: a job exactly radius_m away counts
+        ids, dist = ids[keep], dist[keep]
+    if len(dist) > limit:
+        top = np.argpartition(dist, limit - 1)[:limit]
+        ids, dist = ids[top], dist[top]
+    order = np.argsort(dist, kind="stable")
+    return [(str(ids[i]), float(dist[i])) for i in order]
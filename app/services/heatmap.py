@@ -0,0 +1,215 @@
+"""
+Job density heatmap tiles.
+
+Jobs are binned into web-mercator tiles at HEATMAP_ZOOM, each split into a
+GRID x GRID raster, with one (24, GRID, GRID) count array per tile, UTC day
+and violation type (see app.models.heatmap). `refresh_heatmap` reads
+tow_jobs forward from a watermark, bins a batch with numpy and adds it onto
+the stored arrays. The tiles and the watermark commit together, so each job
+is counted exactly once.
+
+Only jobs older than HEATMAP_SETTLE_SECONDS are read, so rows from
+transactions still in flight (created_at is set at insert, not commit) are
+not skipped. `rebuild=True` starts over from scratch.
+
+`render_tile` serves HEATMAP_ZOOM and up to MAX_ZOOM_OUT levels above it, by
+summing child tiles into the same grid.
+"""
+import asyncio
+import logging
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import bindparam, delete, insert, select, tuple_, update
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.models.heatmap import HeatmapTile
+from app.models.tow_job import TowJob
+from app.models.watermark import Watermark
+from app.services import watermarks
+from app.services.pagination import datetime_bound
+
+log = logging.getLogger(__name__)
+
+HEATMAP_ZOOM = 12  # ~9.8km tiles at the equator
+GRID = 64  # ~150m cells
+MAX_ZOOM_OUT = 3
+WATERMARK = "heatmap_tiles"
+REFRESH_BATCH_SIZE = 50_000
+
+_HOURS = 24
+_TILE_CELLS = _HOURS * GRID * GRID
+_MAX_LAT = 85.05112878
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def tile_coords(lat: np.ndarray, lng: np.ndarray, zoom: int = HEATMAP_ZOOM):
+    """Vectorized (tile_x, tile_y, cell_x, cell_y); cell_y 0 is the tile's north edge."""
+    n = 1 << zoom
+    lat_r = np.radians(np.clip(lat, -_MAX_LAT, _MAX_LAT))
+    fx = np.clip((np.asarray(lng) + 180.0) / 360.0 * n, 0, n - 1e-9)
+    fy = np.clip((1.0 - np.arcsinh(np.tan(lat_r)) / np.pi) / 2.0 * n, 0, n - 1e-9)
+    tx, ty = np.floor(fx).astype(np.int64), np.floor(fy).astype(np.int64)
+    cx = np.minimum(((fx - tx) * GRID).astype(np.int64), GRID - 1)
+    cy = np.minimum(((fy - ty) * GRID).astype(np.int64), GRID - 1)
+    return tx, ty, cx, cy
+
+
+def pack(counts: np.ndarray) -> bytes:
+    return zlib.compress(counts.astype("<u4").tobytes(), 1)
+
+
+def unpack(blob: bytes) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(blob), dtype="<u4").reshape(_HOURS, GRID, GRID)
+
+
+def _utc_naive(dt: datetime) -> datetime:
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+# ---------- aggregation ----------
+def bin_jobs(rows: list) -> dict[tuple[int, int, date, str], tuple[np.ndarray, np.ndarray]]:
+    """
+    rows of (created_at, lat, lng, violation_type) -> {(x, y, day, type): (flat cell indexes, counts)}
+    with flat indexes into a (24, GRID, GRID) array.
+    """
+    n = len(rows)
+    lat = np.fromiter((r[1] for r in rows), dtype=np.float64, count=n)
+    lng = np.fromiter((r[2] for r in rows), dtype=np.float64, count=n)
+    secs = np.fromiter(((_utc_naive(r[0]) - _EPOCH) // _SECOND for r in rows), dtype=np.int64, count=n)
+    days, hours = secs // 86400, secs % 86400 // 3600
+    types: dict[str, int] = {}
+    type_code = np.fromiter((types.setdefault(r[3] or "", len(types)) for r in rows), dtype=np.int64, count=n)
+    type_names = list(types)
+
+    # one int64 key per (tile, day, type) group, then per cell within the group
+    tx, ty, cx, cy = tile_coords(lat, lng)
+    day0 = int(days.min())
+    span = int(days.max()) - day0 + 1
+    key = ((tx << HEATMAP_ZOOM | ty) * span + (days - day0)) * len(type_names) + type_code
+    groups, group = np.unique(key, return_inverse=True)
+    cells, counts = np.unique(group * _TILE_CELLS + (hours * GRID + cy) * GRID + cx, return_counts=True)
+
+    owner = cells // _TILE_CELLS
+    bounds = np.searchsorted(owner, np.arange(len(groups) + 1))
+    out = {}
+    for g, k in enumerate(groups.tolist()):
+        k, t = divmod(k, len(type_names))
+        tile, d = divmod(k, span)
+        x, y = divmod(tile, 1 << HEATMAP_ZOOM)
+        lo, hi = bounds[g], bounds[g + 1]
+        out[(x, y, _EPOCH.date() + timedelta(days=day0 + d), type_names[t])] = (cells[lo:hi] % _TILE_CELLS, counts[lo:hi])
+    return out
+
+
+def _merge(conn: Connection, binned: dict) -> None:
+    keys = list(binned)
+    existing = {}
+    for i in range(0, len(keys), 500):
+        chunk = keys[i : i + 500]
+        for row in conn.execute(
+            select(HeatmapTile.id, HeatmapTile.x, HeatmapTile.y, HeatmapTile.day, HeatmapTile.violation_type,
+                   HeatmapTile.counts).where(
+                tuple_(HeatmapTile.x, HeatmapTile.y, HeatmapTile.day, HeatmapTile.violation_type).in_(chunk)
+            )
+        ):
+            existing[(row.x, row.y, row.day, row.violation_type)] = (row.id, row.counts)
+
+    now = datetime.now(timezone.utc)
+    inserts, updates = [], []
+    for key, (cells, counts) in binned.items():
+        row_id, blob = existing.get(key, (None, None))
+        arr = unpack(blob).copy() if blob is not None else np.zeros((_HOURS, GRID, GRID), dtype=np.uint32)
+        arr.reshape(-1)[cells] += counts.astype(np.uint32)
+        values = {"counts": pack(arr), "total": int(arr.sum()), "updated_at": now}
+        if row_id is None:
+            x, y, day, vtype = key
+            inserts.append({"x": x, "y": y, "day": day, "violation_type": vtype, **values})
+        else:
+            updates.append({"b_id": row_id, **values})
+    if inserts:
+        conn.execute(insert(HeatmapTile), inserts)
+    if updates:
+        conn.execute(
+            update(HeatmapTile)
+            .where(HeatmapTile.id == bindparam("b_id"))
+            .values(counts=bindparam("counts"), total=bindparam("total"), updated_at=bindparam("updated_at")),
+            updates,
+        )
+
+
+def _refresh_batch(engine: Engine, cutoff: datetime, batch_size: int) -> int:
+    with engine.connect() as conn:
+        dialect = conn.dialect.name
+        position = watermarks.claim(conn, WATERMARK)
+        q = select(TowJob.created_at, TowJob.location_lat, TowJob.location_lng, TowJob.violation_type, TowJob.id).where(
+            TowJob.created_at < datetime_bound(cutoff, dialect)
+        )
+        if position:
+            after = datetime.fromisoformat(position[0])
+            q = q.where(tuple_(TowJob.created_at, TowJob.id) > tuple_(datetime_bound(after, dialect), position[1]))
+        rows = conn.execute(q.order_by(TowJob.created_at.asc(), TowJob.id.asc()).limit(batch_size)).all()
+        if not rows:
+            conn.rollback()
+            return 0
+        _merge(conn, bin_jobs(rows))
+        last = rows[-1]
+        watermarks.advance(conn, WATERMARK, [last.created_at.isoformat(), last.id])
+        conn.commit()
+    return len(rows)
+
+
+def refresh_heatmap(engine: Engine, rebuild: bool = False, batch_size: int = REFRESH_BATCH_SIZE) -> int:
+    """Fold settled jobs past the watermark into the tiles; returns how many were added."""
+    if rebuild:
+        with engine.begin() as conn:
+            conn.execute(delete(HeatmapTile))
+            conn.execute(delete(Watermark).where(Watermark.name == WATERMARK))
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.HEATMAP_SETTLE_SECONDS)
+    total = 0
+    while True:
+        n = _refresh_batch(engine, cutoff, batch_size)
+        total += n
+        if n < batch_size:
+            return total
+
+
+async def refresh_periodically(engine: Engine, interval_seconds: float) -> None:
+    """Background loop for the app lifespan; the work itself runs off the event loop."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(refresh_heatmap, engine)
+        except Exception:
+            log.exception("heatmap refresh failed")
+
+
+# ---------- reads ----------
+def tile_query(z: int, x: int, y: int, day_from: date, day_to: date, violation_type: Optional[str]):
+    f = 1 << (HEATMAP_ZOOM - z)
+    q = select(HeatmapTile.x, HeatmapTile.y, HeatmapTile.counts).where(
+        HeatmapTile.x.between(x * f, (x + 1) * f - 1),
+        HeatmapTile.y.between(y * f, (y + 1) * f - 1),
+        HeatmapTile.day.between(day_from, day_to),
+    )
+    if violation_type is not None:
+        q = q.where(HeatmapTile.violation_type == violation_type)
+    return q
+
+
+def render_tile(z: int, x: int, y: int, rows: Iterable, hours: list[int]) -> np.ndarray:
+    """Sum stored tiles (x, y, counts) under tile z/x/y into one GRID x GRID raster for the given hours."""
+    f = 1 << (HEATMAP_ZOOM - z)
+    step = GRID // f
+    out = np.zeros((GRID, GRID), dtype=np.uint64)
+    for tx, ty, blob in rows:
+        raster = unpack(blob)[hours].sum(axis=0, dtype=np.uint64)
+        if f > 1:
+            raster = raster.reshape(step, f, step, f).sum(axis=(1, 3))
+        ox, oy = (tx - x * f) * step, (ty - y * f) * step
+        out[oy : oy + step, ox : ox + step] += raster
+    return out
@@ -0,0 +1,34 @@
+"""
+Job notes: rows in tow_job_notes, plus a bounded preview of the latest note
+on TowJob.notes so list queries never drag the history along.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.ids import new_id
+from app.models.note import TowJobNote
+from app.models.tow_job import TowJob
+from app.models.user import User
+
+NOTE_PREVIEW_CHARS = 280
+
+
+def note_preview(body: str) -> str:
+    text = " ".join(body.split())
+    if len(text) <= NOTE_PREVIEW_CHARS:
+        return text
+    return text[: NOTE_PREVIEW_CHARS - 1].rstrip() + "…"
+
+
+def add_note(db: Session | AsyncSession, job: TowJob, author: User, body: str) -> TowJobNote:
+    body = body.strip()
+    note = TowJobNote(
+        id=new_id(),
+        tow_job_id=job.id,
+        author_user_id=author.id,
+        author_role=author.role.value,
+        body=body,
+    )
+    db.add(note)
+    job.notes = note_preview(body)
+    return note
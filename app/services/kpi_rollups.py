@@ -0,0 +1,354 @@
+"""
+Operational KPI rollups from the event log.
+
+Three durations per job, paired up from tow_job_events:
+
+    assign   CREATED -> first ASSIGNED
+    arrive   latest ASSIGNED before arrival -> first "Status ... -> ARRIVED"
+    tow      CREATED -> first "Status ... -> TOWED"
+
+`refresh_kpis` reads events forward from a watermark on (inserted_at, id),
+keeps each job's milestones in tow_job_milestones, and folds every duration
+that completes into kpi_daily, for the day it completed (UTC) and for all
+jobs, the job's officer and its driver. Each batch is aggregated with numpy
+(counts, sums, min/max and a log-bucket histogram per group). Milestones,
+rollups and the watermark commit together.
+
+The watermark can't follow created_at: write-behind stamps it in the app,
+and a spool replayed after a crash or a batch retried through an outage
+reaches the table long after its created_at, behind a watermark that has
+moved on. inserted_at is set by the database on insert (transaction start
+on Postgres), so only rows whose insert is still in flight can trail it;
+events inserted less than KPI_SETTLE_SECONDS ago wait for the next run.
+Durations are still measured on created_at, and a late CREATED completes
+the spans of milestones already recorded.
+"""
+import asyncio
+import json
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import bindparam, delete, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.event import TowJobEvent
+from app.models.kpi import KpiDaily, TowJobMilestone
+from app.models.tow_job import TowStatus
+from app.models.user import User
+from app.models.watermark import Watermark
+from app.services import watermarks
+from app.services.pagination import datetime_bound
+
+log = logging.getLogger(__name__)
+
+WATERMARK = "kpi_rollups"
+REFRESH_BATCH_SIZE = 20_000
+METRICS = ("assign", "arrive", "tow")
+ALL_SUBJECTS = ""  # subject_id of the "all" rows
+
+# seconds; bucket i is [HIST_EDGES[i], HIST_EDGES[i + 1]), the last one is open-ended
+HIST_EDGES = np.concatenate(([0.0], np.geomspace(10, 7 * 86400, 31)))
+
+_TRACKED_EVENTS = ("CREATED", "ASSIGNED", "STATUS_CHANGED")
+_ASSIGNED_RE = re.compile(r"^Assigned to driver (\S+)")
+_STATUS_RE = re.compile(r"^Status (\w+) -> (\w+)")
+_MILESTONE_FIELDS = ("officer_id", "driver_id", "created_at", "assigned_at", "arrived_at", "towed_at")
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def _epoch_seconds(dt: datetime) -> float:
+    if dt.tzinfo:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) / _SECOND
+
+
+def _pack(hist: np.ndarray) -> bytes:
+    return hist.astype("<u4").tobytes()
+
+
+def _unpack(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype="<u4")
+
+
+# ---------- pairing events ----------
+def apply_event(m: dict, event_type: str, at: datetime, actor_id: str, message: Optional[str], spans: list) -> bool:
+    """
+    Advance one job's milestones `m` by an event; completed durations are
+    appended to `spans` as (metric, officer_id, driver_id, start, end).
+    Returns whether `m` changed.
+    """
+    message = message or ""
+    if event_type == "CREATED":
+        if m["created_at"] is not None:
+            return False
+        m["created_at"], m["officer_id"] = at, actor_id
+        if m["assigned_at"] is not None:
+            spans.append(("assign", actor_id, m["driver_id"], at, m["assigned_at"]))
+        if m["towed_at"] is not None:
+            spans.append(("tow", actor_id, m["driver_id"], at, m["towed_at"]))
+        return True
+    if event_type == "ASSIGNED":
+        if m["arrived_at"] is not None:
+            return False
+        match = _ASSIGNED_RE.match(message)
+        if m["assigned_at"] is None and m["created_at"] is not None:
+            spans.append(("assign", m["officer_id"], match and match.group(1), m["created_at"], at))
+        m["assigned_at"], m["driver_id"] = at, match and match.group(1)
+        return True
+    match = _STATUS_RE.match(message)
+    new_status = match and match.group(2)
+    if new_status == TowStatus.ARRIVED.value and m["arrived_at"] is None:
+        m["arrived_at"] = at
+        if m["assigned_at"] is not None:
+            spans.append(("arrive", m["officer_id"], m["driver_id"], m["assigned_at"], at))
+        return True
+    if new_status == TowStatus.TOWED.value and m["towed_at"] is None:
+        m["towed_at"] = at
+        if m["created_at"] is not None:
+            spans.append(("tow", m["officer_id"], m["driver_id"], m["created_at"], at))
+        return True
+    return False
+
+
+def aggregate(spans: list) -> dict[tuple[date, str, str, str], tuple[int, float, float, float, np.ndarray]]:
+    """spans -> {(day, dimension, subject_id, metric): (count, sum_s, min_s, max_s, histogram)}"""
+    start = np.array([_epoch_seconds(s[3]) for s in spans], dtype=np.float64)
+    end = np.array([_epoch_seconds(s[4]) for s in spans], dtype=np.float64)
+    duration = np.maximum(end - start, 0.0)
+    day = (end // 86400).astype(np.int64)
+
+    # each span counts once for "all" and once per known officer/driver
+    subjects: dict[tuple[str, str, str], int] = {}
+    idx, code = [], []
+    for i, (metric, officer_id, driver_id, _, _) in enumerate(spans):
+        for dimension, subject in (("all", ALL_SUBJECTS), ("officer", officer_id), ("driver", driver_id)):
+            if subject is not None:
+                idx.append(i)
+                code.append(subjects.setdefault((dimension, subject, metric), len(subjects)))
+    idx, code = np.array(idx, dtype=np.int64), np.array(code, dtype=np.int64)
+    names = list(subjects)
+
+    day0 = int(day.min())
+    groups, group = np.unique((day[idx] - day0) * len(names) + code, return_inverse=True)
+    d = duration[idx]
+    n = len(groups)
+    counts = np.bincount(group, minlength=n)
+    sums = np.bincount(group, weights=d, minlength=n)
+    mins = np.full(n, np.inf)
+    maxs = np.zeros(n)
+    np.minimum.at(mins, group, d)
+    np.maximum.at(maxs, group, d)
+    bucket = np.clip(np.searchsorted(HIST_EDGES, d, side="right") - 1, 0, len(HIST_EDGES) - 1)
+    hists = np.bincount(group * len(HIST_EDGES) + bucket, minlength=n * len(HIST_EDGES)).reshape(n, -1)
+
+    out = {}
+    for g, k in enumerate(groups.tolist()):
+        dd, c = divmod(k, len(names))
+        dimension, subject, metric = names[c]
+        key = (_EPOCH.date() + timedelta(days=day0 + dd), dimension, subject, metric)
+        out[key] = (int(counts[g]), float(sums[g]), float(mins[g]), float(maxs[g]), hists[g])
+    return out
+
+
+# ---------- refresh ----------
+def _load_milestones(conn: Connection, job_ids: list[str]) -> dict[str, dict]:
+    out = {}
+    for i in range(0, len(job_ids), 500):
+        for row in conn.execute(
+            select(TowJobMilestone).where(TowJobMilestone.tow_job_id.in_(job_ids[i : i + 500]))
+        ).mappings():
+            out[row["tow_job_id"]] = dict(row)
+    return out
+
+
+def _save_milestones(conn: Connection, rows: list[dict]) -> None:
+    ins = (pg_insert if conn.dialect.name == "postgresql" else sqlite_insert)(TowJobMilestone)
+    stmt = ins.on_conflict_do_update(
+        index_elements=["tow_job_id"], set_={f: getattr(ins.excluded, f) for f in _MILESTONE_FIELDS}
+    )
+    conn.execute(stmt, rows)
+
+
+def _merge_rollups(conn: Connection, rollups: dict) -> None:
+    keys = list(rollups)
+    existing = {}
+    for i in range(0, len(keys), 500):
+        for row in conn.execute(
+            select(KpiDaily).where(
+                tuple_(KpiDaily.day, KpiDaily.dimension, KpiDaily.subject_id, KpiDaily.metric).in_(keys[i : i + 500])
+            )
+        ).mappings():
+            existing[(row["day"], row["dimension"], row["subject_id"], row["metric"])] = row
+
+    inserts, updates = [], []
+    for key, (count, sum_s, min_s, max_s, hist) in rollups.items():
+        old = existing.get(key)
+        if old is None:
+            day, dimension, subject_id, metric = key
+            inserts.append(
+                {"day": day, "dimension": dimension, "subject_id": subject_id, "metric": metric, "count": count,
+                 "sum_s": sum_s, "min_s": min_s, "max_s": max_s, "histogram": _pack(hist)}
+            )
+        else:
+            updates.append(
+                {"b_day": key[0], "b_dimension": key[1], "b_subject_id": key[2], "b_metric": key[3],
+                 "count": old["count"] + count, "sum_s": old["sum_s"] + sum_s,
+                 "min_s": min(old["min_s"], min_s), "max_s": max(old["max_s"], max_s),
+                 "histogram": _pack(_unpack(old["histogram"]) + hist)}
+            )
+    if inserts:
+        conn.execute(insert(KpiDaily), inserts)
+    if updates:
+        conn.execute(
+            update(KpiDaily)
+            .where(
+                KpiDaily.day == bindparam("b_day"),
+                KpiDaily.dimension == bindparam("b_dimension"),
+                KpiDaily.subject_id == bindparam("b_subject_id"),
+                KpiDaily.metric == bindparam("b_metric"),
+            )
+            .values(
+                count=bindparam("count"),
+                sum_s=bindparam("sum_s"),
+                min_s=bindparam("min_s"),
+                max_s=bindparam("max_s"),
+                histogram=bindparam("histogram"),
+            ),
+            updates,
+        )
+
+
+def _refresh_batch(engine: Engine, cutoff: datetime, batch_size: int) -> int:
+    with engine.connect() as conn:
+        dialect = conn.dialect.name
+        position = watermarks.claim(conn, WATERMARK)
+        q = select(
+            TowJobEvent.inserted_at,
+            TowJobEvent.created_at,
+            TowJobEvent.id,
+            TowJobEvent.tow_job_id,
+            TowJobEvent.actor_user_id,
+            TowJobEvent.event_type,
+            TowJobEvent.message,
+        ).where(TowJobEvent.inserted_at < datetime_bound(cutoff, dialect))
+        if position:
+            after = datetime.fromisoformat(position[0])
+            q = q.where(
+                tuple_(TowJobEvent.inserted_at, TowJobEvent.id) > tuple_(datetime_bound(after, dialect), position[1])
+            )
+        rows = conn.execute(q.order_by(TowJobEvent.inserted_at.asc(), TowJobEvent.id.asc()).limit(batch_size)).all()
+        if not rows:
+            conn.rollback()
+            return 0
+
+        # pair in event order; a replayed spool lands interleaved with newer rows
+        tracked = sorted((r for r in rows if r.event_type in _TRACKED_EVENTS), key=lambda r: (r.created_at, r.id))
+        milestones = _load_milestones(conn, sorted({r.tow_job_id for r in tracked}))
+        changed, spans = {}, []
+        for r in tracked:
+            m = milestones.setdefault(r.tow_job_id, {"tow_job_id": r.tow_job_id, **dict.fromkeys(_MILESTONE_FIELDS)})
+            if apply_event(m, r.event_type, r.created_at, r.actor_user_id, r.message, spans):
+                changed[r.tow_job_id] = m
+        if changed:
+            _save_milestones(conn, list(changed.values()))
+        if spans:
+            _merge_rollups(conn, aggregate(spans))
+        last = rows[-1]
+        watermarks.advance(conn, WATERMARK, [last.inserted_at.isoformat(), last.id])
+        conn.commit()
+    return len(rows)
+
+
+def refresh_kpis(engine: Engine, rebuild: bool = False, batch_size: int = REFRESH_BATCH_SIZE) -> int:
+    """Fold settled events past the watermark into the rollups; returns how many events were read."""
+    if rebuild:
+        with engine.begin() as conn:
+            conn.execute(delete(KpiDaily))
+            conn.execute(delete(TowJobMilestone))
+            conn.execute(delete(Watermark).where(Watermark.name == WATERMARK))
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.KPI_SETTLE_SECONDS)
+    total = 0
+    while True:
+        n = _refresh_batch(engine, cutoff, batch_size)
+        total += n
+        if n < batch_size:
+            return total
+
+
+async def refresh_periodically(engine: Engine, interval_seconds: float) -> None:
+    """Background loop for the app lifespan; the work itself runs off the event loop."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(refresh_kpis, engine)
+        except Exception:
+            log.exception("KPI rollup refresh failed")
+
+
+# ---------- reads ----------
+def _percentile(hist: np.ndarray, q: float, lo: float, hi: float) -> float:
+    """Upper edge of the bucket holding the q-quantile, clamped to the observed range."""
+    k = int(np.searchsorted(np.cumsum(hist), q * hist.sum()))
+    upper = HIST_EDGES[k + 1] if k + 1 < len(HIST_EDGES) else hi
+    return float(min(max(upper, lo), hi))
+
+
+def _stats(count: int, sum_s: float, min_s: float, max_s: float, hist: np.ndarray) -> dict:
+    return {
+        "count": count,
+        "mean_s": round(sum_s / count, 1),
+        "min_s": round(min_s, 1),
+        "max_s": round(max_s, 1),
+        "p50_s": round(_percentile(hist, 0.5, min_s, max_s), 1),
+        "p90_s": round(_percentile(hist, 0.9, min_s, max_s), 1),
+    }
+
+
+def kpi_summary(db: Session, dimension: str, date_from: date, date_to: date) -> list[dict]:
+    """
+    Rollup stats per day (dimension "all") or per driver/officer over the
+    range. Reads only kpi_daily, so the cost depends on days x subjects,
+    not on how many events exist.
+    """
+    rows = db.execute(
+        select(KpiDaily).where(KpiDaily.dimension == dimension, KpiDaily.day.between(date_from, date_to))
+    ).scalars()
+    groups: dict = {}
+    for r in rows:
+        key = r.day if dimension == "all" else r.subject_id
+        acc = groups.setdefault(key, {}).get(r.metric)
+        hist = _unpack(r.histogram)
+        if acc is None:
+            groups[key][r.metric] = [r.count, r.sum_s, r.min_s, r.max_s, hist.astype(np.int64)]
+        else:
+            acc[0] += r.count
+            acc[1] += r.sum_s
+            acc[2] = min(acc[2], r.min_s)
+            acc[3] = max(acc[3], r.max_s)
+            acc[4] = acc[4] + hist
+
+    names = {}
+    if dimension != "all" and groups:
+        names = dict(db.execute(select(User.id, User.name).where(User.id.in_(list(groups)))).all())
+    out = []
+    for key in sorted(groups):
+        item = {"day": key} if dimension == "all" else {"subject_id": key, "name": names.get(key)}
+        for metric in METRICS:
+            acc = groups[key].get(metric)
+            item[metric] = _stats(*acc) if acc else None
+        out.append(item)
+    return out
+
+
+def rollup_position(db: Session) -> Optional[str]:
+    """inserted_at of the last event folded in, i.e. how current the rollups are."""
+    position = db.execute(select(Watermark.position).where(Watermark.name == WATERMARK)).scalar_one_or_none()
+    return json.loads(position)[0] if position else None
@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import String, literal
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque keyset cursor: urlsafe base64 of a JSON list (datetimes as ISO)."""
+    plain = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(plain, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def parse_cursor_datetime(value: Any) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def datetime_bound(value: datetime, dialect_name: str):
+    """
+    Bind a datetime for comparison against a DateTime column.
+
+    SQLite keeps timestamps as text, and server_default=func.now() writes
+    'YYYY-MM-DD HH:MM:SS' while SQLAlchemy binds '... HH:MM:SS.000000', so the
+    default bind sorts after equal rows. Render the stored format instead.
+    """
+    if dialect_name != "sqlite":
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    text = value.strftime("%Y-%m-%d %H:%M:%S")
+    if value.microsecond:
+        text += f".{value.microsecond:06d}"
+    return literal(text, String)
+
+
+def prefix_range(column, prefix: str):
+    """Index-friendly `column LIKE 'prefix%'` for case-sensitive text."""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return (column >= prefix) & (column < upper)
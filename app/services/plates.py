@@ -0,0 +1,105 @@
+"""
+Plate normalization and repeat-offender search.
+
+Plates are written by hand ("AB-123", "ab 123", "AB123"), so jobs also carry
+a `plate_key` with everything but letters and digits removed. Per-plate job
+counts live in plate_offenses, updated with each new job the same way the job
+counters are: staged on the session and upserted right before commit.
+
+Search runs on plate_offenses (one row per plate, not per job) through a
+trigram index: FTS5 with the trigram tokenizer on SQLite, pg_trgm GIN on
+Postgres. Both need at least three characters; shorter input is a prefix
+search on the unique plate_key index. Matches are ranked by offense count.
+"""
+from collections import Counter
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import column, event, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.plate import PlateOffense
+from app.services.pagination import prefix_range
+
+TRIGRAM_MIN_CHARS = 3
+MAX_SEARCH_RESULTS = 100
+
+_PENDING_KEY = "plate_offense_deltas"
+
+
+def normalize_plate(plate: str) -> str:
+    return "".join(ch for ch in plate.upper() if ch.isalnum())
+
+
+def record_plate(db: Session | AsyncSession, plate_number: str, n: int = 1) -> None:
+    """Count `n` new jobs against this plate when the transaction commits."""
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    pending: dict[str, list] = session.info.setdefault(_PENDING_KEY, {})
+    key = normalize_plate(plate_number)
+    if key in pending:
+        pending[key][0] += n
+        pending[key][1] = plate_number
+    else:
+        pending[key] = [n, plate_number]
+
+
+def record_plates(db: Session, plate_numbers: list[str]) -> None:
+    for plate_number, n in Counter(plate_numbers).items():
+        record_plate(db, plate_number, n)
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_plate_deltas(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"plate_key": key, "plate_number": plate_number, "offense_count": n, "last_seen_at": now}
+        for key, (n, plate_number) in sorted(pending.items())
+        if key
+    ]
+    ins = pg_insert if session.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = ins(PlateOffense)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["plate_key"],
+        set_={
+            "offense_count": PlateOffense.offense_count + stmt.excluded.offense_count,
+            "plate_number": stmt.excluded.plate_number,
+            "last_seen_at": stmt.excluded.last_seen_at,
+        },
+    )
+    if rows:
+        session.execute(stmt, rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_plate_deltas(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def plate_search_stmt(dialect: str, query: str, limit: int):
+    """Statement returning PlateOffense columns for `query`, most offenses first."""
+    key = normalize_plate(query)
+    if not key:
+        raise HTTPException(status_code=400, detail="q must contain letters or digits")
+    cols = select(
+        PlateOffense.plate_key, PlateOffense.plate_number, PlateOffense.offense_count, PlateOffense.last_seen_at
+    )
+    ranked = (PlateOffense.offense_count.desc(), PlateOffense.last_seen_at.desc())
+
+    if len(key) < TRIGRAM_MIN_CHARS:
+        return cols.where(prefix_range(PlateOffense.plate_key, key)).order_by(*ranked).limit(limit)
+    if dialect == "sqlite":
+        # keys are alphanumeric, so quoting makes a plain substring phrase
+        hits = (
+            text("SELECT rowid FROM plate_offenses_fts WHERE plate_offenses_fts MATCH :q")
+            .bindparams(q=f'"{key}"')
+            .columns(column("rowid"))
+        )
+        return cols.where(PlateOffense.id.in_(hits)).order_by(*ranked).limit(limit)
+    # Postgres: LIKE with both wildcards is served by the gin_trgm_ops index
+    return cols.where(PlateOffense.plate_key.like(f"%{key}%")).order_by(*ranked).limit(limit)
@@ -0,0 +1,125 @@
+"""
+Query-plan guard for the hot list/dashboard queries.
+
+Each statement below mirrors a query issued by a router or dashboard. The
+check asks the database for its plan and reports any full table scan, so a
+missing index fails loudly instead of degrading quietly as tables grow.
+"""
+import re
+from datetime import date, datetime
+from typing import Callable
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
+
+from app.core.geohash import radius_box
+from app.models.event import TowJobEvent
+from app.models.kpi import KpiDaily
+from app.models.note import TowJobNote
+from app.models.photo import TowJobPhoto
+from app.models.tow_job import OPEN_STATUSES, TowJob, TowStatus
+from app.models.user import User, UserRole
+from app.services.geo import candidates_stmt
+from app.services.heatmap import tile_query
+from app.services.pagination import DEFAULT_PAGE_SIZE, datetime_bound, prefix_range
+from app.services.plates import plate_search_stmt
+from app.services.user_search import user_search_stmt
+
+_SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
+_SAMPLE_TS = datetime(2026, 1, 1, 12, 0, 0)
+
+_newest = (TowJob.created_at.desc(), TowJob.id.desc())
+
+
+def _queries(dialect: str) -> dict[str, Callable[[], Select]]:
+    page = DEFAULT_PAGE_SIZE + 1
+    return {
+        "tow_jobs list (dispatcher)": lambda: select(TowJob).order_by(*_newest).limit(page),
+        "tow_jobs list (officer)": lambda: select(TowJob)
+        .where(TowJob.officer_id == _SAMPLE_ID)
+        .order_by(*_newest)
+        .limit(page),
+        "tow_jobs list (driver)": lambda: select(TowJob)
+        .where(TowJob.assigned_driver_id == _SAMPLE_ID)
+        .order_by(*_newest)
+        .limit(page),
+        "tow_jobs list (status)": lambda: select(TowJob)
+        .where(TowJob.status == TowStatus.NEW)
+        .order_by(*_newest)
+        .limit(page),
+        "tow_jobs list (plate prefix)": lambda: select(TowJob)
+        .where(prefix_range(TowJob.plate_number, "AB"))
+        .order_by(*_newest)
+        .limit(page),
+        "tow_jobs list (plate key)": lambda: select(TowJob)
+        .where(TowJob.plate_key == "AB123")
+        .order_by(*_newest)
+        .limit(page),
+        "plate search (trigram)": lambda: plate_search_stmt(dialect, "b12", 20),
+        "plate search (short prefix)": lambda: plate_search_stmt(dialect, "ab", 20),
+        "tow_jobs list (next page)": lambda: select(TowJob)
+        .where(tuple_(TowJob.created_at, TowJob.id) < tuple_(datetime_bound(_SAMPLE_TS, dialect), _SAMPLE_ID))
+        .order_by(*_newest)
+        .limit(page),
+        "tow_job_events for job": lambda: select(TowJobEvent)
+        .where(TowJobEvent.tow_job_id == _SAMPLE_ID)
+        .order_by(TowJobEvent.created_at.asc()),
+        "tow_job_notes for job (next page)": lambda: select(TowJobNote)
+        .where(TowJobNote.tow_job_id == _SAMPLE_ID, TowJobNote.id > _SAMPLE_ID)
+        .order_by(TowJobNote.id.asc())
+        .limit(page),
+        "tow_job_photos for job": lambda: select(TowJobPhoto).where(TowJobPhoto.tow_job_id == _SAMPLE_ID),
+        "users drivers (dispatcher)": lambda: select(User)
+        .where(User.role == UserRole.DRIVER, User.is_active == True)  # noqa: E712
+        .order_by(User.name.asc()),
+        "users directory (admin)": lambda: user_search_stmt(dialect, role=UserRole.OFFICER).limit(page),
+        "users directory (next page)": lambda: user_search_stmt(
+            dialect, after=(UserRole.OFFICER.value, "M", _SAMPLE_ID)
+        ).limit(page),
+        "users directory (phone prefix)": lambda: user_search_stmt(dialect, q="+252 63").limit(page),
+        "users directory (name words)": lambda: user_search_stmt(dialect, q="ahm moh").limit(page),
+        "tow_jobs nearby (open, 2km)": lambda: candidates_stmt(radius_box(9.56, 44.06, 2000), OPEN_STATUSES),
+        "heatmap tile (z=10, 30 days)": lambda: tile_query(10, 645, 483, date(2026, 1, 1), date(2026, 1, 30), None),
+        "kpi rollup (events after watermark)": lambda: select(TowJobEvent.id)
+        .where(tuple_(TowJobEvent.inserted_at, TowJobEvent.id) > tuple_(datetime_bound(_SAMPLE_TS, dialect), _SAMPLE_ID))
+        .order_by(TowJobEvent.inserted_at.asc(), TowJobEvent.id.asc())
+        .limit(1000),
+        "kpi daily (by driver, 30 days)": lambda: select(KpiDaily).where(
+            KpiDaily.dimension == "driver", KpiDaily.day.between(date(2026, 1, 1), date(2026, 1, 30))
+        ),
+    }
+
+
+# FTS5 lookups show up as "SCAN <fts> VIRTUAL TABLE INDEX n:M"; that's the index.
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)(?!.*\b(?:USING|VIRTUAL TABLE)\b)")
+_PG_FULL_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def _plan(conn, dialect: str, stmt: Select) -> list[str]:
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if dialect == "sqlite":
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    return [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}")]
+
+
+def check_query_plans(engine: Engine) -> list[str]:
+    """Return one message per query that full-scans a table (empty list == pass)."""
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        raise RuntimeError(f"query-plan check not supported on {dialect}")
+
+    problems: list[str] = []
+    with engine.connect() as conn:
+        if dialect == "postgresql":
+            # Small tables make seq scans legitimately cheaper; only flag when no index applies.
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        for name, build in _queries(dialect).items():
+            lines = _plan(conn, dialect, build())
+            pattern = _SQLITE_FULL_SCAN if dialect == "sqlite" else _PG_FULL_SCAN
+            for line in lines:
+                m = pattern.search(line.strip())
+                if m:
+                    problems.append(f"{name}: full scan of {m.group(1)} ({line.strip()})")
+        conn.rollback()
+    return problems
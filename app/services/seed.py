@@ -1,18 +1,18 @@
-import uuid
 from sqlalchemy.orm import Session
 
+from app.core.ids import new_id
 from app.core.security import hash_password
 from app.models.user import User, UserRole
 
 
-def seed_users(db: Session):
+def seed_users(db: Session) -> bool:
     # Only seed if no users exist
-    if db.query(User).count() > 0:
-        return
+    if db.query(User.id).limit(1).first() is not None:
+        return False
 
     users = [
         User(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             name="Officer One",
             phone="+252634000001",
             role=UserRole.OFFICER,
@@ -20,7 +20,7 @@ def seed_users(db: Session):
             is_active=True,
         ),
         User(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             name="Driver One",
             phone="+252634000002",
             role=UserRole.DRIVER,
@@ -28,7 +28,7 @@ def seed_users(db: Session):
             is_active=True,
         ),
         User(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             name="Dispatcher One",
             phone="+252634000003",
             role=UserRole.DISPATCHER,
@@ -36,7 +36,7 @@ def seed_users(db: Session):
             is_active=True,
         ),
         User(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             name="Admin",
             phone="+252634000004",
             role=UserRole.ADMIN,
@@ -47,3 +47,4 @@ def seed_users(db: Session):
 
     db.add_all(users)
     db.commit()
+    return True
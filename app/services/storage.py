@@ -3,12 +3,12 @@
 # (FULL FILE - streaming save + size limit)
 # =========================================
 import os
-import uuid
 from typing import Tuple
 
 from fastapi import UploadFile, HTTPException
 
 from app.core.config import settings
+from app.core.ids import new_id
 
 UPLOAD_DIR = "uploads"
 
@@ -31,7 +31,7 @@ def save_upload_streaming(file: UploadFile) -> Tuple[str, int]:
     ensure_upload_dir()
 
     ext = _guess_ext(file.filename)
-    safe_name = f"{uuid.uuid4()}{ext}"
+    safe_name = f"{new_id()}{ext}"
     path = os.path.join(UPLOAD_DIR, safe_name)
 
     max_bytes = settings.MAX_UPLOAD_MB * 1024 * 1024
@@ -0,0 +1,74 @@
+"""
+Admin user directory search.
+
+A query made of phone characters only (digits, +, spaces, dashes, brackets)
+is a prefix match on users.phone_digits. Anything else is split into name
+tokens that must all match as word prefixes ("ahm moh" finds "Ahmed
+Mohamed"), served by FTS5 on SQLite and a tsvector GIN index on Postgres.
+Results are ordered by (role, name, id) for keyset pagination.
+"""
+import hashlib
+import re
+
+from sqlalchemy import column, func, literal, literal_column, select, text, tuple_
+from sqlalchemy.sql import Select
+
+from app.models.user import User, UserRole, normalize_phone
+from app.services.pagination import prefix_range
+
+_PHONE_QUERY = re.compile(r"^[\d\s+\-().]+$")
+
+USER_DIRECTORY_COLUMNS = (User.id, User.name, User.phone, User.role, User.is_active, User.created_at)
+
+
+def _name_tokens(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())
+
+
+def user_search_stmt(
+    dialect: str,
+    q: str | None = None,
+    role: UserRole | None = None,
+    after: tuple[str, str, str] | None = None,
+) -> Select:
+    stmt = select(*USER_DIRECTORY_COLUMNS)
+    if role is not None:
+        stmt = stmt.where(User.role == role)
+
+    q = (q or "").strip()
+    if q and _PHONE_QUERY.match(q) and normalize_phone(q):
+        stmt = stmt.where(prefix_range(User.phone_digits, normalize_phone(q)))
+    elif q:
+        tokens = _name_tokens(q)
+        if not tokens:
+            return stmt.where(False)
+        if dialect == "sqlite":
+            # tokens are \w+ only, so quoting each one is a safe literal prefix query
+            match = " ".join(f'"{t}"*' for t in tokens)
+            hits = (
+                text("SELECT user_id FROM users_name_fts WHERE users_name_fts MATCH :m")
+                .bindparams(m=match)
+                .columns(column("user_id"))
+            )
+            stmt = stmt.where(User.id.in_(hits))
+        elif dialect == "postgresql":
+            tsquery = " & ".join(f"{t}:*" for t in tokens)
+            stmt = stmt.where(
+                func.to_tsvector(literal_column("'simple'"), User.name).op("@@")(
+                    func.to_tsquery(literal_column("'simple'"), tsquery)
+                )
+            )
+        else:
+            for t in tokens:
+                stmt = stmt.where(User.name.ilike(f"%{t}%"))
+
+    if after is not None:
+        a_role, a_name, a_id = after
+        stmt = stmt.where(
+            tuple_(User.role, User.name, User.id) > tuple_(literal(UserRole(a_role), User.role.type), a_name, a_id)
+        )
+    return stmt.order_by(User.role.asc(), User.name.asc(), User.id.asc())
+
+
+def body_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
@@ -0,0 +1,40 @@
+"""
+Watermarks for incremental jobs that read a table forward in keyset order.
+
+`claim` opens the job's critical section: it locks the watermark row (a
+write transaction on SQLite) so two workers never process the same slice,
+and returns the stored position. `advance` writes the new position; the
+caller commits it together with the results, so a crash can never count a
+slice twice or skip one.
+"""
+import json
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+
+from app.models.watermark import Watermark
+
+
+def claim(conn: Connection, name: str) -> Optional[list]:
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    ins = pg_insert if dialect == "postgresql" else sqlite_insert
+    conn.execute(ins(Watermark).values(name=name).on_conflict_do_nothing(index_elements=["name"]))
+    position = conn.execute(
+        select(Watermark.position).where(Watermark.name == name).with_for_update()
+    ).scalar_one_or_none()
+    return json.loads(position) if position else None
+
+
+def advance(conn: Connection, name: str, position: list[Any]) -> None:
+    conn.execute(
+        update(Watermark)
+        .where(Watermark.name == name)
+        .values(position=json.dumps(position, separators=(",", ":")), updated_at=datetime.now(timezone.utc))
+    )
+
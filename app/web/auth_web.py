@@ -2,6 +2,7 @@ from fastapi import Request, HTTPException, status, Depends
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
+from app.core.principal_cache import load_principal
 from app.core.security import decode_token
 from app.models.user import User, UserRole
 
@@ -23,7 +24,7 @@ def get_current_user_from_cookie(
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = load_principal(db, user_id)
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User inactive or not found")
     return user
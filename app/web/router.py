@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, Form, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
-from app.core.security import verify_password, create_access_token
+from app.core.auth import find_user_by_phone
+from app.core.db import get_db, get_read_db
+from app.core.security import PasswordHasherBusy, verify_password_async, create_access_token
 from app.models.user import User, UserRole
-from app.models.tow_job import TowJob, TowStatus
+from app.models.tow_job import TOW_JOB_LIST_COLUMNS, TowJob, TowStatus
+from app.services.counters import read_counters
 
 from app.web.auth_web import COOKIE_NAME, get_current_user_from_cookie, require_roles_cookie
 
@@ -21,14 +25,23 @@ def login_page(request: Request):
 
 
 @router.post("/login")
-def login_action(
+async def login_action(
     request: Request,
     phone: str = Form(...),
     password: str = Form(...),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.phone == phone).first()
-    if not user or not verify_password(password, user.password_hash):
+    user = await run_in_threadpool(find_user_by_phone, db, phone)
+    try:
+        ok = bool(user) and await verify_password_async(password, user.password_hash)
+    except PasswordHasherBusy:
+        return templates.TemplateResponse(
+            "login.html",
+            {"request": request, "error": "Too many sign-ins right now. Please try again."},
+            status_code=503,
+            headers={"Retry-After": "1"},
+        )
+    if not ok:
         return templates.TemplateResponse("login.html", {"request": request, "error": "Invalid credentials"}, status_code=401)
 
     token = create_access_token(subject=user.id, role=user.role.value)
@@ -84,15 +97,15 @@ def web_home(user: User = Depends(get_current_user_from_cookie)):
 @router.get("/officer", response_class=HTMLResponse)
 def officer_dashboard(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: User = Depends(require_roles_cookie(UserRole.OFFICER, UserRole.ADMIN)),
 ):
     # Show officer's recent jobs (admin can see all if you want; here we'll keep role-aware)
-    q = db.query(TowJob)
+    q = select(*TOW_JOB_LIST_COLUMNS)
     if user.role == UserRole.OFFICER:
-        q = q.filter(TowJob.officer_id == user.id)
+        q = q.where(TowJob.officer_id == user.id)
 
-    jobs = q.order_by(TowJob.created_at.desc()).limit(25).all()
+    jobs = db.execute(q.order_by(TowJob.created_at.desc()).limit(25)).all()
 
     return templates.TemplateResponse(
         "officer.html",
@@ -106,35 +119,44 @@ def officer_dashboard(
 @router.get("/driver", response_class=HTMLResponse)
 def driver_dashboard(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: User = Depends(require_roles_cookie(UserRole.DRIVER, UserRole.ADMIN)),
 ):
-    q = db.query(TowJob)
+    q = select(*TOW_JOB_LIST_COLUMNS)
     if user.role == UserRole.DRIVER:
-        q = q.filter(TowJob.assigned_driver_id == user.id)
+        q = q.where(TowJob.assigned_driver_id == user.id)
 
-    jobs = q.order_by(TowJob.created_at.desc()).limit(50).all()
+    jobs = db.execute(q.order_by(TowJob.created_at.desc()).limit(50)).all()
     return templates.TemplateResponse("driver.html", {"request": request, "user": user, "jobs": jobs})
 
 @router.get("/dispatcher", response_class=HTMLResponse)
 def dispatcher_dashboard(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: User = Depends(require_roles_cookie(UserRole.DISPATCHER, UserRole.ADMIN)),
 ):
-    jobs = db.query(TowJob).order_by(TowJob.created_at.desc()).limit(100).all()
+    jobs = db.execute(select(*TOW_JOB_LIST_COLUMNS).order_by(TowJob.created_at.desc()).limit(100)).all()
 
     # Drivers list for assignment
-    drivers = (
-        db.query(User)
-        .filter(User.role == UserRole.DRIVER, User.is_active == True)
+    drivers = db.execute(
+        select(User.id, User.name, User.phone)
+        .where(User.role == UserRole.DRIVER, User.is_active == True)  # noqa: E712
         .order_by(User.name.asc())
-        .all()
-    )
+    ).all()
+
+    stats = read_counters(db)
+    driver_open = {d["driver_id"]: d["open"] for d in stats["by_driver"]}
 
     return templates.TemplateResponse(
         "dispatcher.html",
-        {"request": request, "user": user, "jobs": jobs, "drivers": drivers},
+        {
+            "request": request,
+            "user": user,
+            "jobs": jobs,
+            "drivers": drivers,
+            "stats": stats,
+            "driver_open": driver_open,
+        },
     )
 
 # @router.get("/dispatcher", response_class=HTMLResponse)
@@ -150,8 +172,8 @@ def dispatcher_dashboard(
 @router.get("/admin", response_class=HTMLResponse)
 def admin_dashboard(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: User = Depends(require_roles_cookie(UserRole.ADMIN)),
 ):
-    jobs = db.query(TowJob).order_by(TowJob.created_at.desc()).limit(100).all()
+    jobs = db.execute(select(*TOW_JOB_LIST_COLUMNS).order_by(TowJob.created_at.desc()).limit(100)).all()
     return templates.TemplateResponse("admin.html", {"request": request, "user": user, "jobs": jobs})
@@ -0,0 +1,77 @@
+"""
+Per-request auth overhead: verified-token cache vs a full JWT decode.
+
+    python -m benchmarks.bench_auth --iterations 20000
+
+Runs against a throwaway SQLite file; nothing touches your real database.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_auth_")
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret-0001")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.core.auth import get_current_user  # noqa: E402
+from app.core.db import Base, SessionLocal, engine  # noqa: E402
+from app.core.principal_cache import principal_cache  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+
+
+def _timeit(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6  # µs per call
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add(User(id="bench-user", name="Bench", phone="+000", role=UserRole.DRIVER, password_hash="x"))
+        db.commit()
+
+    token = security.create_access_token(subject="bench-user", role=UserRole.DRIVER.value)
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    def decode_uncached():
+        security._verify_token(token)
+
+    def decode_cached():
+        security.decode_token(token)
+
+    db = SessionLocal()
+
+    def request_cached():
+        get_current_user(creds=creds, db=db)
+
+    def request_uncached():
+        security.token_cache.clear()
+        principal_cache.clear()
+        get_current_user(creds=creds, db=db)
+
+    n = args.iterations
+    rows = [
+        ("jwt decode (no cache)", _timeit(decode_uncached, n)),
+        ("jwt decode (token cache hit)", _timeit(decode_cached, n)),
+        ("get_current_user (cold caches)", _timeit(request_uncached, n // 4)),
+        ("get_current_user (warm caches)", _timeit(request_cached, n)),
+    ]
+    db.close()
+
+    width = max(len(r[0]) for r in rows)
+    for name, us in rows:
+        print(f"{name:<{width}}  {us:9.2f} µs/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Auto-dispatch solver time (cost matrix + optimal matching).
+
+    python -m benchmarks.bench_dispatch --sizes 500x200 2000x500 --runs 20
+
+Times app.services.dispatch.solve on random jobs and drivers spread around
+Hargeisa, without the database: the numpy haversine cost matrix plus scipy's
+linear_sum_assignment. Prints p50/p95 per size and the greedy
+nearest-driver total for comparison.
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret-0001")
+
+import numpy as np  # noqa: E402
+
+from app.services.dispatch import solve  # noqa: E402
+from app.services.geo import haversine_m  # noqa: E402
+
+CENTER = (9.5624, 44.0770)
+
+
+def _points(rng: np.random.Generator, n: int) -> np.ndarray:
+    return np.column_stack((rng.normal(CENTER[0], 0.05, n), rng.normal(CENTER[1], 0.05, n)))
+
+
+def _greedy_total(jobs: np.ndarray, drivers: np.ndarray) -> float:
+    """Each job in turn takes its nearest free driver, the way a dispatcher would by hand."""
+    free = list(range(len(drivers)))
+    total = 0.0
+    for lat, lng in jobs:
+        if not free:
+            break
+        d = haversine_m(lat, lng, drivers[free, 0], drivers[free, 1])
+        k = int(np.argmin(d))
+        total += float(d[k])
+        free.pop(k)
+    return total
+
+
+def _pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", default=["100x50", "500x200", "2000x500"], help="JOBSxDRIVERS")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'size':>10} {'p50 ms':>8} {'p95 ms':>8} {'optimal km':>11} {'greedy km':>10}")
+    for size in args.sizes:
+        n_jobs, n_drivers = (int(x) for x in size.lower().split("x"))
+        ms = []
+        for _ in range(args.runs):
+            jobs, drivers = _points(rng, n_jobs), _points(rng, n_drivers)
+            start = time.perf_counter()
+            _, _, dist = solve(jobs, drivers, None)
+            ms.append((time.perf_counter() - start) * 1000)
+        # the greedy pass serves jobs oldest-first, so compare on the jobs the matching served
+        rows, _, dist = solve(jobs, drivers, None)
+        greedy = _greedy_total(jobs[np.sort(rows)], drivers)
+        print(
+            f"{size:>10} {statistics.median(ms):>8.2f} {_pct(ms, 0.95):>8.2f}"
+            f" {dist.sum() / 1000:>11.1f} {greedy / 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Driver location ping throughput and nearest-driver latency, in one process.
+
+    python -m benchmarks.bench_driver_pings --drivers 2000 --pings 50000
+
+Runs the real app (lifespan included, so the breadcrumb writer is live)
+against a throwaway SQLite file through an in-process ASGI client, i.e. the
+full FastAPI request path minus the network. Reports pings/second at the
+given concurrency (the in-process client shares the CPU, so this is a
+floor), the cost of the ping handler's own work, how many breadcrumbs were
+written, and the latency of the in-memory nearest-driver lookup.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_pings_")
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret-0001")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.core.db import engine  # noqa: E402
+from app.core.ids import new_id  # noqa: E402
+from app.core.migrations import run_migrations  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services import driver_locations  # noqa: E402
+
+CENTER = (9.5624, 44.0770)
+
+
+def _pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def _run(args) -> None:
+    rng = random.Random(args.seed)
+    driver_ids = [new_id() for _ in range(args.drivers)]
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {"id": d, "name": f"Driver {i}", "phone": f"+2520{i:08d}", "role": UserRole.DRIVER, "password_hash": "x"}
+                for i, d in enumerate(driver_ids)
+            ],
+        )
+    tokens = [security.create_access_token(subject=d, role=UserRole.DRIVER.value) for d in driver_ids]
+    positions = [(rng.gauss(CENTER[0], 0.05), rng.gauss(CENTER[1], 0.05)) for _ in driver_ids]
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            queue: asyncio.Queue = asyncio.Queue()
+            for _ in range(args.pings):
+                queue.put_nowait(rng.randrange(args.drivers))
+
+            async def worker():
+                while True:
+                    try:
+                        i = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    lat, lng = positions[i]
+                    lat, lng = lat + rng.uniform(-2e-4, 2e-4), lng + rng.uniform(-2e-4, 2e-4)
+                    positions[i] = (lat, lng)
+                    r = await client.post(
+                        "/drivers/location",
+                        json={"lat": lat, "lng": lng, "accuracy_m": 8},
+                        headers={"Authorization": f"Bearer {tokens[i]}"},
+                    )
+                    assert r.status_code == 204, r.text
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+            print(f"{args.pings:,} pings from {args.drivers:,} drivers in {elapsed:.2f}s: {args.pings / elapsed:,.0f}/s")
+
+        # the same pings without HTTP: what the handler itself costs per ping
+        start = time.perf_counter()
+        for _ in range(args.pings):
+            i = rng.randrange(args.drivers)
+            lat, lng = positions[i]
+            driver_locations.record_ping(driver_ids[i], lat, lng, 8, None)
+        per_ping_us = (time.perf_counter() - start) / args.pings * 1e6
+        print(f"record_ping alone: {per_ping_us:.1f} us/ping ({1e6 / per_ping_us:,.0f}/s)")
+
+        await driver_locations.writer.flush()
+        m = driver_locations.writer.metrics()
+        print(f"breadcrumbs written: {m['flushed']:,} in {m['batches']} batches ({m['dropped']} dropped)")
+
+        ms = []
+        for _ in range(args.queries):
+            lat, lng = rng.gauss(CENTER[0], 0.05), rng.gauss(CENTER[1], 0.05)
+            t0 = time.perf_counter()
+            driver_locations.store.nearest(lat, lng, 5, 300)
+            ms.append((time.perf_counter() - t0) * 1000)
+        print(f"nearest 5 of {len(driver_locations.store):,}: p50 {statistics.median(ms):.3f} ms, p95 {_pct(ms, 0.95):.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--drivers", type=int, default=2000)
+    parser.add_argument("--pings", type=int, default=50000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Streaming export throughput and memory.
+
+    python -m benchmarks.bench_export --jobs 200000 --events-per-job 3
+
+Seeds a throwaway SQLite file with jobs and events, then drains
+app.services.export.stream_export for NDJSON, CSV and gzipped NDJSON. Reports
+jobs/second, output size and the peak Python heap (tracemalloc, measured on a
+second pass) during each export, which should not grow with --jobs.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_export_")
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret-0001")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.db import engine  # noqa: E402
+from app.core.ids import new_id  # noqa: E402
+from app.core.migrations import run_migrations  # noqa: E402
+from app.models.event import TowJobEvent  # noqa: E402
+from app.models.tow_job import TowJob, TowStatus  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.export import stream_export  # noqa: E402
+
+
+def _seed(n_jobs: int, events_per_job: int) -> None:
+    officer = new_id()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [{"id": officer, "name": "Officer", "phone": "+252630000000", "role": UserRole.OFFICER, "password_hash": "x"}],
+        )
+        for lo in range(0, n_jobs, 10000):
+            jobs, events = [], []
+            for i in range(lo, min(lo + 10000, n_jobs)):
+                job_id = new_id()
+                at = start + timedelta(seconds=i * 13)
+                jobs.append(
+                    {"id": job_id, "plate_number": f"AB-{i}", "officer_id": officer, "status": TowStatus.NEW,
+                     "location_lat": 9.56, "location_lng": 44.07, "created_at": at}
+                )
+                events.extend(
+                    {"id": new_id(), "tow_job_id": job_id, "actor_user_id": officer, "event_type": "CREATED",
+                     "message": f"event {k}", "created_at": at + timedelta(seconds=k)}
+                    for k in range(events_per_job)
+                )
+            conn.execute(insert(TowJob), jobs)
+            conn.execute(insert(TowJobEvent), events)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=200_000)
+    parser.add_argument("--events-per-job", type=int, default=3)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    _seed(args.jobs, args.events_per_job)
+
+    for label, fmt, gzip in (("ndjson", "ndjson", False), ("csv", "csv", False), ("ndjson.gz", "ndjson", True)):
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in stream_export(engine, fmt, gzip=gzip))
+        elapsed = time.perf_counter() - start
+        # second pass for memory: tracemalloc slows allocation-heavy code down
+        tracemalloc.start()
+        for _ in stream_export(engine, fmt, gzip=gzip):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{label:>10}: {args.jobs / elapsed:>9,.0f} jobs/s, {size / 1e6:>7.1f} MB out,"
+            f" peak heap {peak / 1e6:.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
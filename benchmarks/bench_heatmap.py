@@ -0,0 +1,67 @@
+"""
+Heatmap aggregation and tile rendering cost, without the database.
+
+    python -m benchmarks.bench_heatmap --jobs 1000000 --days 30
+
+Bins random jobs around Hargeisa with app.services.heatmap.bin_jobs (the
+numpy stage of each refresh batch), packs the results the way they are
+stored, then renders a z=12 tile and its z=9 parent from the packed tiles.
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret-0001")
+
+import numpy as np  # noqa: E402
+
+from app.services.heatmap import GRID, HEATMAP_ZOOM, bin_jobs, pack, render_tile, tile_coords  # noqa: E402
+
+CENTER = (9.5624, 44.0770)
+TYPES = ["NO_PARKING", "DOUBLE_PARKING", "BUS_LANE", None]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    lat = rng.normal(CENTER[0], 0.03, args.jobs)
+    lng = rng.normal(CENTER[1], 0.03, args.jobs)
+    start = datetime(2026, 1, 1)
+    seconds = rng.integers(0, args.days * 86400, args.jobs)
+    kinds = rng.integers(0, len(TYPES), args.jobs)
+    rows = [(start + timedelta(seconds=int(s)), a, b, TYPES[k]) for s, a, b, k in zip(seconds, lat, lng, kinds)]
+
+    t0 = time.perf_counter()
+    binned = bin_jobs(rows)
+    t_bin = time.perf_counter() - t0
+    print(f"binned {args.jobs:,} jobs into {len(binned):,} tile-days in {t_bin:.2f}s ({args.jobs / t_bin:,.0f}/s)")
+
+    t0 = time.perf_counter()
+    stored = {}
+    for key, (cells, counts) in binned.items():
+        arr = np.zeros((24, GRID, GRID), dtype=np.uint32)
+        arr.reshape(-1)[cells] += counts.astype(np.uint32)
+        stored[key] = pack(arr)
+    t_pack = time.perf_counter() - t0
+    size = sum(len(b) for b in stored.values())
+    print(f"packed in {t_pack:.2f}s: {size / len(stored) / 1024:.1f} KiB per tile-day on average")
+
+    tx, ty, _, _ = (int(v[0]) for v in tile_coords(np.array([CENTER[0]]), np.array([CENTER[1]])))
+    for z in (HEATMAP_ZOOM, HEATMAP_ZOOM - 3):
+        f = 1 << (HEATMAP_ZOOM - z)
+        x, y = tx // f, ty // f
+        rows = [(k[0], k[1], b) for k, b in stored.items() if k[0] // f == x and k[1] // f == y]
+        t0 = time.perf_counter()
+        raster = render_tile(z, x, y, rows, list(range(24)))
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"render z={z}: {len(rows):,} stored tiles, {int(raster.sum()):,} jobs in {ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Insert throughput and index size for tow_job_events keyed by uuid4 vs the
+time-ordered app.core.ids.new_id (UUIDv7).
+
+    python -m benchmarks.bench_ids --rows 2000000
+
+Uses the real tow_job_events DDL (primary key + indexes) on a fresh SQLite
+file per run. Throughput is reported per 10% slice so the slowdown of random
+keys as the B-tree outgrows the page cache is visible.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret-0001")
+
+from sqlalchemy.dialects import sqlite as sqlite_dialect  # noqa: E402
+from sqlalchemy.schema import CreateIndex, CreateTable  # noqa: E402
+
+from app.core.ids import new_id  # noqa: E402
+from app.models.event import TowJobEvent  # noqa: E402
+import app.models.tow_job  # noqa: E402,F401  resolves FK targets for the DDL
+import app.models.user  # noqa: E402,F401
+
+
+def _ddl() -> list[str]:
+    table = TowJobEvent.__table__
+    dialect = sqlite_dialect.dialect()
+    stmts = [str(CreateTable(table).compile(dialect=dialect))]
+    stmts += [str(CreateIndex(ix).compile(dialect=dialect)) for ix in table.indexes]
+    return stmts
+
+
+def run(label: str, make_id, rows: int, batch: int, cache_mb: int) -> None:
+    with tempfile.TemporaryDirectory(prefix="bench_ids_") as tmp:
+        path = os.path.join(tmp, "events.db")
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{cache_mb * 1024}")
+        for stmt in _ddl():
+            conn.execute(stmt)
+
+        job_ids = [str(uuid.uuid4()) for _ in range(max(1, rows // 20))]  # ~20 events per job
+        sql = (
+            "INSERT INTO tow_job_events (id, tow_job_id, actor_user_id, event_type, message, created_at) "
+            "VALUES (?, ?, 'bench-user', 'STATUS_CHANGED', 'Status NEW -> ASSIGNED', CURRENT_TIMESTAMP)"
+        )
+
+        slice_size = max(batch, rows // 10)
+        slice_rates = []
+        done = 0
+        start = slice_start = time.perf_counter()
+        while done < rows:
+            n = min(batch, rows - done)
+            conn.executemany(sql, [(make_id(), job_ids[(done + i) % len(job_ids)]) for i in range(n)])
+            conn.commit()
+            done += n
+            if done % slice_size == 0 or done == rows:
+                now = time.perf_counter()
+                slice_rates.append(slice_size / (now - slice_start))
+                slice_start = now
+        elapsed = time.perf_counter() - start
+
+        sizes = dict(
+            conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall()
+        )
+        conn.close()
+
+    pk_index = next((v for k, v in sizes.items() if k.startswith("sqlite_autoindex_tow_job_events")), 0)
+    print(
+        f"{label:<8} {rows / elapsed:10.0f} rows/s overall | "
+        f"first slice {slice_rates[0]:9.0f}/s, last slice {slice_rates[-1]:9.0f}/s | "
+        f"pk index {pk_index / 1e6:7.1f} MB, table {sizes.get('tow_job_events', 0) / 1e6:7.1f} MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--cache-mb", type=int, default=16, help="small cache exposes random-insert page misses")
+    args = parser.parse_args()
+
+    run("uuid4", lambda: str(uuid.uuid4()), args.rows, args.batch, args.cache_mb)
+    run("uuidv7", new_id, args.rows, args.batch, args.cache_mb)
+
+
+if __name__ == "__main__":
+    main()
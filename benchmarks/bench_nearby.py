@@ -0,0 +1,208 @@
+"""
+Radius job search latency (GET /tow-jobs/nearby) on a large synthetic dataset.
+
+    python -m benchmarks.bench_nearby --jobs 1000000 --queries 500
+
+Builds a fresh SQLite database through the real migrations and fills it with
+`--jobs` jobs clustered around a few city centers (dense cores, sparse
+outskirts) with a realistic status mix. Each query picks a random point near
+a city and a radius from 250m to 5km, then runs the geohash-cell candidate
+query plus the numpy haversine refine from app.services.geo. Prints p50/p95
+per radius, and the same searches as a plain lat/lng range scan without the
+cell prefilter for comparison.
+
+Before timing, it checks that jobs exactly `radius` away in every direction
+are found, at Hargeisa's latitude and far from the equator.
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret-0001")
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.core.db import make_engine  # noqa: E402
+from app.core.geohash import EARTH_RADIUS_M, encode, radius_box  # noqa: E402
+from app.core.ids import new_id  # noqa: E402
+from app.core.migrations import run_migrations  # noqa: E402
+from app.models.tow_job import OPEN_STATUSES, TowJob, TowStatus  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.geo import candidates_stmt, rank  # noqa: E402
+
+# (lat, lng, spread in degrees, share of jobs)
+CITIES = [
+    (9.5624, 44.0770, 0.05, 0.55),  # Hargeisa
+    (10.4396, 45.0143, 0.03, 0.20),  # Berbera
+    (9.9386, 43.1817, 0.03, 0.15),  # Borama
+    (9.5221, 45.5336, 0.02, 0.10),  # Burao
+]
+STATUS_MIX = [
+    (TowStatus.CLOSED, 0.70),
+    (TowStatus.CANCELLED, 0.08),
+    (TowStatus.TOWED, 0.05),
+    (TowStatus.NEW, 0.07),
+    (TowStatus.ASSIGNED, 0.05),
+    (TowStatus.EN_ROUTE, 0.03),
+    (TowStatus.ARRIVED, 0.02),
+]
+RADII_M = (250, 1000, 2500, 5000)
+
+
+def _point(rng: random.Random) -> tuple[float, float]:
+    lat, lng, spread, _ = rng.choices(CITIES, weights=[c[3] for c in CITIES])[0]
+    return rng.gauss(lat, spread), rng.gauss(lng, spread)
+
+
+def _fill(engine, jobs: int, rng: random.Random) -> None:
+    officer_id = new_id()
+    statuses = [s for s, _ in STATUS_MIX]
+    weights = [w for _, w in STATUS_MIX]
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [{"id": officer_id, "name": "Bench Officer", "phone": "000", "password_hash": "x", "role": UserRole.OFFICER}],
+        )
+        batch: list[dict] = []
+        for i in range(jobs):
+            lat, lng = _point(rng)
+            batch.append(
+                {
+                    "id": new_id(),
+                    "plate_number": f"B-{i}",
+                    "plate_key": f"B{i}",
+                    "officer_id": officer_id,
+                    "status": rng.choices(statuses, weights)[0],
+                    "location_lat": lat,
+                    "location_lng": lng,
+                    "geohash": encode(lat, lng),
+                    "created_at": start + timedelta(seconds=i * 30),
+                }
+            )
+            if len(batch) >= 20000:
+                conn.execute(insert(TowJob), batch)
+                batch.clear()
+        if batch:
+            conn.execute(insert(TowJob), batch)
+
+
+def _destination(lat: float, lng: float, bearing_deg: float, distance_m: float) -> tuple[float, float]:
+    """Point `distance_m` great-circle metres from (lat, lng) along `bearing_deg`."""
+    d = distance_m / EARTH_RADIUS_M
+    lat1, lng1, b = math.radians(lat), math.radians(lng), math.radians(bearing_deg)
+    lat2 = math.asin(math.sin(lat1) * math.cos(d) + math.cos(lat1) * math.sin(d) * math.cos(b))
+    lng2 = lng1 + math.atan2(math.sin(b) * math.sin(d) * math.cos(lat1), math.cos(d) - math.sin(lat1) * math.sin(lat2))
+    return math.degrees(lat2), math.degrees(lng2)
+
+
+def _check_edges(tmp: str) -> None:
+    """Jobs exactly `radius` away, every 15 degrees of bearing, must all come back."""
+    engine = make_engine(f"sqlite:///{os.path.join(tmp, 'edges.db')}")
+    run_migrations(engine)
+    officer_id = new_id()
+    centers = [(CITIES[0][0], CITIES[0][1]), (60.17, 24.94), (-33.9, 18.4)]
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [{"id": officer_id, "name": "Bench Officer", "phone": "000", "password_hash": "x", "role": UserRole.OFFICER}],
+        )
+        for c, (lat, lng) in enumerate(centers):
+            for radius in RADII_M:
+                points = [_destination(lat, lng, b, radius) for b in range(0, 360, 15)]
+                conn.execute(
+                    insert(TowJob),
+                    [
+                        {
+                            "id": new_id(),
+                            "plate_number": f"E-{c}-{radius}-{i}",
+                            "plate_key": f"E{c}{radius}{i}",
+                            "officer_id": officer_id,
+                            "status": TowStatus.NEW,
+                            "location_lat": p_lat,
+                            "location_lng": p_lng,
+                            "geohash": encode(p_lat, p_lng),
+                        }
+                        for i, (p_lat, p_lng) in enumerate(points)
+                    ],
+                )
+    with engine.connect() as conn:
+        for c, (lat, lng) in enumerate(centers):
+            for radius in RADII_M:
+                rows = conn.execute(candidates_stmt(radius_box(lat, lng, radius), OPEN_STATUSES)).all()
+                hits = {job_id for job_id, _ in rank(rows, lat, lng, radius, 1000)}
+                plates = set(conn.execute(select(TowJob.plate_number).where(TowJob.id.in_(hits))).scalars())
+                missing = [b for i, b in enumerate(range(0, 360, 15)) if f"E-{c}-{radius}-{i}" not in plates]
+                assert not missing, f"({lat}, {lng}) r={radius}m: bearings {missing} not returned"
+    engine.dispose()
+    print("edge check: jobs exactly radius away are returned")
+
+
+def _pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def _range_scan(box):
+    min_lat, min_lng, max_lat, max_lng = box
+    return select(TowJob.id, TowJob.location_lat, TowJob.location_lng).where(
+        TowJob.location_lat.between(min_lat, max_lat),
+        TowJob.location_lng.between(min_lng, max_lng),
+        TowJob.status.in_(OPEN_STATUSES),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--scan-sample", type=int, default=40, help="queries to time without the cell prefilter")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="bench_nearby_") as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'nearby.db')}")
+        run_migrations(engine)
+        _check_edges(tmp)
+
+        t0 = time.perf_counter()
+        _fill(engine, args.jobs, rng)
+        print(f"load {args.jobs:,} jobs: {time.perf_counter() - t0:.1f}s")
+
+        searches = [(*_point(rng), rng.choice(RADII_M)) for _ in range(args.queries)]
+        by_radius: dict[int, list[float]] = {}
+        found: list[int] = []
+        with engine.connect() as conn:
+            for lat, lng, radius in searches:
+                start = time.perf_counter()
+                rows = conn.execute(candidates_stmt(radius_box(lat, lng, radius), OPEN_STATUSES)).all()
+                hits = rank(rows, lat, lng, radius, 50)
+                by_radius.setdefault(radius, []).append((time.perf_counter() - start) * 1000)
+                found.append(len(hits))
+
+            print(f"{'radius m':>8} {'n':>5} {'p50 ms':>8} {'p95 ms':>8}")
+            for radius in sorted(by_radius):
+                ms = by_radius[radius]
+                print(f"{radius:>8} {len(ms):>5} {statistics.median(ms):>8.2f} {_pct(ms, 0.95):>8.2f}")
+            everything = [x for ms in by_radius.values() for x in ms]
+            print(f"{'all':>8} {len(everything):>5} {statistics.median(everything):>8.2f} {_pct(everything, 0.95):>8.2f}")
+            print(f"median hits per query: {statistics.median(found)}")
+
+            scan_ms = []
+            for lat, lng, radius in searches[: args.scan_sample]:
+                start = time.perf_counter()
+                rows = conn.execute(_range_scan(radius_box(lat, lng, radius))).all()
+                rank(rows, lat, lng, radius, 50)
+                scan_ms.append((time.perf_counter() - start) * 1000)
+            print(f"no cell prefilter: p50 {statistics.median(scan_ms):.2f} ms, p95 {_pct(scan_ms, 0.95):.2f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Plate search latency (GET /tow-jobs/plates/search) on a large synthetic dataset.
+
+    python -m benchmarks.bench_plate_search --jobs 5000000 --queries 2000
+
+Builds a fresh SQLite database through the real migrations, then fills
+plate_offenses as if `--jobs` jobs had been filed: a long tail of one-off
+plates plus a Zipf-ish set of repeat offenders. Queries are random 2-6
+character fragments of existing plates with random spacing/dashes, run
+through app.services.plates.plate_search_stmt. Prints p50/p95/p99 per
+fragment length, and the same fragments as a leading-wildcard LIKE for
+comparison (sampled; it is slow by design).
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret-0001")
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.core.db import make_engine  # noqa: E402
+from app.core.migrations import run_migrations  # noqa: E402
+from app.models.plate import PlateOffense  # noqa: E402
+from app.services.plates import normalize_plate, plate_search_stmt  # noqa: E402
+
+
+def _plate(rng: random.Random) -> str:
+    letters = "".join(rng.choices(string.ascii_uppercase, k=rng.choice((1, 2, 3))))
+    return f"{letters}-{rng.randint(0, 99999):0{rng.choice((3, 4, 5))}d}"
+
+
+def _fill(engine, jobs: int, rng: random.Random) -> list[str]:
+    """Insert plates whose counts sum to ~jobs; returns a sample of plate keys."""
+    seen: set[str] = set()
+    sample: list[str] = []
+    batch: list[dict] = []
+    filed = 0
+    with engine.begin() as conn:
+        while filed < jobs:
+            plate = _plate(rng)
+            key = normalize_plate(plate)
+            if key in seen:
+                continue
+            seen.add(key)
+            count = 1 if rng.random() < 0.7 else min(int(rng.paretovariate(1.2)) + 1, 500)
+            filed += count
+            batch.append({"plate_key": key, "plate_number": plate, "offense_count": count, "last_seen_at": None})
+            if len(sample) < 10000:
+                sample.append(key)
+            if len(batch) >= 20000:
+                conn.execute(insert(PlateOffense), batch)
+                batch.clear()
+        if batch:
+            conn.execute(insert(PlateOffense), batch)
+    print(f"{len(seen):,} distinct plates for ~{filed:,} jobs")
+    return sample
+
+
+def _fragment(key: str, rng: random.Random) -> str:
+    n = rng.randint(2, min(6, len(key)))
+    start = rng.randint(0, len(key) - n)
+    frag = key[start : start + n].lower() if rng.random() < 0.3 else key[start : start + n]
+    # the way people type it: odd case, stray spaces or dashes
+    cut = rng.randint(0, len(frag))
+    return frag[:cut] + rng.choice(("", " ", "-")) + frag[cut:]
+
+
+def _pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--like-sample", type=int, default=50, help="leading-wildcard LIKE queries to time")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="bench_plates_") as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'plates.db')}")
+        run_migrations(engine)
+
+        t0 = time.perf_counter()
+        sample = _fill(engine, args.jobs, rng)
+        print(f"load + FTS index: {time.perf_counter() - t0:.1f}s")
+
+        fragments = [_fragment(rng.choice(sample), rng) for _ in range(args.queries)]
+        by_len: dict[int, list[float]] = {}
+        with engine.connect() as conn:
+            for frag in fragments:
+                stmt = plate_search_stmt("sqlite", frag, 20)
+                start = time.perf_counter()
+                conn.execute(stmt).all()
+                by_len.setdefault(len(normalize_plate(frag)), []).append((time.perf_counter() - start) * 1000)
+
+            print(f"{'chars':>5} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+            for n in sorted(by_len):
+                ms = by_len[n]
+                print(f"{n:>5} {len(ms):>6} {statistics.median(ms):>8.2f} {_pct(ms, 0.95):>8.2f} {_pct(ms, 0.99):>8.2f}")
+            everything = [x for ms in by_len.values() for x in ms]
+            print(f"  all {len(everything):>6} {statistics.median(everything):>8.2f} {_pct(everything, 0.95):>8.2f}")
+
+            like_ms = []
+            for frag in fragments[: args.like_sample]:
+                stmt = (
+                    select(PlateOffense.plate_key)
+                    .where(PlateOffense.plate_key.like(f"%{normalize_plate(frag)}%"))
+                    .order_by(PlateOffense.offense_count.desc())
+                    .limit(20)
+                )
+                start = time.perf_counter()
+                conn.execute(stmt).all()
+                like_ms.append((time.perf_counter() - start) * 1000)
+            print(f"leading-wildcard LIKE: p50 {statistics.median(like_ms):.2f} ms, p95 {_pct(like_ms, 0.95):.2f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Concurrent write throughput on SQLite: stock engine vs app.core.db.make_engine
+(WAL, synchronous=NORMAL, busy timeout, cache/mmap tuning, sized pool).
+
+    python -m benchmarks.bench_sqlite_writes --threads 16 --ops 200
+
+Each op mimics submit_evidence (insert job + photo + two events) or
+update_status (read job, update it, insert event) in one transaction.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret-0001")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.db import Base, make_engine  # noqa: E402
+from app.models.event import TowJobEvent  # noqa: E402
+from app.models.photo import TowJobPhoto  # noqa: E402
+from app.models.tow_job import TowJob, TowStatus  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+
+
+def _submit_evidence(db, user_id: str) -> str:
+    job = TowJob(
+        id=str(uuid.uuid4()),
+        plate_number=f"B{random.randint(0, 99999):05d}",
+        officer_id=user_id,
+        status=TowStatus.NEW,
+        location_lat=9.56,
+        location_lng=44.06,
+    )
+    db.add(job)
+    db.add(TowJobEvent(id=str(uuid.uuid4()), tow_job_id=job.id, actor_user_id=user_id, event_type="CREATED"))
+    db.add(
+        TowJobPhoto(
+            id=str(uuid.uuid4()),
+            tow_job_id=job.id,
+            uploaded_by_user_id=user_id,
+            photo_type="PLATE_CLOSEUP",
+            file_path="uploads/bench.jpg",
+            content_type="image/jpeg",
+            size_bytes=1024,
+        )
+    )
+    db.add(TowJobEvent(id=str(uuid.uuid4()), tow_job_id=job.id, actor_user_id=user_id, event_type="PHOTO_UPLOADED"))
+    db.commit()
+    return job.id
+
+
+def _update_status(db, user_id: str, job_id: str) -> None:
+    job = db.query(TowJob).filter(TowJob.id == job_id).first()
+    job.status = TowStatus.EN_ROUTE
+    db.add(TowJobEvent(id=str(uuid.uuid4()), tow_job_id=job.id, actor_user_id=user_id, event_type="STATUS_CHANGED"))
+    db.commit()
+
+
+def run(label: str, eng, threads: int, ops: int) -> None:
+    Base.metadata.create_all(bind=eng)
+    Session = sessionmaker(bind=eng, autoflush=False)
+    with Session() as db:
+        db.add(User(id="bench-officer", name="Bench", phone="+000", role=UserRole.OFFICER, password_hash="x"))
+        db.commit()
+
+    done = [0]
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker():
+        job_ids = []
+        for _ in range(ops):
+            with Session() as db:
+                try:
+                    if job_ids and random.random() < 0.5:
+                        _update_status(db, "bench-officer", random.choice(job_ids))
+                    else:
+                        job_ids.append(_submit_evidence(db, "bench-officer"))
+                    with lock:
+                        done[0] += 1
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        errors[0] += 1
+
+    ts = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    elapsed = time.perf_counter() - start
+    eng.dispose()
+    print(f"{label:<10} {done[0]:6d} ok  {errors[0]:5d} locked  {elapsed:7.2f}s  {done[0] / elapsed:8.1f} tx/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200, help="transactions per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_sqlite_") as tmp:
+        before_url = f"sqlite:///{os.path.join(tmp, 'before.db')}"
+        after_url = f"sqlite:///{os.path.join(tmp, 'after.db')}"
+        run("before", create_engine(before_url, connect_args={"check_same_thread": False}), args.threads, args.ops)
+        run("after", make_engine(after_url), args.threads, args.ops)
+
+
+if __name__ == "__main__":
+    main()
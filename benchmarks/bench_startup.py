@@ -0,0 +1,74 @@
+"""
+Worker cold start: time from process spawn until /health answers 200.
+
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 1500
+
+Prepares a throwaway SQLite database with `python -m app.cli init` first (as
+a deploy step would), then spawns uvicorn repeatedly against it. Exits 1 if
+the median exceeds the budget.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _time_to_health(env: dict, timeout_s: float) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        while time.perf_counter() - start < timeout_s:
+            if proc.poll() is not None:
+                raise RuntimeError(f"worker exited early:\n{proc.stderr.read().decode()}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=0.5) as resp:
+                    if resp.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("worker did not become healthy in time")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--timeout-s", type=float, default=30.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as tmp:
+        env = dict(os.environ)
+        env.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret-0001")
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        subprocess.run([sys.executable, "-m", "app.cli", "init"], env=env, check=True, stdout=subprocess.DEVNULL)
+
+        samples = [_time_to_health(env, args.timeout_s) for _ in range(args.runs)]
+
+    median = statistics.median(samples)
+    print("runs (ms): " + ", ".join(f"{s:.0f}" for s in samples))
+    print(f"median {median:.0f} ms, budget {args.budget_ms:.0f} ms -> {'OK' if median <= args.budget_ms else 'OVER'}")
+    return 0 if median <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
 #!/usr/bin/env bash
 set -o errexit
 pip install -r requirements.txt
+python -m app.cli init